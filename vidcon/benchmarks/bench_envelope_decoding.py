@@ -0,0 +1,89 @@
+"""
+Micro-benchmark: per-message CPU time of decoding a Pub/Sub push body.
+
+"before" replays the old webhook path: Frappe parses the body into form_dict,
+the handler parses it again with request.get_json(), base64-decodes and
+json.loads the data, then re-serializes the envelope with indent=2 for
+raw_payload. "after" reuses the parsed body and keeps the original bytes.
+
+Runs without a site:
+
+	cd apps/vidcon
+	python -m vidcon.benchmarks.bench_envelope_decoding [--count 20000]
+"""
+
+import argparse
+import base64
+import json
+import time
+
+from vidcon.vidcon.doctype.vidcon_meeting import pubsub_envelope
+from vidcon.vidcon.doctype.vidcon_meeting.pubsub_envelope import decode_envelope, loads
+
+
+def make_body():
+	event = {
+		"participantSession": {
+			"name": "conferenceRecords/abc-defg-hij/participants/123/participantSessions/456",
+			"startTime": "2026-10-16T09:00:00.123456Z"
+		}
+	}
+	return json.dumps({
+		"message": {
+			"attributes": {
+				"ce-id": "1234567890",
+				"ce-type": "google.workspace.meet.participant.v2.joined",
+				"ce-source": "//workspaceevents.googleapis.com/subscriptions/meet-abc",
+				"ce-subject": "//meet.googleapis.com/spaces/AAAAbbbbCCC",
+				"ce-time": "2026-10-16T09:00:00.123456Z"
+			},
+			"data": base64.b64encode(json.dumps(event).encode()).decode(),
+			"messageId": "1234567890",
+			"publishTime": "2026-10-16T09:00:00.456Z"
+		},
+		"subscription": "projects/vidcon/subscriptions/meet-events"
+	}).encode()
+
+
+def decode_before(body):
+	form_dict = json.loads(body)
+	envelope = json.loads(body)
+	message = envelope["message"]
+	event_data = json.loads(base64.b64decode(message["data"]).decode("utf-8"))
+	raw_payload = json.dumps(envelope, indent=2)
+	return form_dict, event_data, raw_payload
+
+
+def decode_after(body):
+	form_dict = loads(body)
+	return decode_envelope(body, parsed=form_dict)
+
+
+def measure(fn, body, count):
+	start = time.process_time()
+	for _ in range(count):
+		fn(body)
+	return (time.process_time() - start) / count * 1e6
+
+
+def main():
+	parser = argparse.ArgumentParser()
+	parser.add_argument("--count", type=int, default=20000)
+	args = parser.parse_args()
+
+	body = make_body()
+
+	# Warm up
+	measure(decode_before, body, 1000)
+	measure(decode_after, body, 1000)
+
+	before = measure(decode_before, body, args.count)
+	after = measure(decode_after, body, args.count)
+
+	print(f"JSON backend: {'orjson' if pubsub_envelope.orjson else 'json'}")
+	print(f"before: {before:.2f} us/message")
+	print(f"after:  {after:.2f} us/message ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+	main()
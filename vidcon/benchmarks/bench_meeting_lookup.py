@@ -0,0 +1,124 @@
+"""
+Time the keyed VidCon Meeting lookups used by the event handlers against the
+old google_meet_link LIKE scan, as the meeting table grows.
+
+Run against a test site, never production:
+
+	bench --site test.localhost execute vidcon.benchmarks.bench_meeting_lookup.run
+	bench --site test.localhost execute vidcon.benchmarks.bench_meeting_lookup.run --kwargs "{'sizes': [1000, 100000, 1000000]}"
+	bench --site test.localhost execute vidcon.benchmarks.bench_meeting_lookup.cleanup
+
+The exact lookups (google_conference_id, google_space_resource, google_space_id)
+should stay flat across sizes; the LIKE scan grows with the table.
+"""
+
+import random
+import statistics
+import time
+
+import frappe
+from frappe.model.naming import make_autoname
+from frappe.utils import add_days, now, nowdate
+
+
+SEED_TITLE_PREFIX = "bench.vidcon."
+SEED_CHUNK_SIZE = 10000
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+DEFAULT_LOOKUPS = 200
+
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+
+def run(sizes=DEFAULT_SIZES, lookups=DEFAULT_LOOKUPS):
+	"""
+	Args:
+		sizes: Seeded meeting counts to measure at, ascending
+		lookups: Lookups timed per query and size
+	"""
+	seeded = frappe.db.count("VidCon Meeting", {"title": ["like", f"{SEED_TITLE_PREFIX}%"]})
+
+	print(f"{'meetings':>10} {'query':<24} {'median us':>10} {'p95 us':>10}")
+	for size in sorted(int(size) for size in sizes):
+		if size > seeded:
+			seed_meetings(seeded, size)
+			seeded = size
+
+		for title, filters in get_lookups():
+			timings = []
+			for _ in range(int(lookups)):
+				i = random.randrange(size)
+				start = time.perf_counter()
+				frappe.get_all("VidCon Meeting", filters=filters(i), limit=1, pluck="name")
+				timings.append((time.perf_counter() - start) * 1e6)
+
+			timings.sort()
+			print(
+				f"{size:>10} {title:<24} {statistics.median(timings):>10.0f} "
+				f"{timings[int(len(timings) * 0.95) - 1]:>10.0f}"
+			)
+
+
+def get_lookups():
+	"""Handler lookups, as filter builders for the i-th seeded meeting."""
+	return [
+		("google_conference_id", lambda i: {"google_conference_id": f"bench-conf-{i}"}),
+		("google_space_resource", lambda i: {"google_space_resource": f"spaces/bench{i}"}),
+		("google_space_id", lambda i: {"google_space_id": meeting_code(i)}),
+		("google_meet_link LIKE", lambda i: {"google_meet_link": ["like", f"%{meeting_code(i)}%"]})
+	]
+
+
+def meeting_code(i):
+	"""Unique abc-defg-hij style meeting code for the i-th seeded meeting."""
+	letters = []
+	for _ in range(10):
+		i, remainder = divmod(i, len(LETTERS))
+		letters.append(LETTERS[remainder])
+
+	code = "".join(letters)
+	return f"{code[:3]}-{code[3:7]}-{code[7:]}"
+
+
+def seed_meetings(start, stop):
+	"""Insert synthetic VidCon Meeting rows start..stop in multi-row chunks."""
+	today = nowdate()
+	fields = [
+		"name", "creation", "modified", "owner", "modified_by", "title", "status",
+		"meeting_date", "start_time", "end_time", "google_meet_link", "google_space_id",
+		"google_space_resource", "google_conference_id"
+	]
+
+	for chunk_start in range(start, stop, SEED_CHUNK_SIZE):
+		created = now()
+		values = []
+		for i in range(chunk_start, min(chunk_start + SEED_CHUNK_SIZE, stop)):
+			code = meeting_code(i)
+			values.append((
+				make_autoname("hash"),
+				created,
+				created,
+				"Administrator",
+				"Administrator",
+				f"{SEED_TITLE_PREFIX}{i}",
+				"Completed",
+				add_days(today, -(i % 365)),
+				"09:00:00",
+				"10:00:00",
+				f"https://meet.google.com/{code}",
+				code,
+				f"spaces/bench{i}",
+				f"bench-conf-{i}"
+			))
+
+		frappe.db.bulk_insert("VidCon Meeting", fields=fields, values=values, ignore_duplicates=True)
+		frappe.db.commit()
+
+	if frappe.db.db_type == "mariadb":
+		frappe.db.sql("analyze table `tabVidCon Meeting`")
+
+
+def cleanup():
+	"""Delete rows inserted by seed_meetings."""
+	frappe.db.delete("VidCon Meeting", {"title": ["like", f"{SEED_TITLE_PREFIX}%"]})
+	frappe.db.commit()
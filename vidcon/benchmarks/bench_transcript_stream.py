@@ -0,0 +1,165 @@
+"""
+Benchmark: fetching a long transcript from a local fake Meet server.
+
+"single call" replays the old fetch: one entries.list call, which only returns
+the first page. "buffered" follows every page but keeps all entries and lines
+in memory before joining them, as the old code would have had to. "streamed"
+is store_conference_transcript's path: iter_transcript_entry_pages writing
+each page's lines to a file as it arrives.
+
+Peak memory is traced Python allocations (tracemalloc) during the fetch.
+
+Runs without a site:
+
+	cd apps/vidcon
+	python -m vidcon.benchmarks.bench_transcript_stream [--entries 100000]
+"""
+
+import argparse
+import json
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import httplib2
+from googleapiclient.discovery import build_from_document
+
+from vidcon.vidcon.doctype.vidcon_meeting.google_meet_events import (
+	TRANSCRIPT_ENTRIES_PAGE_SIZE,
+	format_transcript_entry,
+	iter_transcript_entry_pages
+)
+
+
+TRANSCRIPT_NAME = "conferenceRecords/bench/transcripts/bench"
+
+# Typical spoken sentence
+ENTRY_TEXT = "So the plan for next quarter is to move the remaining jobs over to the new pipeline."
+
+
+def make_discovery(root_url):
+	"""Minimal Meet v2 discovery document with only transcripts.entries.list."""
+	return json.dumps({
+		"kind": "discovery#restDescription",
+		"discoveryVersion": "v1",
+		"id": "meet:v2",
+		"name": "meet",
+		"version": "v2",
+		"rootUrl": root_url,
+		"servicePath": "",
+		"batchPath": "batch",
+		"parameters": {},
+		"schemas": {},
+		"resources": {"conferenceRecords": {"resources": {"transcripts": {"resources": {"entries": {"methods": {
+			"list": {
+				"id": "meet.conferenceRecords.transcripts.entries.list",
+				"path": "v2/{+parent}/entries",
+				"httpMethod": "GET",
+				"parameters": {
+					"parent": {"location": "path", "required": True, "type": "string"},
+					"pageSize": {"location": "query", "type": "integer", "format": "int32"},
+					"pageToken": {"location": "query", "type": "string"}
+				},
+				"parameterOrder": ["parent"]
+			}
+		}}}}}}}
+	})
+
+
+def make_handler(total_entries):
+	class FakeMeetHandler(BaseHTTPRequestHandler):
+		protocol_version = "HTTP/1.1"
+
+		def do_GET(self):
+			query = parse_qs(urlparse(self.path).query)
+			offset = int(query.get("pageToken", ["0"])[0])
+			page_size = min(int(query.get("pageSize", ["10"])[0]), TRANSCRIPT_ENTRIES_PAGE_SIZE)
+			end = min(offset + page_size, total_entries)
+
+			page = {"entries": [
+				{
+					"name": f"{TRANSCRIPT_NAME}/entries/{i}",
+					"participant": f"conferenceRecords/bench/participants/{i % 12}",
+					"text": ENTRY_TEXT,
+					"languageCode": "en-US",
+					"startTime": f"2026-10-16T09:{(i // 60) % 60:02d}:{i % 60:02d}.000Z",
+					"endTime": f"2026-10-16T09:{(i // 60) % 60:02d}:{i % 60:02d}.900Z"
+				}
+				for i in range(offset, end)
+			]}
+			if end < total_entries:
+				page["nextPageToken"] = str(end)
+
+			body = json.dumps(page).encode()
+			self.send_response(200)
+			self.send_header("Content-Type", "application/json")
+			self.send_header("Content-Length", str(len(body)))
+			self.end_headers()
+			self.wfile.write(body)
+
+		def log_message(self, *args):
+			pass
+
+	return FakeMeetHandler
+
+
+def fetch_single_call(service):
+	response = service.conferenceRecords().transcripts().entries().list(parent=TRANSCRIPT_NAME).execute()
+	lines = [format_transcript_entry(entry) for entry in response.get("entries", [])]
+	return len(lines), len("".join(lines).encode())
+
+
+def fetch_buffered(service):
+	entries = []
+	for page in iter_transcript_entry_pages(service, TRANSCRIPT_NAME):
+		entries.extend(page)
+	transcript = "".join([format_transcript_entry(entry) for entry in entries])
+	return len(entries), len(transcript.encode())
+
+
+def fetch_streamed(service):
+	count = 0
+	with tempfile.TemporaryFile() as f:
+		for page in iter_transcript_entry_pages(service, TRANSCRIPT_NAME):
+			for entry in page:
+				f.write(format_transcript_entry(entry).encode())
+			count += len(page)
+		return count, f.tell()
+
+
+def measure(fetch, service):
+	tracemalloc.start()
+	start = time.perf_counter()
+	entries, size = fetch(service)
+	elapsed = time.perf_counter() - start
+	_, peak = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	return entries, size, elapsed, peak
+
+
+def main():
+	parser = argparse.ArgumentParser()
+	parser.add_argument("--entries", type=int, default=100000)
+	args = parser.parse_args()
+
+	server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.entries))
+	threading.Thread(target=server.serve_forever, daemon=True).start()
+
+	try:
+		root_url = f"http://127.0.0.1:{server.server_address[1]}/"
+		service = build_from_document(make_discovery(root_url), http=httplib2.Http())
+
+		print(f"{args.entries} entries, {TRANSCRIPT_ENTRIES_PAGE_SIZE} per page")
+		print(f"{'mode':<12} {'entries':>9} {'MB stored':>10} {'seconds':>8} {'peak MB':>8}")
+		for mode, fetch in (("single call", fetch_single_call), ("buffered", fetch_buffered), ("streamed", fetch_streamed)):
+			entries, size, elapsed, peak = measure(fetch, service)
+			print(f"{mode:<12} {entries:>9} {size / 1e6:>10.1f} {elapsed:>8.2f} {peak / 1e6:>8.1f}")
+	finally:
+		server.shutdown()
+
+
+if __name__ == "__main__":
+	main()
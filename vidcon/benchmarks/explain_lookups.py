@@ -0,0 +1,145 @@
+"""
+Print the query plans of the VidCon Meeting / VidCon Event Log lookups used by
+the event handlers, optionally after seeding a large event log.
+
+Run against a test site, never production:
+
+	bench --site test.localhost execute vidcon.benchmarks.explain_lookups.run --kwargs "{'seed': 1000000}"
+	bench --site test.localhost execute vidcon.benchmarks.explain_lookups.cleanup
+
+Each plan should use one of the indexes added by vidcon.patches.add_lookup_indexes
+(key column) rather than a full scan (type ALL).
+"""
+
+import frappe
+from frappe.model.naming import make_autoname
+from frappe.utils import add_to_date, now_datetime
+
+
+SEED_EVENT_TYPE_PREFIX = "bench.vidcon."
+SEED_CHUNK_SIZE = 10000
+
+EVENT_TYPES = (
+	"google.workspace.meet.conference.v2.started",
+	"google.workspace.meet.conference.v2.ended",
+	"google.workspace.meet.participant.v2.joined",
+	"google.workspace.meet.participant.v2.left"
+)
+
+
+def run(seed=0):
+	"""
+	Args:
+		seed: Number of VidCon Event Log rows to insert first
+	"""
+	if seed:
+		seed_event_log(int(seed))
+
+	for title, query in get_queries():
+		print(f"\n== {title}")
+		for row in frappe.db.sql(f"explain {query}", as_dict=True):
+			print(
+				f"  table={row.get('table')} type={row.get('type')} key={row.get('key')} "
+				f"rows={row.get('rows')} extra={row.get('Extra')}"
+			)
+
+
+def get_queries():
+	"""The handlers' lookups, as SQL built by frappe.get_all."""
+	now = now_datetime()
+
+	return [
+		("Meeting by conference and status", frappe.get_all(
+			"VidCon Meeting",
+			filters={"google_conference_id": "abc123", "status": "Scheduled"},
+			fields=["name"],
+			run=0
+		)),
+		("Meeting by calendar event", frappe.get_all(
+			"VidCon Meeting",
+			filters={"google_calendar_event_id": "evt123"},
+			fields=["name"],
+			run=0
+		)),
+		("Meeting by space", frappe.get_all(
+			"VidCon Meeting",
+			filters={"google_space_id": "abc-defg-hij"},
+			fields=["name"],
+			run=0
+		)),
+		("Meeting by space resource", frappe.get_all(
+			"VidCon Meeting",
+			filters={"google_space_resource": "spaces/AAAAbbbbCCC"},
+			fields=["name"],
+			run=0
+		)),
+		("Meetings pending transcripts", frappe.get_all(
+			"VidCon Meeting",
+			filters={"status": "Completed", "modified": [">=", add_to_date(now, hours=-2)]},
+			fields=["name"],
+			run=0
+		)),
+		("Event Log by type, newest first", frappe.get_all(
+			"VidCon Event Log",
+			filters={"event_type": SEED_EVENT_TYPE_PREFIX + EVENT_TYPES[0]},
+			fields=["name"],
+			order_by="received_at desc",
+			limit=20,
+			run=0
+		)),
+		("Event Log by status, newest first", frappe.get_all(
+			"VidCon Event Log",
+			filters={"status": "Received"},
+			fields=["name"],
+			order_by="received_at desc",
+			limit=20,
+			run=0
+		)),
+		("Event Log by event_id", frappe.get_all(
+			"VidCon Event Log",
+			filters={"event_id": "1234567890"},
+			fields=["name"],
+			run=0
+		)),
+		("Event Log by meeting", frappe.get_all(
+			"VidCon Event Log",
+			filters={"meeting": "VCM-0001"},
+			fields=["name"],
+			run=0
+		))
+	]
+
+
+def seed_event_log(count):
+	"""Insert synthetic VidCon Event Log rows in multi-row chunks."""
+	now = now_datetime()
+	fields = ["name", "creation", "modified", "owner", "modified_by", "event_type", "event_id", "received_at", "status", "conference_id"]
+
+	for start in range(0, count, SEED_CHUNK_SIZE):
+		values = []
+		for i in range(start, min(start + SEED_CHUNK_SIZE, count)):
+			received_at = add_to_date(now, seconds=-i)
+			values.append((
+				make_autoname("hash"),
+				received_at,
+				received_at,
+				"Administrator",
+				"Administrator",
+				SEED_EVENT_TYPE_PREFIX + EVENT_TYPES[i % len(EVENT_TYPES)],
+				f"bench-{i}",
+				received_at,
+				"Processed" if i % 50 else "Failed",
+				f"conf-{i // 20}"
+			))
+
+		frappe.db.bulk_insert("VidCon Event Log", fields=fields, values=values, ignore_duplicates=True)
+		frappe.db.commit()
+
+	if frappe.db.db_type == "mariadb":
+		frappe.db.sql("analyze table `tabVidCon Event Log`")
+
+
+def cleanup():
+	"""Delete rows inserted by seed_event_log."""
+	frappe.db.delete("VidCon Event Log", {"event_type": ["like", f"{SEED_EVENT_TYPE_PREFIX}%"]})
+	frappe.db.commit()
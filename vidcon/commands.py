@@ -0,0 +1,39 @@
+import click
+import frappe
+from frappe.commands import get_site, pass_context
+
+
+@click.command("vidcon-pull-events")
+@click.option("--subscription", help="Subscription path (projects/PROJECT/subscriptions/NAME). Defaults to VidCon Settings.")
+@click.option("--max-messages", type=int, default=1000, help="Flow control: max outstanding messages")
+@click.option("--max-bytes", type=int, default=100 * 1024 * 1024, help="Flow control: max outstanding bytes")
+@click.option("--batch-size", type=int, default=100, help="Messages taken from the stream at a time")
+@click.option("--emulator-host", help="host:port of a local Pub/Sub emulator")
+@pass_context
+def pull_events(context, subscription=None, max_messages=None, max_bytes=None, batch_size=None, emulator_host=None):
+	"""Consume Meet events from Pub/Sub with streaming pull instead of push."""
+	from vidcon.vidcon.doctype.vidcon_meeting import pubsub_pull
+
+	site = get_site(context)
+	frappe.init(site=site)
+	frappe.connect()
+
+	try:
+		subscription = subscription or frappe.db.get_single_value("VidCon Settings", "pubsub_pull_subscription")
+		if not subscription:
+			raise click.UsageError("Pass --subscription or set Pull Subscription in VidCon Settings")
+
+		pubsub_pull.run(
+			subscription,
+			max_messages=max_messages,
+			max_bytes=max_bytes,
+			batch_size=batch_size,
+			emulator_host=emulator_host
+		)
+	except ImportError:
+		raise click.ClickException("google-cloud-pubsub is required: bench pip install 'vidcon[pubsub]'")
+	finally:
+		frappe.destroy()
+
+
+commands = [pull_events]
@@ -145,11 +145,31 @@ app_license = "mit"
 # 	}
 # }
 
+# Meet Events
+# -----------
+# Handlers for Google Workspace Events (CloudEvents type -> dotted path).
+# Declare a handler with event_registry.event_handler(queue=...) to run it in the background.
+
+vidcon_event_handlers = {
+	"google.workspace.meet.conference.v2.started": "vidcon.vidcon.doctype.vidcon_meeting.google_meet_events.handle_conference_started",
+	"google.workspace.meet.conference.v2.ended": "vidcon.vidcon.doctype.vidcon_meeting.google_meet_events.handle_conference_ended",
+	"google.workspace.meet.participant.v2.joined": "vidcon.vidcon.doctype.vidcon_meeting.google_meet_events.handle_participant_joined",
+	"google.workspace.meet.participant.v2.left": "vidcon.vidcon.doctype.vidcon_meeting.google_meet_events.handle_participant_left",
+	"google.workspace.meet.recording.v2.fileGenerated": "vidcon.vidcon.doctype.vidcon_meeting.google_meet_events.handle_recording_ready",
+	"google.workspace.meet.transcript.v2.fileGenerated": "vidcon.vidcon.doctype.vidcon_meeting.google_meet_events.handle_transcript_ready"
+}
+
 # Scheduled Tasks
 # ---------------
 
 scheduler_events = {
 	"cron": {
+		"* * * * *": [
+			"vidcon.vidcon.doctype.vidcon_event_log.event_log_writer.flush_event_log_buffer",
+			"vidcon.vidcon.doctype.vidcon_meeting.conference_lanes.drain_stalled_lanes",
+			"vidcon.vidcon.doctype.vidcon_meeting.attendee_tracker.flush_stalled_attendees",
+			"vidcon.vidcon.doctype.vidcon_meeting.transcript_retries.enqueue_due_transcript_fetches"
+		],
 		"*/15 * * * *": [
 			"vidcon.vidcon.doctype.vidcon_meeting.scheduled_tasks.check_pending_transcripts"
 		]
@@ -0,0 +1,34 @@
+import frappe
+
+
+def execute():
+	"""
+	Clear duplicate event IDs in VidCon Event Log before event_id becomes unique.
+	
+	Pub/Sub redeliveries used to be logged as new rows. The earliest row for each
+	event_id keeps it; later duplicates and empty IDs are set to NULL so the
+	unique index can be built.
+	"""
+	if not frappe.db.table_exists("VidCon Event Log"):
+		return
+	
+	frappe.db.sql("""
+		update `tabVidCon Event Log`
+		set event_id = NULL
+		where event_id = ''
+	""")
+	
+	frappe.db.sql("""
+		update `tabVidCon Event Log` log
+		join (
+			select event_id, min(creation) as first_creation
+			from `tabVidCon Event Log`
+			where event_id is not null
+			group by event_id
+			having count(*) > 1
+		) dup on log.event_id = dup.event_id
+		set log.event_id = NULL
+		where log.creation > dup.first_creation
+	""")
+	
+	frappe.db.commit()
@@ -0,0 +1,29 @@
+import frappe
+
+from vidcon.vidcon.doctype.vidcon_meeting.meet_utils import normalize_meeting_code
+
+
+def execute():
+	"""
+	Backfill google_space_id with the normalized meeting code of each meeting.
+	
+	google_space_id already held the last path segment of the Meet link, so it
+	is the indexed meeting code key rather than a second column holding the
+	same value. Older meetings stored that segment as-is (mixed case, query
+	strings), which exact lookups can't match. Meetings whose link has no
+	recognizable code keep what they have.
+	"""
+	meetings = frappe.get_all(
+		"VidCon Meeting",
+		filters={"google_meet_link": ["is", "set"]},
+		fields=["name", "google_meet_link", "google_space_id"]
+	)
+	
+	meeting_codes = {}
+	for meeting in meetings:
+		meeting_code = normalize_meeting_code(meeting.google_meet_link) or normalize_meeting_code(meeting.google_space_id)
+		if meeting_code and meeting_code != meeting.google_space_id:
+			meeting_codes[meeting.name] = {"google_space_id": meeting_code}
+	
+	if meeting_codes:
+		frappe.db.bulk_update("VidCon Meeting", meeting_codes, update_modified=False)
@@ -5,8 +5,77 @@
 Tests for Google Meet webhook event handling
 """
 
+import base64
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from unittest.mock import patch
+
 import frappe
+import httplib2
 from typing import Dict, Any
+from frappe.model.naming import set_new_name
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils.background_jobs import create_job_id, get_redis_conn
+from googleapiclient.errors import HttpError
+
+from vidcon.vidcon.doctype.vidcon_meeting import (
+	attendee_tracker,
+	conference_lanes,
+	event_registry,
+	google_clients,
+	google_transport,
+	meet_utils,
+	meeting_resolver,
+	participant_identity,
+	pubsub_envelope,
+	scheduled_tasks,
+	subscription_manager,
+	transcript_pipeline,
+	transcript_retries,
+	transcript_store,
+	vidcon_logger
+)
+from vidcon.vidcon.doctype.vidcon_meeting.attendee_tracker import apply_session_event
+from vidcon.vidcon.doctype.vidcon_meeting.conference_lanes import get_order_field, is_late, parse_publish_time
+from vidcon.vidcon.doctype.vidcon_meeting.google_meet_events import (
+	TRANSCRIPT_ENTRIES_PAGE_SIZE,
+	format_transcript_entry,
+	iter_transcript_entry_pages,
+	store_conference_transcript,
+	store_transcript_document
+)
+from vidcon.vidcon.doctype.vidcon_meeting.meet_utils import (
+	create_space_subscriptions,
+	normalize_meeting_code,
+	queue_subscription_deletion
+)
+from vidcon.vidcon.doctype.vidcon_meeting.meeting_resolver import (
+	find_open_meeting,
+	get_space_resource,
+	get_subscription_name
+)
+from vidcon.vidcon.doctype.vidcon_meeting.metrics import get_counters
+from vidcon.vidcon.doctype.vidcon_meeting.pubsub_envelope import decode_envelope, decode_pulled_message
+from vidcon.vidcon.doctype.vidcon_meeting.pubsub_pull import process_batch
+from vidcon.vidcon.doctype.vidcon_meeting.scheduled_tasks import get_meetings_after_watermark
+from vidcon.vidcon.doctype.vidcon_meeting.transcript_retries import (
+	RETRY_BASE_DELAY,
+	RETRY_MAX_DELAY,
+	get_backoff_delay
+)
+from vidcon.vidcon.doctype.vidcon_meeting.vidcon_logger import get_logger, parse_sample_rates
+
+
+CONFERENCE_STARTED = "google.workspace.meet.conference.v2.started"
+CONFERENCE_ENDED = "google.workspace.meet.conference.v2.ended"
+PARTICIPANT_JOINED = "google.workspace.meet.participant.v2.joined"
+PARTICIPANT_LEFT = "google.workspace.meet.participant.v2.left"
+SUBSCRIPTION = "projects/p/subscriptions/s"
+SESSION_NAME = "conferenceRecords/conf1/participants/part1/participantSessions/session1"
 
 
 def test_handle_transcript_ready():
@@ -47,3 +116,1664 @@ def test_meeting_creation_from_event():
 	# 3. Event link is stored
 	
 	pass  # Remove this when implementing actual test
+
+
+class TestEventDeduplication(FrappeTestCase):
+	def test_duplicate_event_is_acked_without_processing(self):
+		"""Test a redelivery within the Redis window is acked without logging or applying it"""
+		from vidcon.vidcon.doctype.vidcon_meeting import google_meet_events
+
+		event_id = frappe.generate_hash()
+		self.addCleanup(google_meet_events.release_event, event_id)
+		google_meet_events.is_duplicate_event(event_id)
+		google_meet_events.confirm_event(event_id)
+
+		envelope = decode_pulled_message(SUBSCRIPTION, FakeMessage(event_id))
+
+		with patch.object(google_meet_events, "log_event", side_effect=AssertionError) as log_event, \
+				patch.object(google_meet_events, "apply_event", side_effect=AssertionError) as apply_event:
+			self.assertEqual(
+				google_meet_events.receive_pubsub_envelope(envelope),
+				{"status": "ok", "duplicate": True}
+			)
+
+		log_event.assert_not_called()
+		apply_event.assert_not_called()
+
+	def test_event_claim_released_on_failure(self):
+		"""Test a failed event's claim is dropped so its redelivery is processed"""
+		from vidcon.vidcon.doctype.vidcon_meeting.google_meet_events import (
+			EVENT_CLAIM_TIMEOUT,
+			confirm_event,
+			get_event_dedup_key,
+			is_duplicate_event,
+			release_event
+		)
+
+		event_id = frappe.generate_hash()
+		self.addCleanup(release_event, event_id)
+
+		self.assertFalse(is_duplicate_event(event_id))
+		self.assertTrue(is_duplicate_event(event_id))
+		self.assertLessEqual(frappe.cache.ttl(get_event_dedup_key(event_id)), EVENT_CLAIM_TIMEOUT)
+
+		release_event(event_id)
+		self.assertFalse(is_duplicate_event(event_id))
+
+		confirm_event(event_id)
+		self.assertGreater(frappe.cache.ttl(get_event_dedup_key(event_id)), EVENT_CLAIM_TIMEOUT)
+		self.assertTrue(is_duplicate_event(event_id))
+
+	def test_log_event_rejects_logged_event_id(self):
+		"""Test the unique index on event_id catches duplicates once the Redis claim is gone"""
+		from vidcon.vidcon.doctype.vidcon_meeting.google_meet_events import log_event
+
+		event_id = frappe.generate_hash()
+		self.addCleanup(self.delete_event_logs, event_id)
+
+		kwargs = {
+			"event_type": CONFERENCE_STARTED,
+			"event_id": event_id,
+			"subscription_id": SUBSCRIPTION,
+			"event_data": {},
+			"raw_payload": "{}"
+		}
+
+		log_name = log_event(**kwargs)
+		self.assertEqual(frappe.db.get_value("VidCon Event Log", log_name, "event_id"), event_id)
+		self.assertIsNone(log_event(**kwargs))
+		self.assertEqual(frappe.db.count("VidCon Event Log", {"event_id": event_id}), 1)
+
+	@staticmethod
+	def delete_event_logs(event_id):
+		for name in frappe.get_all("VidCon Event Log", filters={"event_id": event_id}, pluck="name"):
+			frappe.delete_doc("VidCon Event Log", name, ignore_permissions=True, force=True)
+		frappe.db.commit()
+
+
+class TestEventLogBuffer(FrappeTestCase):
+	def setUp(self):
+		from vidcon.vidcon.doctype.vidcon_event_log.event_log_writer import BUFFER_KEY, make_key
+
+		self.event_id = frappe.generate_hash()
+		get_redis_conn().delete(make_key(BUFFER_KEY))
+
+	def tearDown(self):
+		for name in frappe.get_all("VidCon Event Log", filters={"event_id": self.event_id}, pluck="name"):
+			frappe.delete_doc("VidCon Event Log", name, ignore_permissions=True, force=True)
+		frappe.db.commit()
+
+	def test_buffered_rows_written_in_one_flush(self):
+		"""Test buffered rows are inserted by a flush, skipping logged event IDs and dispatching the rest"""
+		from vidcon.vidcon.doctype.vidcon_event_log.event_log_writer import (
+			buffer_event_log,
+			flush_event_log_buffer
+		)
+
+		row = {
+			"event_type": CONFERENCE_STARTED,
+			"event_id": self.event_id,
+			"subscription_id": SUBSCRIPTION,
+			"received_at": frappe.utils.now(),
+			"status": "Received",
+			"raw_payload": "{}"
+		}
+
+		with patch.object(frappe, "enqueue") as enqueue:
+			buffer_event_log(row, dispatch=True)
+			buffer_event_log(row, dispatch=True)
+
+			self.assertFalse(frappe.db.exists("VidCon Event Log", {"event_id": self.event_id}))
+			enqueue.reset_mock()
+
+			flush_event_log_buffer()
+
+		log_names = frappe.get_all("VidCon Event Log", filters={"event_id": self.event_id}, pluck="name")
+		self.assertEqual(len(log_names), 1)
+		self.assertEqual(
+			[call.kwargs["log_name"] for call in enqueue.call_args_list],
+			log_names
+		)
+
+
+def test_parse_sample_rates():
+	"""Test sample rates are read one per line and clamped to [0, 1]"""
+	assert parse_sample_rates("webhook=0.1\nhandlers = 2\n*=-1\ninvalid\n=0.5") == {
+		"webhook": 0.1,
+		"handlers": 1,
+		"*": 0
+	}
+	assert parse_sample_rates("") == {}
+
+
+def test_debug_and_info_sampled_per_category():
+	"""Test DEBUG/INFO follow the category's sample rate while warnings are always kept"""
+	config = {"level": 0, "sample_rates": {"webhook": 0, "*": 1}, "skip_error_log": 1}
+
+	with patch.object(vidcon_logger, "get_config", return_value=config):
+		assert not get_logger("webhook").is_enabled_for(logging.INFO)
+		assert get_logger("webhook").is_enabled_for(logging.WARNING)
+		assert get_logger("handlers").is_enabled_for(logging.DEBUG)
+
+
+def test_log_message_without_args_is_not_a_format_string():
+	"""Test a logged message containing % is written as-is"""
+	config = {"level": 0, "sample_rates": {}, "skip_error_log": 1}
+
+	with patch.object(vidcon_logger, "get_config", return_value=config), \
+			patch.object(vidcon_logger, "get_sink") as get_sink:
+		get_logger("test").warning("GET https://example.com/a%20b failed 100%")
+		get_logger("test").warning("%s events", 3)
+
+	formatted = [call.args[1] % call.args[2:] for call in get_sink().log.call_args_list]
+	assert formatted[0].endswith("[test] GET https://example.com/a%20b failed 100%")
+	assert formatted[1].endswith("[test] 3 events")
+
+
+class TestEventRegistry(FrappeTestCase):
+	def setUp(self):
+		self.calls = []
+		patcher = patch.object(event_registry, "log")
+		patcher.start()
+		self.addCleanup(patcher.stop)
+
+	def record(self, name):
+		def handler(event_data, attributes=None):
+			self.calls.append(name)
+
+		return handler
+
+	def fail(self, event_data, attributes=None):
+		raise ValueError("Handler failed")
+
+	def test_handlers_resolved_from_hooks(self):
+		"""Test every handler declared in hooks is resolved once, skipping invalid paths"""
+		hooks = {CONFERENCE_STARTED: ["myapp.meet.on_started", "myapp.meet.missing"]}
+
+		def get_attr(path):
+			if path.endswith("missing"):
+				raise AttributeError(path)
+			return self.record(path)
+
+		with patch.object(frappe, "get_hooks", return_value=hooks), patch.object(frappe, "get_attr", side_effect=get_attr):
+			registry = event_registry.load_registry()
+
+		self.assertEqual([path for path, handler in registry[CONFERENCE_STARTED]], ["myapp.meet.on_started"])
+
+	def test_all_handlers_run_when_one_fails(self):
+		"""Test a failing handler doesn't stop the others, and its error is raised afterwards"""
+		handlers = [("a", self.record("a")), ("b", self.fail), ("c", self.record("c"))]
+		errors = get_counters().get("handler:b:errors", 0)
+
+		with patch.object(event_registry, "get_handlers", return_value=handlers):
+			with self.assertRaises(ValueError):
+				event_registry.dispatch(CONFERENCE_STARTED, {})
+
+		self.assertEqual(self.calls, ["a", "c"])
+		self.assertEqual(get_counters().get("handler:b:errors", 0), errors + 1)
+
+	def test_queued_handler_enqueued(self):
+		"""Test a handler declared with a queue is enqueued instead of run inline"""
+		handler = event_registry.event_handler(queue="long", timeout=60)(self.record("queued"))
+
+		with patch.object(event_registry, "get_handlers", return_value=[("queued", handler)]), \
+				patch.object(frappe, "enqueue") as enqueue:
+			event_registry.dispatch(CONFERENCE_STARTED, {"key": "value"})
+
+		self.assertEqual(self.calls, [])
+		self.assertEqual(enqueue.call_args.kwargs["queue"], "long")
+		self.assertEqual(enqueue.call_args.kwargs["timeout"], 60)
+		self.assertEqual(enqueue.call_args.kwargs["path"], "queued")
+
+	def test_unhandled_event_counted(self):
+		"""Test an event type without handlers increments unhandled_events"""
+		unhandled = get_counters().get("unhandled_events", 0)
+
+		with patch.object(event_registry, "get_handlers", return_value=[]):
+			event_registry.dispatch("google.workspace.meet.unknown.v2.event", {})
+
+		self.assertEqual(get_counters().get("unhandled_events", 0), unhandled + 1)
+
+
+def test_parse_publish_time():
+	"""Test publishTime with nanosecond fractions orders correctly"""
+	assert parse_publish_time("1970-01-01T00:00:10Z") == 10
+	assert parse_publish_time("1970-01-01T00:00:10.123456789Z") == 10.123456789
+	assert parse_publish_time("2026-10-16T09:00:00.000000001Z") > parse_publish_time("2026-10-16T09:00:00Z")
+
+
+def test_parse_publish_time_invalid():
+	"""Test a missing or unparseable publishTime sorts as now"""
+	before = time.time()
+	assert before <= parse_publish_time(None) <= time.time()
+	assert before <= parse_publish_time("yesterday") <= time.time()
+
+
+def test_get_order_field():
+	"""Test lifecycle events are ordered per conference and sessions per participant"""
+	assert get_order_field(CONFERENCE_STARTED, {}) == "conference"
+	assert get_order_field(CONFERENCE_ENDED, {}) == "conference"
+	assert (
+		get_order_field(PARTICIPANT_LEFT, {"participantSession": {"name": SESSION_NAME}})
+		== "conferenceRecords/conf1/participants/part1"
+	)
+	assert get_order_field(PARTICIPANT_JOINED, {"participantSession": {"name": "invalid"}}) is None
+	assert get_order_field("google.workspace.meet.transcript.v2.fileGenerated", {}) is None
+
+
+def test_is_late():
+	"""Test an event is late only if published before the last one applied"""
+	assert not is_late(None, 10.0)
+	assert not is_late(b"10.0", 10.0)
+	assert not is_late(b"10.0", 11.5)
+	assert is_late(b"10.0", 9.999)
+
+
+class TestConferenceLanes(FrappeTestCase):
+	def setUp(self):
+		self.conference_id = frappe.generate_hash(length=12)
+		self.addCleanup(self.delete_lane)
+
+		patcher = patch("vidcon.vidcon.doctype.vidcon_meeting.participant_identity.prefetch_participants")
+		patcher.start()
+		self.addCleanup(patcher.stop)
+
+	def delete_lane(self):
+		conn = get_redis_conn()
+		for prefix in (conference_lanes.LANE_KEY_PREFIX, conference_lanes.APPLIED_KEY_PREFIX):
+			conn.delete(conference_lanes.make_key(prefix + self.conference_id))
+		conn.srem(conference_lanes.make_key(conference_lanes.ACTIVE_LANES_KEY), self.conference_id)
+
+	def submit(self, events):
+		"""Queue (publish_time, event_type, event_id, event_data) tuples, then drain the lane."""
+		with patch.object(frappe, "enqueue") as enqueue:
+			for publish_time, event_type, event_id, event_data in events:
+				conference_lanes.submit(self.conference_id, publish_time, event_type, event_id, event_data)
+
+		self.assertEqual(
+			{call.kwargs["job_id"] for call in enqueue.call_args_list},
+			{conference_lanes.get_drain_job_id(self.conference_id)}
+		)
+
+		with patch("vidcon.vidcon.doctype.vidcon_meeting.google_meet_events.apply_event") as apply_event:
+			conference_lanes.drain(self.conference_id)
+
+		return [call.args[0] for call in apply_event.call_args_list]
+
+	def test_submit_only_enqueues_drain(self):
+		"""Test submitting an event queues it without applying it in the caller"""
+		with patch.object(frappe, "enqueue") as enqueue, \
+				patch("vidcon.vidcon.doctype.vidcon_meeting.google_meet_events.apply_event") as apply_event:
+			conference_lanes.submit(self.conference_id, "2026-10-16T09:00:00Z", CONFERENCE_STARTED, "started", {})
+
+		apply_event.assert_not_called()
+		self.assertEqual(enqueue.call_args.kwargs["queue"], conference_lanes.DRAIN_QUEUE)
+		self.assertTrue(enqueue.call_args.kwargs["deduplicate"])
+
+	def test_events_applied_in_publish_order(self):
+		"""Test an ended event queued before its started event is applied after it"""
+		applied = self.submit([
+			("2026-10-16T10:00:00Z", CONFERENCE_ENDED, "ended", {}),
+			("2026-10-16T09:00:00Z", CONFERENCE_STARTED, "started", {})
+		])
+
+		self.assertEqual(applied, [CONFERENCE_STARTED, CONFERENCE_ENDED])
+
+	def test_late_lifecycle_event_is_ignored(self):
+		"""Test a started event arriving after its ended was applied is not applied"""
+		self.assertEqual(self.submit([("2026-10-16T10:00:00Z", CONFERENCE_ENDED, "ended", {})]), [CONFERENCE_ENDED])
+		self.assertEqual(self.submit([("2026-10-16T09:00:00Z", CONFERENCE_STARTED, "started", {})]), [])
+
+	def test_late_join_is_applied_but_late_leave_is_not(self):
+		"""Test participant events are ordered per participant"""
+		event_data = {"participantSession": {"name": SESSION_NAME}}
+
+		self.assertEqual(self.submit([("2026-10-16T09:30:00Z", PARTICIPANT_JOINED, "rejoined", event_data)]), [PARTICIPANT_JOINED])
+		self.assertEqual(
+			self.submit([
+				("2026-10-16T09:00:00Z", PARTICIPANT_JOINED, "joined", event_data),
+				("2026-10-16T09:10:00Z", PARTICIPANT_LEFT, "left", event_data)
+			]),
+			[PARTICIPANT_JOINED]
+		)
+
+	def test_drain_leaves_lane_to_lock_holder(self):
+		"""Test a drain finding the conference locked returns without applying anything"""
+		lock = get_redis_conn().lock(conference_lanes.make_key(conference_lanes.LOCK_KEY_PREFIX + self.conference_id))
+		lock.acquire()
+		self.addCleanup(lock.release)
+
+		self.assertEqual(self.submit([("2026-10-16T09:00:00Z", CONFERENCE_STARTED, "started", {})]), [])
+		self.assertEqual(get_redis_conn().zcard(conference_lanes.make_key(conference_lanes.LANE_KEY_PREFIX + self.conference_id)), 1)
+
+
+def make_push_body(event_data, attributes=None, message_id="123", publish_time="2026-10-16T09:00:00.5Z"):
+	return json.dumps({
+		"message": {
+			"data": base64.b64encode(json.dumps(event_data).encode()).decode(),
+			"attributes": attributes or {},
+			"messageId": message_id,
+			"publishTime": publish_time
+		},
+		"subscription": SUBSCRIPTION
+	})
+
+
+def test_decode_envelope():
+	"""Test a push body is decoded in one pass and kept as-is for storage"""
+	event_data = {"conferenceRecord": {"name": "conferenceRecords/conf1"}}
+	body = make_push_body(event_data, {"ce-type": CONFERENCE_STARTED, "ce-id": "event-1"})
+
+	envelope = decode_envelope(body.encode())
+
+	assert envelope.raw == body
+	assert envelope.event_type == CONFERENCE_STARTED
+	assert envelope.event_id == "event-1"
+	assert envelope.event_data == event_data
+	assert envelope.subscription == SUBSCRIPTION
+	assert envelope.publish_time == "2026-10-16T09:00:00.5Z"
+
+	# An already parsed body is not parsed again
+	with patch.object(pubsub_envelope, "loads", wraps=pubsub_envelope.loads) as loads:
+		assert decode_envelope(body, parsed=json.loads(body)).event_data == event_data
+	assert loads.call_count == 1
+
+
+def test_decode_envelope_without_orjson():
+	"""Test the standard library backend decodes the same envelope"""
+	event_data = {"conferenceRecord": {"name": "conferenceRecords/conf1"}}
+	body = make_push_body(event_data, {"ce-type": CONFERENCE_STARTED, "ce-id": "event-1"})
+
+	with patch.object(pubsub_envelope, "orjson", None):
+		envelope = decode_envelope(body)
+
+	assert envelope.event_data == event_data
+	assert envelope.event_id == "event-1"
+
+
+def test_decode_envelope_falls_back_to_message_id():
+	"""Test the messageId is the event ID and the data carries the type when there are no ce-* attributes"""
+	envelope = decode_envelope(make_push_body({"eventType": CONFERENCE_ENDED}, message_id="456"))
+
+	assert envelope.event_id == "456"
+	assert envelope.event_type == CONFERENCE_ENDED
+
+
+def test_decode_envelope_without_message():
+	"""Test a body without a message is rejected"""
+	assert decode_envelope(json.dumps({"subscription": SUBSCRIPTION})) is None
+
+
+class FakeMessage:
+	"""Stands in for google.cloud.pubsub_v1.subscriber.message.Message"""
+
+	def __init__(self, event_id, message_id="123"):
+		self.data = json.dumps({"conferenceRecord": {"name": "conferenceRecords/conf1"}}).encode()
+		self.attributes = {"ce-type": CONFERENCE_STARTED, "ce-id": event_id}
+		self.message_id = message_id
+		self.publish_time = datetime(2026, 10, 16, 9, 0, 0, 500000, tzinfo=timezone.utc)
+		self.acked = False
+		self.nacked = False
+
+	def ack(self):
+		self.acked = True
+
+	def nack(self):
+		self.nacked = True
+
+
+def test_decode_pulled_message():
+	"""Test a pulled message decodes like its push delivery"""
+	envelope = decode_pulled_message(SUBSCRIPTION, FakeMessage("event-1"))
+
+	assert envelope.publish_time == "2026-10-16T09:00:00.500000Z"
+	assert parse_publish_time(envelope.publish_time) == parse_publish_time("2026-10-16T09:00:00.5Z")
+	assert envelope.event_id == "event-1"
+	assert envelope.event_type == CONFERENCE_STARTED
+	assert envelope.event_data == {"conferenceRecord": {"name": "conferenceRecords/conf1"}}
+
+	stored = json.loads(envelope.raw)
+	assert stored["subscription"] == SUBSCRIPTION
+	assert stored["message"]["publishTime"] == envelope.publish_time
+
+
+class TestPullWorker(FrappeTestCase):
+	def process(self, messages, side_effect=None):
+		received = []
+
+		def receive(envelope):
+			received.append(envelope.event_id)
+			if side_effect:
+				side_effect(envelope)
+
+		with patch(
+			"vidcon.vidcon.doctype.vidcon_meeting.google_meet_events.receive_pubsub_envelope",
+			side_effect=receive
+		), patch.object(frappe.db, "commit") as commit, patch.object(frappe.db, "rollback"):
+			process_batch(SUBSCRIPTION, messages)
+
+		return received, commit.call_count
+
+	def test_messages_acked_after_commit(self):
+		"""Test pulled messages take the push path and are acked once committed"""
+		messages = [FakeMessage("event-1", "1"), FakeMessage("event-2", "2")]
+
+		received, commits = self.process(messages)
+
+		self.assertEqual(received, ["event-1", "event-2"])
+		self.assertEqual(commits, 2)
+		self.assertTrue(all(m.acked and not m.nacked for m in messages))
+
+	def test_failed_message_nacked(self):
+		"""Test a message failing outside its handlers is nacked without affecting the rest"""
+		messages = [FakeMessage("event-1", "1"), FakeMessage("event-2", "2")]
+
+		def fail_first(envelope):
+			if envelope.event_id == "event-1":
+				raise Exception("Database unavailable")
+
+		received, commits = self.process(messages, side_effect=fail_first)
+
+		self.assertEqual(received, ["event-1", "event-2"])
+		self.assertEqual(commits, 1)
+		self.assertTrue(messages[0].nacked and not messages[0].acked)
+		self.assertTrue(messages[1].acked and not messages[1].nacked)
+
+
+def make_meeting(**values):
+	"""Insert a VidCon Meeting row without its Google Calendar hooks."""
+	meeting = frappe.new_doc("VidCon Meeting")
+	meeting.update({
+		"title": "Test Meeting",
+		"status": "Scheduled",
+		"meeting_date": "2026-10-16",
+		"start_time": "09:00:00",
+		"end_time": "10:00:00",
+		**values
+	})
+	set_new_name(meeting)
+	meeting.db_insert()
+	return meeting.name
+
+
+def test_event_attribute_resources():
+	"""Test the space and subscription are read from ce-subject and ce-source"""
+	attributes = {
+		"ce-subject": "//meet.googleapis.com/spaces/AAAAbbbbCCC",
+		"ce-source": "//workspaceevents.googleapis.com/subscriptions/XYZ"
+	}
+
+	assert get_space_resource(attributes) == "spaces/AAAAbbbbCCC"
+	assert get_subscription_name(attributes) == "subscriptions/XYZ"
+	assert get_space_resource({}) is None
+	assert get_subscription_name(None) is None
+
+
+class TestFindOpenMeeting(FrappeTestCase):
+	def setUp(self):
+		self.space = f"spaces/{frappe.generate_hash(length=12)}"
+		self.subscription = f"subscriptions/{frappe.generate_hash(length=12)}"
+		self.attributes = {
+			"ce-subject": f"//meet.googleapis.com/{self.space}",
+			"ce-source": f"//workspaceevents.googleapis.com/{self.subscription}"
+		}
+
+	def test_space_checked_before_subscription(self):
+		"""Test the meeting of the event's space wins over the subscription's"""
+		by_subscription = make_meeting(meet_subscription_id=self.subscription)
+		self.assertEqual(find_open_meeting(self.attributes), by_subscription)
+
+		by_space = make_meeting(google_space_resource=self.space)
+		self.assertEqual(find_open_meeting(self.attributes), by_space)
+
+	def test_unknown_space_matches_nothing(self):
+		"""Test an event for an unknown space doesn't pick another Scheduled meeting"""
+		make_meeting()
+		self.assertIsNone(find_open_meeting(self.attributes))
+		self.assertIsNone(find_open_meeting({}))
+
+	def test_recurring_meetings_resolve_to_earliest_open(self):
+		"""Test meetings sharing a space resolve to the earliest Scheduled or In Progress one"""
+		make_meeting(google_space_resource=self.space, meeting_date="2026-10-01", status="Completed")
+		later = make_meeting(google_space_resource=self.space, meeting_date="2026-10-23")
+		earliest = make_meeting(google_space_resource=self.space, meeting_date="2026-10-16", status="In Progress")
+
+		self.assertEqual(find_open_meeting(self.attributes), earliest)
+
+		frappe.db.set_value("VidCon Meeting", earliest, "status", "Completed")
+		self.assertEqual(find_open_meeting(self.attributes), later)
+
+	def test_backfill_space_resources(self):
+		"""Test open meetings without a space resource get one, and failed lookups are reported"""
+		from vidcon.vidcon.doctype.vidcon_meeting.meet_utils import backfill_space_resources
+
+		found = make_meeting(google_space_id="abc-defg-hij")
+		missing = make_meeting(google_space_id="xyz-abcd-efg")
+		settings = frappe._dict(enable_meet_events=1, google_calendar="Test Calendar")
+		lookup = {"succeeded": {"abc-defg-hij": self.space}, "failed": {"xyz-abcd-efg": "Not found"}}
+
+		with patch.object(frappe, "get_single", return_value=settings), \
+				patch(
+					"vidcon.vidcon.doctype.vidcon_meeting.subscription_manager.get_space_resource_names",
+					return_value=lookup
+				), patch.object(frappe, "log_error"):
+			result = backfill_space_resources()
+
+		self.assertEqual(result["succeeded"][found], self.space)
+		self.assertEqual(result["failed"][missing], "Not found")
+		self.assertEqual(frappe.db.get_value("VidCon Meeting", found, "google_space_resource"), self.space)
+		self.assertIsNone(frappe.db.get_value("VidCon Meeting", missing, "google_space_resource"))
+
+
+class TestResolveMeeting(FrappeTestCase):
+	def setUp(self):
+		self.conference_id = frappe.generate_hash(length=12)
+		frappe.local.vidcon_meeting_memo = None
+		self.addCleanup(meeting_resolver.clear_binding, self.conference_id)
+
+	def test_bound_conference_cached(self):
+		"""Test a bound conference is looked up once, then served from the memo and Redis"""
+		meeting = make_meeting(google_conference_id=self.conference_id)
+
+		self.assertEqual(meeting_resolver.resolve_meeting(self.conference_id), meeting)
+
+		with patch.object(frappe.db, "get_value", side_effect=AssertionError), \
+				patch.object(meeting_resolver, "find_open_meeting", side_effect=AssertionError):
+			self.assertEqual(meeting_resolver.resolve_meeting(self.conference_id), meeting)
+
+			# Another request: no memo, but the binding is in Redis
+			frappe.local.vidcon_meeting_memo = None
+			self.assertEqual(meeting_resolver.resolve_meeting(self.conference_id), meeting)
+
+	def test_unbound_conference_resolved_by_space(self):
+		"""Test a conference without a bound meeting falls back to its space, once per request"""
+		attributes = {"ce-subject": "//meet.googleapis.com/spaces/AAAAbbbbCCC"}
+
+		with patch.object(meeting_resolver, "find_open_meeting", return_value="VIDCON-MTG-1") as find_open_meeting:
+			self.assertEqual(meeting_resolver.resolve_meeting(self.conference_id, attributes), "VIDCON-MTG-1")
+			self.assertEqual(meeting_resolver.resolve_meeting(self.conference_id, attributes), "VIDCON-MTG-1")
+
+		find_open_meeting.assert_called_once_with(attributes)
+
+	def test_binding_updates_memo(self):
+		"""Test binding a conference replaces what earlier lookups in the request memoized"""
+		with patch.object(meeting_resolver, "find_open_meeting", return_value=None):
+			self.assertIsNone(meeting_resolver.resolve_meeting(self.conference_id))
+
+		meeting_resolver.cache_binding(self.conference_id, "VIDCON-MTG-2")
+		self.assertEqual(meeting_resolver.resolve_meeting(self.conference_id), "VIDCON-MTG-2")
+
+		meeting_resolver.clear_binding(self.conference_id)
+		with patch.object(meeting_resolver, "find_open_meeting", return_value=None):
+			self.assertIsNone(meeting_resolver.resolve_meeting(self.conference_id))
+
+
+def test_normalize_meeting_code():
+	"""Test meeting codes and Meet links normalize to the lowercase code"""
+	assert normalize_meeting_code(" ABC-defg-hij ") == "abc-defg-hij"
+	assert normalize_meeting_code("https://meet.google.com/ABC-DEFG-HIJ?authuser=0") == "abc-defg-hij"
+	assert normalize_meeting_code("meet.google.com/xyz-abcd-efg") == "xyz-abcd-efg"
+	assert normalize_meeting_code("https://example.com/abc-defg-hij") is None
+	assert normalize_meeting_code("abc-defg") is None
+	assert normalize_meeting_code(None) is None
+
+
+class TestMeetingCodes(FrappeTestCase):
+	def test_meeting_code_set_from_link(self):
+		"""Test google_space_id is the lowercase code of the Meet link, whatever its case or query string"""
+		meeting = frappe.new_doc("VidCon Meeting")
+		meeting.google_meet_link = "https://meet.google.com/ABC-DEFG-HIJ?authuser=0"
+		meeting.set_meeting_code()
+		self.assertEqual(meeting.google_space_id, "abc-defg-hij")
+
+		meeting.google_meet_link = None
+		meeting.google_space_id = "XYZ-ABCD-EFG"
+		meeting.set_meeting_code()
+		self.assertEqual(meeting.google_space_id, "xyz-abcd-efg")
+
+	def test_normalize_meeting_codes_patch(self):
+		"""Test codes stored by older versions are normalized and unrecognized links left alone"""
+		from vidcon.patches.normalize_meeting_codes import execute
+
+		stored = make_meeting(
+			google_meet_link="https://meet.google.com/ABC-DEFG-HIJ?authuser=0",
+			google_space_id="ABC-DEFG-HIJ?authuser=0"
+		)
+		unrecognized = make_meeting(google_meet_link="https://example.com/meeting", google_space_id="meeting")
+
+		execute()
+
+		self.assertEqual(frappe.db.get_value("VidCon Meeting", stored, "google_space_id"), "abc-defg-hij")
+		self.assertEqual(frappe.db.get_value("VidCon Meeting", unrecognized, "google_space_id"), "meeting")
+
+
+def test_apply_session_event_keeps_first_join_and_last_leave():
+	"""Test joins and leaves fold into the first join and the last leave"""
+	attendee = frappe._dict(joined_at=None, left_at=None)
+
+	apply_session_event(attendee, "joined", 10)
+	apply_session_event(attendee, "left", 20)
+	apply_session_event(attendee, "left", 15)
+
+	assert attendee.joined_at == 10
+	assert attendee.left_at == 20
+
+
+def test_apply_session_event_late_join():
+	"""Test a join applied after a later leave doesn't clear the leave"""
+	attendee = frappe._dict(joined_at=None, left_at=None)
+
+	apply_session_event(attendee, "left", 20)
+	apply_session_event(attendee, "joined", 10)
+
+	assert attendee.joined_at == 10
+	assert attendee.left_at == 20
+
+
+def test_apply_session_event_rejoin():
+	"""Test rejoining after leaving puts the attendee back in the meeting"""
+	attendee = frappe._dict(joined_at=10, left_at=20)
+
+	apply_session_event(attendee, "joined", 30)
+
+	assert attendee.joined_at == 10
+	assert attendee.left_at is None
+
+
+class TestAttendeeTracker(FrappeTestCase):
+	def setUp(self):
+		self.conference_id = frappe.generate_hash(length=12)
+		self.participant = f"conferenceRecords/{self.conference_id}/participants/"
+		self.addCleanup(self.delete_buffer)
+
+	def delete_buffer(self):
+		conn = get_redis_conn()
+		conn.delete(attendee_tracker.make_key(attendee_tracker.BUFFER_KEY_PREFIX + self.conference_id))
+		conn.srem(attendee_tracker.make_key(attendee_tracker.ACTIVE_BUFFERS_KEY), self.conference_id)
+		conn.zrem(attendee_tracker.make_key(attendee_tracker.FLUSH_DUE_KEY), self.conference_id)
+
+	def buffer(self, meeting, kind, participant, at):
+		with patch.object(frappe, "enqueue") as enqueue:
+			attendee_tracker.buffer_participant_event(self.conference_id, meeting, kind, self.participant + participant, at)
+		return [call.kwargs["job_id"] for call in enqueue.call_args_list]
+
+	def make_meeting(self):
+		# Flushes commit, so the meeting isn't rolled back with the test
+		meeting = make_meeting()
+		self.addCleanup(self.delete_meeting, meeting)
+		return meeting
+
+	@staticmethod
+	def delete_meeting(meeting):
+		frappe.db.delete(attendee_tracker.ATTENDEE_DOCTYPE, {"parent": meeting})
+		frappe.db.delete("VidCon Meeting", {"name": meeting})
+		frappe.db.commit()
+
+	def flush(self, identities=None):
+		with patch.object(attendee_tracker, "get_participant_identities", return_value=identities or {}), \
+				patch.object(attendee_tracker, "drain"):
+			attendee_tracker.flush_attendees(self.conference_id)
+
+	def test_burst_flushed_by_one_job(self):
+		"""Test a burst only enqueues a flush once its coalescing window has passed"""
+		self.assertEqual(self.buffer("VIDCON-MTG-1", "joined", "p1", None), [])
+		self.assertEqual(self.buffer("VIDCON-MTG-1", "joined", "p2", None), [])
+
+		with patch.object(attendee_tracker.time, "time", return_value=time.time() + attendee_tracker.COALESCE_WINDOW + 1):
+			job_ids = self.buffer("VIDCON-MTG-1", "joined", "p3", None)
+
+		self.assertEqual(job_ids, [f"vidcon_flush_attendees:{self.conference_id}"])
+
+	def test_flush_upserts_attendees(self):
+		"""Test invited attendees are matched by name, new participants inserted once, and sessions folded"""
+		meeting = self.make_meeting()
+		invited = frappe.get_doc({
+			"doctype": attendee_tracker.ATTENDEE_DOCTYPE,
+			"parent": meeting,
+			"parenttype": "VidCon Meeting",
+			"parentfield": "attendees",
+			"idx": 1,
+			"attendee_type": "Internal",
+			"full_name": "Ada Lovelace"
+		})
+		set_new_name(invited)
+		invited.db_insert()
+
+		self.buffer(meeting, "joined", "p1", "2026-10-16T09:00:00Z")
+		self.buffer(meeting, "left", "p1", "2026-10-16T09:30:00Z")
+		self.buffer(meeting, "joined", "p2", "2026-10-16T09:05:00Z")
+		self.buffer(meeting, "joined", "p2", "2026-10-16T09:10:00Z")
+		self.flush({
+			self.participant + "p1": {"display_name": "ada lovelace"},
+			self.participant + "p2": {"display_name": "Grace Hopper"}
+		})
+
+		attendees = frappe.get_all(
+			attendee_tracker.ATTENDEE_DOCTYPE,
+			filters={"parent": meeting},
+			fields=["name", "participant_id", "full_name", "joined_at", "left_at"],
+			order_by="idx asc"
+		)
+
+		self.assertEqual(len(attendees), 2)
+		self.assertEqual(attendees[0].name, invited.name)
+		self.assertEqual(attendees[0].participant_id, self.participant + "p1")
+		self.assertEqual(attendees[0].full_name, "Ada Lovelace")
+		self.assertTrue(attendees[0].joined_at < attendees[0].left_at)
+		self.assertEqual(attendees[1].full_name, "Grace Hopper")
+		self.assertEqual(attendees[1].joined_at, attendee_tracker.to_system_datetime("2026-10-16T09:05:00Z"))
+		self.assertIsNone(attendees[1].left_at)
+
+	def test_busy_conference_flush_due_again(self):
+		"""Test a flush finding the lane lock taken marks the conference due instead of waiting"""
+		meeting = self.make_meeting()
+		self.buffer(meeting, "joined", "p1", None)
+
+		lock = get_redis_conn().lock(attendee_tracker.make_key(attendee_tracker.LOCK_KEY_PREFIX + self.conference_id))
+		lock.acquire()
+		self.addCleanup(lock.release)
+
+		self.flush()
+
+		conn = get_redis_conn()
+		self.assertEqual(conn.llen(attendee_tracker.make_key(attendee_tracker.BUFFER_KEY_PREFIX + self.conference_id)), 1)
+		self.assertIsNotNone(conn.zscore(attendee_tracker.make_key(attendee_tracker.FLUSH_DUE_KEY), self.conference_id))
+		self.assertFalse(frappe.db.exists(attendee_tracker.ATTENDEE_DOCTYPE, {"parent": meeting}))
+
+
+class FakeRequest:
+	def __init__(self, response):
+		self.response = response
+
+	def execute(self):
+		return self.response
+
+
+class FakeParticipantsResource:
+	"""Stands in for meet_service.conferenceRecords().participants()"""
+
+	def __init__(self, pages, extra=None):
+		self.pages = pages
+		self.extra = extra or {}
+		self.list_calls = []
+		self.get_calls = []
+
+	def conferenceRecords(self):
+		return self
+
+	def participants(self):
+		return self
+
+	def list(self, parent, pageSize, pageToken=None):
+		self.list_calls.append(pageToken)
+		return FakeRequest(self.pages[int(pageToken or 0)])
+
+	def get(self, name):
+		self.get_calls.append(name)
+		return FakeRequest(self.extra[name])
+
+
+def make_participant(name, display_name):
+	return {"name": name, "signedinUser": {"displayName": display_name, "user": f"users/{display_name}"}}
+
+
+class TestParticipantIdentities(FrappeTestCase):
+	def setUp(self):
+		self.conference_id = frappe.generate_hash(length=12)
+		self.conference_name = f"conferenceRecords/{self.conference_id}"
+		self.names = [f"{self.conference_name}/participants/{i}" for i in range(3)]
+		self.addCleanup(self.delete_cache)
+
+		patcher = patch.dict(participant_identity._lru, clear=True)
+		patcher.start()
+		self.addCleanup(patcher.stop)
+
+	def delete_cache(self):
+		frappe.cache.delete_value(participant_identity.CACHE_KEY_PREFIX + self.conference_name)
+		frappe.cache.delete(frappe.cache.make_key(participant_identity.LISTED_KEY_PREFIX + self.conference_name))
+
+	def make_service(self):
+		return FakeParticipantsResource(
+			pages=[
+				{"participants": [make_participant(self.names[0], "Ada")], "nextPageToken": "1"},
+				{"participants": [make_participant(self.names[1], "Grace")]}
+			],
+			extra={self.names[2]: make_participant(self.names[2], "Linus")}
+		)
+
+	def test_list_follows_pages(self):
+		"""Test the conference's participants are listed across pages into Redis"""
+		service = self.make_service()
+
+		with patch.object(participant_identity, "get_meet_service", return_value=service):
+			participant_identity.list_conference_participants(self.conference_name)
+
+		self.assertEqual(service.list_calls, [None, "1"])
+		cached = frappe.cache.get_value(participant_identity.CACHE_KEY_PREFIX + self.conference_name)
+		self.assertEqual(cached[self.names[1]]["display_name"], "Grace")
+
+	def test_lookups_served_from_cache(self):
+		"""Test listed participants resolve without API calls, then from the process LRU"""
+		service = self.make_service()
+
+		with patch.object(participant_identity, "get_meet_service", return_value=service):
+			participant_identity.list_conference_participants(self.conference_name)
+			identities = participant_identity.get_participant_identities(self.names[:2])
+
+			with patch.object(frappe.cache, "get_value", side_effect=AssertionError):
+				self.assertEqual(participant_identity.get_participant_identities(self.names[:2]), identities)
+
+		self.assertEqual(identities[self.names[0]]["display_name"], "Ada")
+		self.assertEqual(service.list_calls, [None, "1"])
+		self.assertEqual(service.get_calls, [])
+
+	def test_missing_participant_fetched_once(self):
+		"""Test a participant joined since the list is fetched individually, then cached"""
+		service = self.make_service()
+
+		with patch.object(participant_identity, "get_meet_service", return_value=service):
+			participant_identity.list_conference_participants(self.conference_name)
+			identities = participant_identity.get_participant_identities(self.names)
+			participant_identity._lru.clear()
+			participant_identity.get_participant_identities(self.names)
+
+		self.assertEqual(identities[self.names[2]]["display_name"], "Linus")
+		self.assertEqual(service.get_calls, [self.names[2]])
+
+	def test_prefetch_gates_lists(self):
+		"""Test one list is enqueued per refresh interval, and lookups wait for it"""
+		service = self.make_service()
+
+		with patch.object(frappe, "enqueue") as enqueue:
+			participant_identity.prefetch_participants(self.conference_id)
+			participant_identity.prefetch_participants(self.conference_id)
+
+		self.assertEqual(enqueue.call_count, 1)
+		self.assertEqual(enqueue.call_args.kwargs["conference_name"], self.conference_name)
+
+		# The list is queued: missing participants are left for a later flush
+		with patch.object(participant_identity, "get_meet_service", return_value=service):
+			self.assertEqual(participant_identity.get_participant_identities(self.names), {})
+		self.assertEqual(service.get_calls, [])
+
+	def test_failed_list_releases_gate(self):
+		"""Test a failed list lets the conference's next event enqueue another"""
+		with patch.object(frappe, "enqueue"):
+			participant_identity.prefetch_participants(self.conference_id)
+
+		with patch.object(participant_identity, "get_meet_service", side_effect=Exception("Unavailable")), \
+				patch.object(participant_identity, "log"):
+			participant_identity.list_conference_participants(self.conference_name)
+
+		with patch.object(frappe, "enqueue") as enqueue:
+			participant_identity.prefetch_participants(self.conference_id)
+
+		self.assertEqual(enqueue.call_count, 1)
+
+
+class TestAccessTokenCache(FrappeTestCase):
+	def setUp(self):
+		self.calendar = f"Test Calendar {frappe.generate_hash(length=8)}"
+		self.addCleanup(subscription_manager.clear_vidcon_access_token, self.calendar)
+
+	def request_token(self, expires_in=3600):
+		return patch.object(
+			subscription_manager,
+			"request_access_token",
+			return_value={"access_token": frappe.generate_hash(), "expires_in": expires_in}
+		)
+
+	def test_token_reused_until_margin(self):
+		"""Test repeated calls reuse one token, keyed by calendar and scope set"""
+		with self.request_token() as request_access_token:
+			token = subscription_manager.get_vidcon_access_token(self.calendar)
+			self.assertEqual(subscription_manager.get_vidcon_access_token(self.calendar), token)
+
+			# Same scopes in another order share the token
+			scopes = " ".join(reversed(subscription_manager.VIDCON_SCOPES.split()))
+			self.assertEqual(subscription_manager.get_vidcon_access_token(self.calendar, scopes), token)
+
+		request_access_token.assert_called_once()
+
+	def test_short_lived_token_not_cached(self):
+		"""Test a token expiring within the margin is used once but not cached"""
+		with self.request_token(expires_in=subscription_manager.TOKEN_EXPIRY_MARGIN) as request_access_token:
+			subscription_manager.get_vidcon_access_token(self.calendar)
+			subscription_manager.get_vidcon_access_token(self.calendar)
+
+		self.assertEqual(request_access_token.call_count, 2)
+
+	def test_waiting_worker_gets_refreshed_token(self):
+		"""Test a worker that waited for the refresh lock uses the token refreshed meanwhile"""
+		cache_key = subscription_manager.get_access_token_cache_key(self.calendar, subscription_manager.VIDCON_SCOPES)
+		refreshed = {"access_token": "refreshed", "expires_at": time.time() + 3600}
+		cached = iter([None, refreshed])
+
+		with self.request_token() as request_access_token, patch.object(
+			subscription_manager, "get_cached_access_token", side_effect=lambda key: next(cached)
+		) as get_cached_access_token:
+			self.assertEqual(subscription_manager.get_vidcon_access_token(self.calendar), "refreshed")
+
+		get_cached_access_token.assert_called_with(cache_key)
+		request_access_token.assert_not_called()
+
+	def test_reauthorizing_drops_token(self):
+		"""Test clearing a calendar's token makes the next call request a new one"""
+		with self.request_token() as request_access_token:
+			token = subscription_manager.get_vidcon_access_token(self.calendar)
+			subscription_manager.clear_vidcon_access_token(self.calendar)
+			self.assertNotEqual(subscription_manager.get_vidcon_access_token(self.calendar), token)
+
+		self.assertEqual(request_access_token.call_count, 2)
+
+	def test_token_requests_counted(self):
+		"""Test oauth_token_requests counts calls to the token endpoint"""
+		calendar = frappe._dict(get_password=lambda *args, **kwargs: "refresh-token")
+		google_settings = frappe._dict(client_id="client-id", get_password=lambda *args, **kwargs: "secret")
+		response = frappe._dict(raise_for_status=lambda: None, json=lambda: {"access_token": "token", "expires_in": 3600})
+		requests = get_counters().get("oauth_token_requests", 0)
+
+		with patch.object(frappe, "get_doc", return_value=calendar), \
+				patch.object(frappe, "get_single", return_value=google_settings), \
+				patch.object(subscription_manager, "request", return_value=response) as request:
+			self.assertEqual(subscription_manager.get_vidcon_access_token(self.calendar), "token")
+
+		self.assertEqual(request.call_args.kwargs["data"]["scope"], subscription_manager.VIDCON_SCOPES)
+		self.assertEqual(get_counters().get("oauth_token_requests", 0), requests + 1)
+
+
+class TestGoogleClients(FrappeTestCase):
+	def setUp(self):
+		self.api = f"test{frappe.generate_hash(length=8)}"
+		self.document = json.dumps({"name": self.api})
+		self.addCleanup(self.delete_discovery_file)
+
+		for patcher in (patch.dict(google_clients._discovery, clear=True), patch.object(google_clients, "log")):
+			patcher.start()
+			self.addCleanup(patcher.stop)
+
+		google_clients._services.by_key = {}
+
+	def delete_discovery_file(self):
+		path = google_clients.get_discovery_path(self.api, "v1")
+		if os.path.exists(path):
+			os.remove(path)
+
+	def fetch(self, **kwargs):
+		return patch.object(google_clients, "fetch_discovery_document", return_value=self.document, **kwargs)
+
+	def test_discovery_fetched_once(self):
+		"""Test a discovery document is fetched once, then served from memory and disk"""
+		with self.fetch() as fetch:
+			self.assertEqual(google_clients.get_discovery_document(self.api, "v1")["document"], self.document)
+			google_clients.get_discovery_document(self.api, "v1")
+
+			# A new worker reads what this one saved
+			google_clients._discovery.clear()
+			self.assertEqual(google_clients.get_discovery_document(self.api, "v1")["document"], self.document)
+
+		fetch.assert_called_once_with(self.api, "v1")
+
+	def test_stale_discovery_used_when_google_unreachable(self):
+		"""Test an expired document is still served if it can't be refreshed"""
+		fetched_at = time.time() - 2 * google_clients.DISCOVERY_TTL
+		google_clients._discovery[(self.api, "v1")] = {"document": self.document, "fetched_at": fetched_at}
+
+		with self.fetch(side_effect=Exception("Connection refused")) as fetch:
+			self.assertEqual(google_clients.get_discovery_document(self.api, "v1")["document"], self.document)
+			google_clients.get_discovery_document(self.api, "v1")
+
+		# Not retried on every call
+		fetch.assert_called_once()
+
+	def test_missing_discovery_raises(self):
+		"""Test the fetch error is raised when there is no document to fall back on"""
+		with self.fetch(side_effect=Exception("Connection refused")):
+			with self.assertRaises(Exception):
+				google_clients.get_discovery_document(self.api, "v1")
+
+	def test_service_built_once_per_calendar(self):
+		"""Test get_service returns the same client per site, calendar and API"""
+		with self.fetch(), patch.object(google_clients, "build_from_document", side_effect=lambda *args, **kwargs: object()) as build:
+			service = google_clients.get_service(self.api, "v1", "Calendar A")
+			self.assertIs(google_clients.get_service(self.api, "v1", "Calendar A"), service)
+			self.assertIsNot(google_clients.get_service(self.api, "v1", "Calendar B"), service)
+
+		self.assertEqual(build.call_count, 2)
+
+	def test_credentials_refreshed_from_token_cache(self):
+		"""Test credentials take their token from the shared cache, dropping a token Google rejected"""
+		credentials = google_clients.VidConCredentials("Calendar A")
+		token = {"access_token": "token", "expires_at": time.time() + 3600}
+
+		with patch.object(subscription_manager, "get_vidcon_token", return_value=token), \
+				patch.object(subscription_manager, "clear_vidcon_access_token") as clear_vidcon_access_token:
+			credentials.refresh(None)
+			self.assertEqual(credentials.token, "token")
+			clear_vidcon_access_token.assert_not_called()
+
+			credentials.refresh(None)
+			clear_vidcon_access_token.assert_called_once_with("Calendar A")
+
+
+class TestGoogleTransport(FrappeTestCase):
+	def setUp(self):
+		patcher = patch.dict(google_transport._sessions, clear=True)
+		patcher.start()
+		self.addCleanup(patcher.stop)
+
+	def config(self, *configs):
+		return patch.object(google_transport, "get_transport_config", side_effect=configs)
+
+	def test_session_reused_between_config_checks(self):
+		"""Test requests share one session and only read VidCon Settings once per interval"""
+		with self.config((30, 3, 10)) as get_transport_config:
+			session = google_transport.get_session()
+			self.assertIs(google_transport.get_session(), session)
+			self.assertEqual(google_transport.get_timeout(), 30)
+
+		get_transport_config.assert_called_once()
+
+	def test_session_rebuilt_when_settings_change(self):
+		"""Test a settings change rebuilds the session at the next check, and only then"""
+		later = time.monotonic() + google_transport.CONFIG_CHECK_INTERVAL + 1
+
+		with self.config((30, 3, 10), (30, 3, 10), (60, 5, 20)):
+			session = google_transport.get_session()
+
+			with patch.object(google_transport.time, "monotonic", return_value=later):
+				self.assertIs(google_transport.get_session(), session)
+
+			with patch.object(google_transport.time, "monotonic", return_value=later + google_transport.CONFIG_CHECK_INTERVAL + 1):
+				rebuilt = google_transport.get_session()
+
+		self.assertIsNot(rebuilt, session)
+		self.assertEqual(google_transport.get_timeout(), 60)
+		self.assertEqual(rebuilt.get_adapter("https://meet.googleapis.com").max_retries.total, 5)
+
+	def test_only_idempotent_requests_retried(self):
+		"""Test retryable statuses are retried with Retry-After, but not for POST"""
+		retry = google_transport.create_session(3, 10).get_adapter("https://oauth2.googleapis.com").max_retries
+
+		self.assertEqual(set(retry.status_forcelist), set(google_transport.RETRY_STATUSES))
+		self.assertTrue(retry.respect_retry_after_header)
+		self.assertTrue(retry.is_retry("GET", 503))
+		self.assertFalse(retry.is_retry("POST", 503))
+
+	def test_session_http_adapts_responses(self):
+		"""Test SessionHttp returns what httplib2.Http.request would"""
+		response = frappe._dict(
+			status_code=200,
+			reason="OK",
+			headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+			content=b'{"name": "spaces/abc"}'
+		)
+
+		with patch.object(google_transport, "request", return_value=response) as request:
+			resp, content = google_transport.SessionHttp().request(
+				"https://meet.googleapis.com/v2/spaces/abc",
+				headers={"Authorization": "Bearer token"}
+			)
+
+		self.assertEqual(request.call_args.args, ("GET", "https://meet.googleapis.com/v2/spaces/abc"))
+		self.assertEqual(resp.status, 200)
+		self.assertEqual(resp["content-type"], "application/json")
+		self.assertEqual(resp["-content-encoding"], "gzip")
+		self.assertEqual(resp["content-length"], str(len(content)))
+		self.assertEqual(content, b'{"name": "spaces/abc"}')
+
+
+class FakeBatch:
+	"""Stands in for googleapiclient.http.BatchHttpRequest"""
+
+	def __init__(self, service, callback):
+		self.service = service
+		self.callback = callback
+		self.requests = []
+
+	def add(self, request, request_id):
+		self.requests.append((request_id, request))
+
+	def execute(self):
+		self.service.batches.append(len(self.requests))
+		for request_id, request in self.requests:
+			if isinstance(request, Exception):
+				self.callback(request_id, None, request)
+			else:
+				self.callback(request_id, request, None)
+
+
+class FakeBatchService:
+	def __init__(self):
+		self.batches = []
+
+	def new_batch_http_request(self, callback):
+		return FakeBatch(self, callback)
+
+
+class TestSubscriptionBatches(FrappeTestCase):
+	def setUp(self):
+		patcher = patch.object(frappe, "log_error")
+		self.log_error = patcher.start()
+		self.addCleanup(patcher.stop)
+
+	def test_calls_sent_in_batches(self):
+		"""Test N calls are sent as ceil(N / BATCH_SIZE) batch requests"""
+		service = FakeBatchService()
+		requests = {f"subscriptions/{i}": {"name": f"subscriptions/{i}"} for i in range(250)}
+
+		result = google_clients.execute_batch(service, requests, "Get Subscription Statuses")
+
+		self.assertEqual(service.batches, [100, 100, 50])
+		self.assertEqual(result["succeeded"], requests)
+		self.assertEqual(result["failed"], {})
+
+	def test_failed_call_reported_alone(self):
+		"""Test a failing call is reported without failing the others, and 404s can count as done"""
+		not_found = HttpError(httplib2.Response({"status": 404}), b"Not found")
+		requests = {"a": {"name": "a"}, "b": Exception("Permission denied"), "c": not_found}
+
+		result = google_clients.execute_batch(FakeBatchService(), requests, "Delete Meet Subscriptions", ignore_not_found=True)
+
+		self.assertEqual(result["succeeded"], {"a": {"name": "a"}, "c": None})
+		self.assertEqual(result["failed"], {"b": "Permission denied"})
+		self.log_error.assert_called_once()
+
+	def test_create_space_subscriptions(self):
+		"""Test unknown spaces are looked up in one batch and subscriptions stored for the created ones"""
+		known = make_meeting(google_space_resource="spaces/known")
+		by_link = make_meeting(google_meet_link="https://meet.google.com/abc-defg-hij")
+		no_link = make_meeting()
+		settings = frappe._dict(enable_meet_events=1, google_calendar="Test Calendar", pubsub_topic_name="projects/p/topics/t")
+		lookup = {"succeeded": {"abc-defg-hij": "spaces/looked-up"}, "failed": {}}
+		created = {
+			"succeeded": {known: {"name": "subscriptions/known"}},
+			"failed": {by_link: "Quota exceeded"}
+		}
+
+		with patch.object(frappe, "get_single", return_value=settings), \
+				patch.object(subscription_manager, "get_space_resource_names", return_value=lookup) as get_space_resource_names, \
+				patch.object(subscription_manager, "create_meet_subscriptions", return_value=created) as create_meet_subscriptions:
+			result = create_space_subscriptions([known, by_link, no_link])
+
+		self.assertEqual(list(get_space_resource_names.call_args.args[1]), ["abc-defg-hij"])
+		self.assertEqual(
+			create_meet_subscriptions.call_args.args[1],
+			{known: "spaces/known", by_link: "spaces/looked-up"}
+		)
+		self.assertEqual(result["succeeded"], {known: "subscriptions/known"})
+		self.assertEqual(set(result["failed"]), {by_link, no_link})
+		self.assertEqual(frappe.db.get_value("VidCon Meeting", known, "meet_subscription_id"), "subscriptions/known")
+		self.assertIsNone(frappe.db.get_value("VidCon Meeting", by_link, "meet_subscription_id"))
+
+	def test_queued_deletions_sent_in_one_batch_after_commit(self):
+		"""Test subscriptions of meetings deleted in one transaction are deleted together after commit"""
+		with patch.object(meet_utils, "delete_space_subscriptions") as delete_space_subscriptions:
+			queue_subscription_deletion("subscriptions/a")
+			queue_subscription_deletion("subscriptions/b")
+			delete_space_subscriptions.assert_not_called()
+
+			frappe.db.commit()
+
+		delete_space_subscriptions.assert_called_once_with({"subscriptions/a", "subscriptions/b"})
+
+	def test_queued_deletions_cleared_on_rollback(self):
+		"""Test deletions queued after a rollback still get an after_commit callback"""
+		queue_subscription_deletion("subscriptions/rolled-back")
+		frappe.db.rollback()
+		self.assertIsNone(frappe.local.flags.get("vidcon_subscriptions_to_delete"))
+
+		queue_subscription_deletion("subscriptions/kept")
+		self.assertEqual(frappe.local.flags.vidcon_subscriptions_to_delete, {"subscriptions/kept"})
+		frappe.db.rollback()
+
+
+def test_format_transcript_entry():
+	"""Test transcript entries are labelled with the speaker's display name"""
+	entry = {"participant": "conferenceRecords/c/participants/p", "startTime": "09:00", "text": "Hello 100%"}
+
+	assert format_transcript_entry(entry) == "[09:00] conferenceRecords/c/participants/p: Hello 100%\n"
+	assert format_transcript_entry(entry, {
+		"conferenceRecords/c/participants/p": {"display_name": "Ada"}
+	}) == "[09:00] Ada: Hello 100%\n"
+
+
+class FakeTranscriptsResource:
+	"""Stands in for meet_service.conferenceRecords().transcripts()"""
+
+	def __init__(self, pages):
+		self.pages = pages
+		self.list_calls = []
+
+	def conferenceRecords(self):
+		return self
+
+	def transcripts(self):
+		return self
+
+	def entries(self):
+		return self
+
+	def list(self, parent, pageSize=None, pageToken=None):
+		if parent.startswith("conferenceRecords/") and "/transcripts/" not in parent:
+			return FakeRequest({"transcripts": [{"name": f"{parent}/transcripts/t1"}]})
+
+		self.list_calls.append((pageSize, pageToken))
+		return FakeRequest(self.pages[int(pageToken or 0)])
+
+
+class TestTranscriptStreaming(FrappeTestCase):
+	def make_pages(self, count, per_page):
+		pages = []
+		for page in range(count):
+			entries = [
+				{"participant": "conferenceRecords/c/participants/p", "startTime": f"{page:02}:{i:02}", "text": "Hello"}
+				for i in range(per_page)
+			]
+			pages.append({"entries": entries, "nextPageToken": str(page + 1) if page < count - 1 else None})
+		return pages
+
+	def test_entries_fetched_from_every_page(self):
+		"""Test entries.list is called with the max page size until nextPageToken is empty"""
+		service = FakeTranscriptsResource(self.make_pages(3, 2))
+
+		pages = list(iter_transcript_entry_pages(service, "conferenceRecords/c/transcripts/t1"))
+
+		self.assertEqual([len(entries) for entries in pages], [2, 2, 2])
+		self.assertEqual(service.list_calls, [(TRANSCRIPT_ENTRIES_PAGE_SIZE, None), (TRANSCRIPT_ENTRIES_PAGE_SIZE, "1"), (TRANSCRIPT_ENTRIES_PAGE_SIZE, "2")])
+
+	def test_transcript_streamed_to_file(self):
+		"""Test every entry is written to the attached file in order, and the inline copy is capped"""
+		service = FakeTranscriptsResource(self.make_pages(3, 2))
+		meeting = frappe._dict(name="VIDCON-MTG-TEST", save=lambda **kwargs: None)
+
+		with patch.object(transcript_store, "TRANSCRIPT_INLINE_LIMIT", 20), \
+				patch.object(participant_identity, "get_participant_identities", return_value={}):
+			self.assertTrue(store_conference_transcript(meeting, service, "c"))
+
+		path = frappe.get_site_path(meeting.transcript_file.lstrip("/"))
+		self.addCleanup(os.remove, path)
+		with open(path) as f:
+			lines = f.read().splitlines()
+
+		self.assertEqual(len(lines), 6)
+		self.assertEqual(lines[0], "[00:00] conferenceRecords/c/participants/p: Hello")
+		self.assertEqual(lines[-1], "[02:01] conferenceRecords/c/participants/p: Hello")
+		self.assertEqual(meeting.transcript, lines[0][:20] + transcript_store.TRUNCATED_NOTE)
+
+	def test_partial_file_removed_on_failure(self):
+		"""Test a fetch failing midway leaves no file behind"""
+		with self.assertRaises(ValueError):
+			with transcript_store.TranscriptFile("test-meeting") as transcript_file:
+				transcript_file.write("[09:00] Ada: Hello\n")
+				raise ValueError("Connection reset")
+
+		self.assertFalse(os.path.exists(transcript_file._temp_path))
+		self.assertFalse(os.path.exists(transcript_file.path))
+
+	def test_transcript_file_keeps_head_and_hash(self):
+		"""Test a transcript file hashes all it is given but only keeps its head in memory"""
+		data = "0123456789" * 3 + "é"
+
+		with patch.object(transcript_store, "TRANSCRIPT_INLINE_LIMIT", 25):
+			with transcript_store.TranscriptFile("test-meeting") as transcript_file:
+				for line in (data[:12], data[12:]):
+					transcript_file.write(line)
+
+				self.assertEqual(transcript_file.size, len(data.encode()))
+				self.assertEqual(transcript_file._hash.hexdigest(), hashlib.md5(data.encode()).hexdigest())
+				self.assertTrue(transcript_file.truncated)
+				self.assertEqual(transcript_file.get_inline_text(), data[:25] + transcript_store.TRUNCATED_NOTE)
+
+	def test_transcript_file_short_transcript(self):
+		"""Test a transcript under the inline limit is kept whole"""
+		with transcript_store.TranscriptFile("test-meeting") as transcript_file:
+			transcript_file.write(b"[09:00] Ada: Hello\n")
+
+			self.assertFalse(transcript_file.truncated)
+			self.assertEqual(transcript_file.get_inline_text(), "[09:00] Ada: Hello\n")
+
+
+class FakeMediaHttp:
+	"""Serves ranged GETs of a Drive file the way googleapiclient's MediaIoBaseDownload expects"""
+
+	def __init__(self, content):
+		self.content = content
+		self.ranges = []
+
+	def request(self, uri, method="GET", headers=None, **kwargs):
+		self.ranges.append(headers["range"])
+		start, end = (int(value) for value in headers["range"][len("bytes="):].split("-"))
+		end = min(end, len(self.content) - 1)
+
+		resp = httplib2.Response({"status": 206, "content-range": f"bytes {start}-{end}/{len(self.content)}"})
+		return resp, self.content[start:end + 1]
+
+
+class FakeMediaRequest:
+	def __init__(self, content):
+		self.uri = "https://www.googleapis.com/drive/v3/files/doc1/export?mimeType=text%2Fplain"
+		self.headers = {}
+		self.http = FakeMediaHttp(content)
+
+
+class FakeDriveFiles:
+	"""Stands in for drive_service.files()"""
+
+	def __init__(self, content):
+		self.content = content
+
+	def files(self):
+		return self
+
+	def get(self, **kwargs):
+		return FakeRequest({"name": "Transcript"})
+
+	def export_media(self, **kwargs):
+		return FakeMediaRequest(self.content)
+
+
+class TestDriveTranscriptDownload(FrappeTestCase):
+	def test_download_in_ranged_chunks(self):
+		"""Test media is downloaded with ranged requests of the chunk size into the attached file"""
+		content = "[09:00] Ada: Hello é\n".encode() * 3
+		media_request = FakeMediaRequest(content)
+
+		with transcript_store.TranscriptFile("test-meeting") as transcript_file:
+			self.assertEqual(transcript_store.download_media(media_request, transcript_file, chunk_size=16), len(content))
+			file_doc = transcript_file.attach()
+
+		self.addCleanup(os.remove, transcript_file.path)
+
+		self.assertEqual(
+			media_request.http.ranges,
+			[f"bytes={start}-{start + 15}" for start in range(0, len(content), 16)]
+		)
+		self.assertEqual(file_doc.file_size, len(content))
+		self.assertEqual(file_doc.content_hash, hashlib.md5(content).hexdigest())
+		with open(transcript_file.path, "rb") as f:
+			self.assertEqual(f.read(), content)
+
+	def test_gemini_notes_read_from_exported_transcript(self):
+		"""Test Gemini notes are still extracted from the top of a streamed export"""
+		content = "📝 Notes\nSummary\nThe team agreed on the plan.\n\n📖 Transcript\n[09:00] Ada: Hello\n".encode()
+		meet_service = FakeTranscriptsResource([])
+		drive_service = FakeDriveFiles(content)
+		meeting = frappe._dict(name="VIDCON-MTG-TEST", save=lambda **kwargs: None)
+		transcript = {"name": "conferenceRecords/c/transcripts/t1", "docsDestination": {"document": "documents/doc1"}}
+
+		with patch.object(meet_service, "get", return_value=FakeRequest(transcript), create=True):
+			self.assertTrue(store_transcript_document(meeting, meet_service, drive_service, transcript["name"]))
+
+		self.addCleanup(os.remove, frappe.get_site_path(meeting.transcript_file.lstrip("/")))
+
+		self.assertEqual(meeting.meeting_notes, "Summary\nThe team agreed on the plan.")
+		self.assertEqual(meeting.transcript_file_id, "doc1")
+
+
+class TestTranscriptPipeline(FrappeTestCase):
+	def setUp(self):
+		self.meeting = f"VIDCON-MTG-{frappe.generate_hash(length=8)}"
+		self.addCleanup(transcript_pipeline.clear_hints, self.meeting)
+
+	def test_triggers_share_one_job(self):
+		"""Test every trigger enqueues the same deduplicated job and adds its hints"""
+		with patch.object(frappe, "enqueue") as enqueue:
+			transcript_pipeline.request_transcript(self.meeting, conference_id="conf1")
+			transcript_pipeline.request_transcript(self.meeting, transcript_name="conferenceRecords/conf1/transcripts/t1")
+			transcript_pipeline.request_transcript(self.meeting)
+
+		self.assertEqual(
+			{call.kwargs["job_id"] for call in enqueue.call_args_list},
+			{transcript_pipeline.get_job_id(self.meeting)}
+		)
+		self.assertTrue(all(call.kwargs["deduplicate"] for call in enqueue.call_args_list))
+		self.assertEqual(transcript_pipeline.get_hints(self.meeting), {
+			"conference_id": "conf1",
+			"transcript_name": "conferenceRecords/conf1/transcripts/t1"
+		})
+
+	def test_sources_cheapest_first(self):
+		"""Test the event's transcript resource is tried before the conference and Drive search"""
+		meeting_doc = frappe._dict(google_conference_id=None, google_meet_link="https://meet.google.com/abc-defg-hij")
+		hints = {"conference_id": "conf1", "transcript_name": "conferenceRecords/conf1/transcripts/t1"}
+
+		with patch.object(google_clients, "get_service"):
+			sources = transcript_pipeline.get_sources(meeting_doc, hints, "Test Calendar")
+			self.assertEqual([source for source, store in sources], ["Meet Event", "Meet Conference", "Drive Search"])
+
+			sources = transcript_pipeline.get_sources(meeting_doc, {}, "Test Calendar")
+			self.assertEqual([source for source, store in sources], ["Drive Search"])
+
+	def test_stops_at_first_source_with_transcript(self):
+		"""Test the source that stored the transcript is recorded and later sources aren't tried"""
+		meeting = make_meeting()
+		self.addCleanup(self.delete_meeting, meeting)
+		tried = []
+
+		def get_sources(meeting_doc, hints, google_calendar):
+			def store(source, stored):
+				tried.append(source)
+				if stored:
+					meeting_doc.db_update()
+				return stored
+
+			return [
+				(source, lambda source=source, stored=stored: store(source, stored))
+				for source, stored in (("Meet Event", False), ("Meet Conference", True), ("Drive Search", True))
+			]
+
+		with patch.object(frappe.db, "get_single_value", return_value="Test Calendar"), \
+				patch.object(transcript_pipeline, "get_sources", side_effect=get_sources):
+			self.assertEqual(transcript_pipeline.fetch_transcript(meeting), "Meet Conference")
+
+		self.assertEqual(tried, ["Meet Event", "Meet Conference"])
+		self.assertEqual(frappe.db.get_value("VidCon Meeting", meeting, "transcript_source"), "Meet Conference")
+
+	def test_running_fetch_not_repeated(self):
+		"""Test a second job for a meeting whose fetch is running returns without calling Google"""
+		lock = get_redis_conn().lock(frappe.cache.make_key(transcript_pipeline.LOCK_KEY_PREFIX + self.meeting))
+		lock.acquire()
+		self.addCleanup(lock.release)
+
+		with patch.object(transcript_pipeline, "fetch_transcript", side_effect=AssertionError) as fetch_transcript:
+			self.assertIsNone(transcript_pipeline.run_transcript_pipeline(self.meeting))
+
+		fetch_transcript.assert_not_called()
+
+	def test_in_flight_meetings(self):
+		"""Test scheduled, running and queued fetches are found in one pipeline"""
+		from rq.job import Job, JobStatus
+
+		conn = get_redis_conn()
+		scheduled, running, queued, idle = (f"{self.meeting}-{i}" for i in range(4))
+		schedule_key = frappe.cache.make_key(transcript_retries.SCHEDULE_KEY)
+		lock_key = frappe.cache.make_key(transcript_pipeline.LOCK_KEY_PREFIX + running)
+		job_key = Job.key_for(create_job_id(transcript_pipeline.get_job_id(queued)))
+
+		conn.zadd(schedule_key, {scheduled: time.time() + 300})
+		conn.set(lock_key, 1)
+		conn.hset(job_key, "status", JobStatus.QUEUED.value)
+		self.addCleanup(conn.zrem, schedule_key, scheduled)
+		self.addCleanup(conn.delete, lock_key, job_key)
+
+		self.assertEqual(
+			transcript_pipeline.get_in_flight_meetings([scheduled, running, queued, idle]),
+			{scheduled, running, queued}
+		)
+		self.assertEqual(transcript_pipeline.get_in_flight_meetings([]), set())
+
+	@staticmethod
+	def delete_meeting(meeting):
+		frappe.db.delete("VidCon Meeting", {"name": meeting})
+		frappe.db.commit()
+
+
+def test_get_backoff_delay():
+	"""Test retries back off exponentially with jitter, up to the cap"""
+	for attempts in range(1, 12):
+		delay = min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY)
+		for _ in range(20):
+			assert delay / 2 <= get_backoff_delay(attempts) <= delay
+
+	assert get_backoff_delay(30) <= RETRY_MAX_DELAY
+
+
+class TestTranscriptRetries(FrappeTestCase):
+	def setUp(self):
+		self.meeting = f"VIDCON-MTG-{frappe.generate_hash(length=8)}"
+		self.addCleanup(transcript_retries.clear_transcript_retry, self.meeting)
+
+		patcher = patch.object(transcript_retries, "log")
+		self.log = patcher.start()
+		self.addCleanup(patcher.stop)
+
+	def get_due_at(self):
+		return get_redis_conn().zscore(transcript_retries.make_key(transcript_retries.SCHEDULE_KEY), self.meeting)
+
+	def test_earlier_fetch_kept(self):
+		"""Test scheduling a fetch never postpones one already due sooner"""
+		transcript_retries.schedule_transcript_fetch(self.meeting, 600)
+		due_at = self.get_due_at()
+
+		transcript_retries.schedule_transcript_fetch(self.meeting, 3600)
+		self.assertEqual(self.get_due_at(), due_at)
+
+		transcript_retries.schedule_transcript_fetch(self.meeting, 60)
+		self.assertLess(self.get_due_at(), due_at)
+
+	def test_retries_back_off_until_max_attempts(self):
+		"""Test each empty fetch schedules the next one later, until the attempts run out"""
+		with patch.object(transcript_retries, "get_max_attempts", return_value=3):
+			first = transcript_retries.schedule_transcript_retry(self.meeting)
+			second = transcript_retries.schedule_transcript_retry(self.meeting, "Quota exceeded")
+
+			self.assertLessEqual(first, time.time() + RETRY_BASE_DELAY)
+			self.assertGreater(second, first)
+
+			pending = {row["meeting"]: row for row in transcript_retries.get_pending_transcript_retries()}
+			self.assertEqual(pending[self.meeting]["attempts"], 2)
+			self.assertEqual(pending[self.meeting]["last_error"], "Quota exceeded")
+
+			self.assertIsNone(transcript_retries.schedule_transcript_retry(self.meeting))
+
+		self.assertIsNone(self.get_due_at())
+		self.log.failure.assert_called_once()
+
+	def test_due_fetches_enqueued_once(self):
+		"""Test the scheduler enqueues due meetings and leaves the others scheduled"""
+		later = f"{self.meeting}-later"
+		self.addCleanup(transcript_retries.clear_transcript_retry, later)
+
+		transcript_retries.schedule_transcript_fetch(self.meeting, -1)
+		transcript_retries.schedule_transcript_fetch(later, 600)
+
+		with patch.object(transcript_pipeline, "enqueue_transcript_job") as enqueue_transcript_job:
+			transcript_retries.enqueue_due_transcript_fetches()
+			transcript_retries.enqueue_due_transcript_fetches()
+
+		enqueue_transcript_job.assert_called_once_with(self.meeting)
+		self.assertIsNone(self.get_due_at())
+		self.assertIsNotNone(get_redis_conn().zscore(transcript_retries.make_key(transcript_retries.SCHEDULE_KEY), later))
+
+
+class TestPendingTranscriptSweep(FrappeTestCase):
+	# Later than any real meeting, so only this test's meetings are swept
+	WATERMARK = "2099-01-01 00:00:00"
+
+	def make_completed_meetings(self, count, modified=WATERMARK, **values):
+		meetings = sorted(
+			make_meeting(status="Completed", modified=modified, **values)
+			for _ in range(count)
+		)
+		self.addCleanup(self.delete_meetings, meetings)
+		return meetings
+
+	@staticmethod
+	def delete_meetings(meetings):
+		frappe.db.delete("VidCon Meeting", {"name": ["in", meetings]})
+		frappe.db.commit()
+
+	def test_watermark_breaks_ties_by_name(self):
+		"""Test the watermark advances through meetings sharing one modified time"""
+		tied = self.make_completed_meetings(3)
+		later = self.make_completed_meetings(1, modified="2099-01-01 00:00:01")
+
+		first = get_meetings_after_watermark(self.WATERMARK, None, 2)
+		self.assertEqual([meeting.name for meeting in first], tied[:2])
+
+		rest = get_meetings_after_watermark(first[-1].modified, first[-1].name, 2)
+		self.assertEqual([meeting.name for meeting in rest], tied[2:] + later)
+
+	def test_in_flight_meetings_not_enqueued(self):
+		"""Test meetings with a fetch on the way are skipped and the watermark moves to the last meeting read"""
+		meetings = self.make_completed_meetings(3)
+		settings = frappe._dict(
+			enable_auto_transcript_fetch=1,
+			transcript_sweep_watermark=self.WATERMARK,
+			transcript_sweep_watermark_name=None
+		)
+
+		with patch.object(frappe, "get_single", return_value=settings), \
+				patch.object(scheduled_tasks, "is_sweep_job_running", return_value=False), \
+				patch.object(transcript_pipeline, "get_in_flight_meetings", return_value={meetings[0]}), \
+				patch.object(frappe.db, "set_single_value") as set_single_value, \
+				patch.object(frappe, "enqueue") as enqueue:
+			scheduled_tasks.check_pending_transcripts()
+
+		self.assertEqual(enqueue.call_args.kwargs["meeting_names"], meetings[1:])
+		self.assertEqual(set_single_value.call_args.args[1]["transcript_sweep_watermark_name"], meetings[-1])
+
+	def test_sweep_waits_for_previous_batches(self):
+		"""Test a sweep doesn't start while the previous sweep's batch jobs are still fetching"""
+		settings = frappe._dict(enable_auto_transcript_fetch=1)
+
+		with patch.object(frappe, "get_single", return_value=settings), \
+				patch.object(scheduled_tasks, "is_sweep_job_running", return_value=True), \
+				patch.object(scheduled_tasks, "get_meetings_after_watermark") as get_meetings:
+			scheduled_tasks.check_pending_transcripts()
+
+		get_meetings.assert_not_called()
+
+	def test_conferences_listed_by_conference_id(self):
+		"""Test batches list transcripts by conference ID and only fetch meetings that have one"""
+		with_transcript, without_transcript = (
+			make_meeting(status="Completed", google_conference_id=frappe.generate_hash(length=12))
+			for _ in range(2)
+		)
+		self.addCleanup(self.delete_meetings, [with_transcript, without_transcript])
+		conference_ids = {
+			name: frappe.db.get_value("VidCon Meeting", name, "google_conference_id")
+			for name in (with_transcript, without_transcript)
+		}
+
+		def execute_batch(service, requests_by_key, title):
+			self.assertEqual(
+				requests_by_key,
+				{name: f"conferenceRecords/{conference_id}" for name, conference_id in conference_ids.items()}
+			)
+			return {
+				"succeeded": {
+					with_transcript: {"transcripts": [{"name": f"conferenceRecords/{conference_ids[with_transcript]}/transcripts/t1"}]},
+					without_transcript: {}
+				},
+				"failed": {}
+			}
+
+		transcripts = frappe._dict(list=lambda parent: parent)
+		meet_service = frappe._dict(conferenceRecords=lambda: frappe._dict(transcripts=lambda: transcripts))
+
+		with patch.object(frappe.db, "get_single_value", return_value="Test Calendar"), \
+				patch.object(google_clients, "get_service", return_value=meet_service), \
+				patch.object(google_clients, "execute_batch", side_effect=execute_batch), \
+				patch.object(transcript_pipeline, "add_hints") as add_hints, \
+				patch.object(transcript_pipeline, "run_transcript_pipeline") as run_transcript_pipeline, \
+				patch.object(transcript_retries, "schedule_transcript_retry") as schedule_transcript_retry:
+			scheduled_tasks.fetch_pending_transcripts([with_transcript, without_transcript])
+
+		run_transcript_pipeline.assert_called_once_with(with_transcript)
+		add_hints.assert_called_once_with(
+			with_transcript,
+			{"transcript_name": f"conferenceRecords/{conference_ids[with_transcript]}/transcripts/t1"}
+		)
+		schedule_transcript_retry.assert_called_once_with(without_transcript)
@@ -5,8 +5,30 @@
 Tests for Google Pub/Sub JWT verification
 """
 
+import json
+import time
+from unittest.mock import patch
+
 import frappe
+import jwt
 from typing import Optional
+from cryptography.hazmat.primitives.asymmetric import rsa
+from frappe.tests.utils import FrappeTestCase
+from jwt.algorithms import RSAAlgorithm
+
+from vidcon.vidcon.doctype.vidcon_meeting import pubsub_auth
+from vidcon.vidcon.doctype.vidcon_meeting.metrics import get_counters, percentile
+from vidcon.vidcon.doctype.vidcon_meeting.pubsub_auth import (
+	DEFAULT_JWKS_TTL,
+	JWKS_CACHE_KEY,
+	JWKS_STALE_GRACE,
+	audience_matches,
+	get_max_age,
+	get_signing_key
+)
+
+
+AUDIENCE = "https://example.com/api/method/vidcon.vidcon.doctype.vidcon_meeting.google_meet_events.handle_pubsub_push"
 
 
 def test_verify_pubsub_jwt_valid_token():
@@ -44,3 +66,190 @@ def test_verify_pubsub_jwt_missing_claims():
 	# 2. Proper validation of all required fields
 	
 	pass  # Remove this when implementing actual test
+
+
+def test_get_max_age():
+	"""Test the certs cache lifetime is read from Cache-Control minus Age"""
+	assert get_max_age({"Cache-Control": "public, max-age=19784, must-revalidate"}) == 19784
+	assert get_max_age({"Cache-Control": "public, max-age=600", "Age": "100"}) == 500
+	assert get_max_age({"Cache-Control": "max-age=600", "Age": "900"}) == 0
+	assert get_max_age({"Cache-Control": "max-age=600", "Age": "invalid"}) == 600
+
+
+def test_get_max_age_without_usable_max_age():
+	"""Test the default lifetime is used when the response can't be cached"""
+	assert get_max_age({}) == DEFAULT_JWKS_TTL
+	assert get_max_age({"Cache-Control": None}) == DEFAULT_JWKS_TTL
+	assert get_max_age({"Cache-Control": "no-cache, max-age=600"}) == DEFAULT_JWKS_TTL
+	assert get_max_age({"Cache-Control": "no-store"}) == DEFAULT_JWKS_TTL
+
+
+class TestSigningKeyCache(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		cls.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+	def setUp(self):
+		self.saved_jwks = pubsub_auth._jwks
+		frappe.cache.delete_value(JWKS_CACHE_KEY)
+
+	def tearDown(self):
+		pubsub_auth._jwks = self.saved_jwks
+		frappe.cache.delete_value(JWKS_CACHE_KEY)
+
+	def make_jwks(self, *kids, fetched_at=None, ttl=DEFAULT_JWKS_TTL):
+		jwk = json.loads(RSAAlgorithm.to_jwk(self.private_key.public_key()))
+		fetched_at = time.time() if fetched_at is None else fetched_at
+		return {
+			"keys": {kid: {**jwk, "kid": kid} for kid in kids},
+			"fetched_at": fetched_at,
+			"expires_at": fetched_at + ttl,
+			"stale_until": fetched_at + ttl + JWKS_STALE_GRACE
+		}
+
+	def make_token(self, kid):
+		return jwt.encode({"iss": "https://accounts.google.com"}, self.private_key, algorithm="RS256", headers={"kid": kid})
+
+	def test_cached_keys_reused_until_expiry(self):
+		"""Test a known kid is served from the process copy without calling Google"""
+		pubsub_auth._jwks = self.make_jwks("key-1")
+
+		with patch.object(pubsub_auth, "fetch_jwks", side_effect=AssertionError) as fetch:
+			key = get_signing_key(self.make_token("key-1"))
+
+		self.assertEqual(key.public_numbers(), self.private_key.public_key().public_numbers())
+		fetch.assert_not_called()
+
+	def test_expired_keys_refreshed_from_redis(self):
+		"""Test expired keys are replaced by a fresher copy another worker stored"""
+		pubsub_auth._jwks = self.make_jwks("key-1", fetched_at=time.time() - 2 * DEFAULT_JWKS_TTL)
+		frappe.cache.set_value(JWKS_CACHE_KEY, self.make_jwks("key-1", "key-2"))
+
+		with patch.object(pubsub_auth, "fetch_jwks", side_effect=AssertionError) as fetch:
+			get_signing_key(self.make_token("key-2"))
+
+		fetch.assert_not_called()
+
+	def test_unknown_kid_forces_one_refresh(self):
+		"""Test an unknown kid refreshes the keys, at most once per interval"""
+		pubsub_auth._jwks = self.make_jwks("key-1", fetched_at=time.time() - 120)
+
+		with patch.object(pubsub_auth, "fetch_jwks", return_value=self.make_jwks("key-1", "key-2")) as fetch:
+			get_signing_key(self.make_token("key-2"))
+			self.assertEqual(fetch.call_count, 1)
+
+			# Just refreshed: a bogus kid doesn't send another request to Google
+			with self.assertRaises(jwt.InvalidTokenError):
+				get_signing_key(self.make_token("key-3"))
+			self.assertEqual(fetch.call_count, 1)
+
+	def test_stale_keys_served_when_google_unreachable(self):
+		"""Test expired keys within their grace period are used if the certs endpoint fails"""
+		pubsub_auth._jwks = self.make_jwks("key-1", fetched_at=time.time() - 2 * DEFAULT_JWKS_TTL)
+
+		with patch.object(pubsub_auth, "fetch_jwks", side_effect=Exception("Connection refused")):
+			self.assertTrue(get_signing_key(self.make_token("key-1")))
+
+	def test_keys_past_grace_period_not_served(self):
+		"""Test the certs error is raised once the cached keys are past their grace period"""
+		pubsub_auth._jwks = self.make_jwks("key-1", fetched_at=time.time() - 2 * JWKS_STALE_GRACE)
+
+		with patch.object(pubsub_auth, "fetch_jwks", side_effect=Exception("Connection refused")):
+			with self.assertRaises(Exception):
+				get_signing_key(self.make_token("key-1"))
+
+
+def test_audience_matches():
+	"""Test the aud claim is checked as a string or a list"""
+	assert audience_matches({"aud": AUDIENCE}, AUDIENCE)
+	assert audience_matches({"aud": ["other", AUDIENCE]}, AUDIENCE)
+	assert not audience_matches({"aud": "other"}, AUDIENCE)
+	assert not audience_matches({}, AUDIENCE)
+
+
+def test_percentile():
+	"""Test nearest-rank percentiles"""
+	samples = list(range(1, 101))
+
+	assert percentile(samples, 50) == 50
+	assert percentile(samples, 95) == 95
+	assert percentile(samples, 100) == 100
+	assert percentile(samples, 0) == 1
+	assert percentile([7], 99) == 7
+
+
+class TestVerifyPubSubJWT(FrappeTestCase):
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		cls.private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+	def make_token(self, private_key=None, **claims):
+		payload = {
+			"iss": "https://accounts.google.com",
+			"aud": AUDIENCE,
+			"email": "pubsub@example.iam.gserviceaccount.com",
+			"iat": int(time.time()),
+			"exp": int(time.time()) + 3600,
+			# Tokens must differ so none is served from the claims cache
+			"jti": frappe.generate_hash(),
+			**claims
+		}
+		return jwt.encode(payload, private_key or self.private_key, algorithm="RS256")
+
+	def verify(self, token, audience=AUDIENCE):
+		from vidcon.vidcon.doctype.vidcon_meeting.google_meet_events import verify_pubsub_jwt
+
+		with patch.object(pubsub_auth, "get_signing_key", return_value=self.private_key.public_key()):
+			return verify_pubsub_jwt(token, audience)
+
+	def test_valid_token_cached_until_exp(self):
+		"""Test a valid token is accepted, then served from the claims cache"""
+		from vidcon.vidcon.doctype.vidcon_meeting.google_meet_events import verify_pubsub_jwt
+
+		token = self.make_token()
+		claims = self.verify(token)
+		self.assertEqual(claims["email"], "pubsub@example.iam.gserviceaccount.com")
+
+		hits = get_counters().get("jwt_cache_hit", 0)
+
+		# No RSA verification on a hit
+		with patch.object(pubsub_auth, "get_signing_key", side_effect=AssertionError), \
+				patch.object(jwt, "decode", side_effect=AssertionError):
+			self.assertEqual(verify_pubsub_jwt(token, AUDIENCE), claims)
+
+		self.assertEqual(get_counters().get("jwt_cache_hit", 0), hits + 1)
+
+	def test_cached_claims_still_check_audience(self):
+		"""Test a cached token is rejected for another audience"""
+		token = self.make_token()
+		self.assertTrue(self.verify(token))
+
+		misses = get_counters().get("jwt_cache_miss", 0)
+		self.assertIsNone(pubsub_auth.get_cached_claims(token, "https://other.example.com"))
+		self.assertEqual(get_counters().get("jwt_cache_miss", 0), misses + 1)
+
+	def test_rejected_tokens_not_cached(self):
+		"""Test a token that failed verification is verified again next time"""
+		token = self.make_token(aud="https://other.example.com")
+
+		self.assertIsNone(self.verify(token))
+		self.assertIsNone(frappe.cache.get_value(pubsub_auth.get_token_cache_key(token)))
+
+	def test_expired_token(self):
+		"""Test expired tokens are rejected"""
+		self.assertIsNone(self.verify(self.make_token(iat=int(time.time()) - 7200, exp=int(time.time()) - 3600)))
+
+	def test_invalid_signature(self):
+		"""Test tokens signed by another key are rejected"""
+		other_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+		self.assertIsNone(self.verify(self.make_token(private_key=other_key)))
+
+	def test_wrong_audience(self):
+		"""Test tokens issued for another endpoint are rejected"""
+		self.assertIsNone(self.verify(self.make_token(aud="https://other.example.com")))
+
+	def test_wrong_issuer(self):
+		"""Test tokens not issued by Google are rejected"""
+		self.assertIsNone(self.verify(self.make_token(iss="https://evil.example.com")))
@@ -0,0 +1,216 @@
+"""
+Buffered writer for VidCon Event Log
+
+Fast-ack push requests append rows to a Redis list instead of inserting and
+committing a document each. A background flush moves the buffer aside
+atomically and writes it with multi-row inserts and one commit per batch, so
+push throughput is bound by batch size rather than by commits.
+
+Events handled inline still insert their row directly: the unique index on
+event_id has to reject a duplicate before it is dispatched.
+
+The buffer lives in the RQ Redis (the same store that holds queued jobs), not in
+the cache Redis, which may evict keys. Rows are only removed from Redis after
+the transaction that wrote them has committed, and batches left behind by a
+flush that died are written by the next one.
+"""
+
+import json
+
+import frappe
+import redis
+from frappe.model.naming import set_new_name
+from frappe.utils import cint
+from frappe.utils.background_jobs import get_redis_conn
+
+
+BUFFER_KEY = "vidcon:event_log_buffer"
+
+# Set of batch keys claimed by a flush but not fully written yet
+FLUSHING_KEY = "vidcon:event_log_flushing"
+
+FLUSH_LOCK_KEY = "vidcon:event_log_flush_lock"
+FLUSH_LOCK_TIMEOUT = 300
+
+# Buffers claimed per flush job before yielding the worker
+MAX_FLUSH_ROUNDS = 10
+
+DEFAULT_BATCH_SIZE = 100
+
+EVENT_LOG_FIELDS = (
+	"event_type",
+	"event_id",
+	"subscription_id",
+	"received_at",
+	"status",
+	"space_id",
+	"conference_id",
+	"meeting",
+	"raw_payload",
+	"error_message"
+)
+
+
+def buffer_event_log(row, dispatch=False):
+	"""
+	Queue a VidCon Event Log row to be written by the next flush.
+
+	Args:
+		row: dict of VidCon Event Log field values
+		dispatch: Enqueue process_event_log for the row once it is written
+	"""
+	entry = {field: row.get(field) for field in EVENT_LOG_FIELDS}
+	entry["dispatch"] = dispatch
+
+	get_redis_conn().rpush(make_key(BUFFER_KEY), json.dumps(entry, default=str))
+
+	# Rows that arrive while a flush is queued are picked up by that same flush
+	frappe.enqueue(
+		"vidcon.vidcon.doctype.vidcon_event_log.event_log_writer.flush_event_log_buffer",
+		queue="short",
+		job_id="vidcon_flush_event_log",
+		deduplicate=True
+	)
+
+
+def flush_event_log_buffer():
+	"""
+	Write buffered VidCon Event Log rows to the database.
+
+	Runs as a background job after pushes and every minute from the scheduler.
+	Only one flush runs at a time per site.
+	"""
+	conn = get_redis_conn()
+	lock = conn.lock(make_key(FLUSH_LOCK_KEY), timeout=FLUSH_LOCK_TIMEOUT)
+	if not lock.acquire(blocking=False):
+		return
+
+	try:
+		batch_size = (
+			cint(frappe.db.get_single_value("VidCon Settings", "event_log_batch_size"))
+			or DEFAULT_BATCH_SIZE
+		)
+
+		# Batches left behind by a flush that died mid-write go first
+		batch_keys = [frappe.safe_decode(key) for key in conn.smembers(make_key(FLUSHING_KEY))]
+
+		for _ in range(MAX_FLUSH_ROUNDS):
+			batch_key = claim_buffer(conn)
+			if batch_key:
+				batch_keys.append(batch_key)
+
+			if not batch_keys:
+				break
+
+			for key in batch_keys:
+				write_batch(conn, key, batch_size)
+				conn.delete(key)
+				conn.srem(make_key(FLUSHING_KEY), key)
+
+			batch_keys = []
+
+	finally:
+		try:
+			lock.release()
+		except redis.exceptions.LockError:
+			pass
+
+
+def claim_buffer(conn):
+	"""
+	Atomically move the current buffer to a batch key of its own.
+
+	Returns:
+		str: The batch key, or None if the buffer is empty
+	"""
+	batch_key = make_key(f"{BUFFER_KEY}:{frappe.generate_hash(length=12)}")
+
+	# Register first so the batch can't be orphaned if we die right after the rename
+	conn.sadd(make_key(FLUSHING_KEY), batch_key)
+
+	try:
+		conn.rename(make_key(BUFFER_KEY), batch_key)
+	except redis.exceptions.ResponseError:
+		# No such key: nothing buffered
+		conn.srem(make_key(FLUSHING_KEY), batch_key)
+		return None
+
+	return batch_key
+
+
+def write_batch(conn, batch_key, batch_size):
+	"""
+	Insert a claimed batch in chunks, committing and trimming one chunk at a time.
+
+	Args:
+		conn: RQ Redis connection
+		batch_key: Redis list holding the batch
+		batch_size: Rows per multi-row insert
+	"""
+	while True:
+		entries = conn.lrange(batch_key, 0, batch_size - 1)
+		if not entries:
+			return
+
+		to_dispatch = insert_event_logs([json.loads(entry) for entry in entries])
+		frappe.db.commit()
+
+		# A crash between commit and trim replays this chunk; rows with an
+		# event_id are then skipped by the unique index
+		conn.ltrim(batch_key, len(entries), -1)
+
+		for log_name in to_dispatch:
+			frappe.enqueue(
+				"vidcon.vidcon.doctype.vidcon_meeting.google_meet_events.process_event_log",
+				queue="short",
+				timeout=600,
+				log_name=log_name
+			)
+
+
+def insert_event_logs(entries):
+	"""
+	Insert VidCon Event Log rows with a single multi-row INSERT.
+
+	Rows whose event_id is already logged are skipped.
+
+	Args:
+		entries: list of buffered row dicts
+
+	Returns:
+		list: Names of inserted rows that were buffered with dispatch=True
+	"""
+	now = frappe.utils.now()
+	user = frappe.session.user
+
+	values = []
+	dispatch_names = []
+	for entry in entries:
+		log = frappe.new_doc("VidCon Event Log")
+		set_new_name(log)
+
+		values.append((log.name, now, now, user, user, 0, *(entry.get(field) for field in EVENT_LOG_FIELDS)))
+		if entry.get("dispatch"):
+			dispatch_names.append(log.name)
+
+	frappe.db.bulk_insert(
+		"VidCon Event Log",
+		fields=["name", "creation", "modified", "owner", "modified_by", "docstatus", *EVENT_LOG_FIELDS],
+		values=values,
+		ignore_duplicates=True
+	)
+
+	if not dispatch_names:
+		return []
+
+	# Rows skipped as duplicates must not be dispatched again
+	return frappe.get_all(
+		"VidCon Event Log",
+		filters={"name": ["in", dispatch_names]},
+		pluck="name"
+	)
+
+
+def make_key(key):
+	"""Namespace a Redis key by site."""
+	return frappe.cache.make_key(key)
@@ -7,3 +7,9 @@ from frappe.model.document import Document
 
 class VidConEventLog(Document):
 	pass
+
+
+def on_doctype_update():
+	# Handlers and the list view filter by type/status and sort by received_at
+	frappe.db.add_index("VidCon Event Log", ["event_type", "received_at"], "event_type_received_at_index")
+	frappe.db.add_index("VidCon Event Log", ["status", "received_at"], "status_received_at_index")
@@ -0,0 +1,360 @@
+"""
+Coalesced attendee tracking
+
+Participant join/leave events arrive in bursts (hundreds within seconds when a
+large meeting starts or ends). Instead of loading and saving the whole VidCon
+Meeting per event, handlers append the event to a per-conference Redis list and
+a single flush job per conference writes the burst. The first event of a burst
+marks the conference's flush as due after a short coalescing window, in a
+sorted set like the transcript retries; the flush is enqueued by the first
+event that arrives after that, or by the scheduler for the last window of a
+burst. The flush folds the events per participant and applies them to the
+VidCon Meeting Attendee rows with one bulk update and one multi-row insert.
+New participants are named from the participant identity cache, which the
+conference's participants.list job fills before most flushes run, rather than
+with one lookup per event.
+
+Flushes take the conference's lane lock (see conference_lanes), so they never
+interleave with handlers that load and save the same meeting. A flush that
+finds the lock taken doesn't wait for it; the conference is marked due again
+instead. Buffers live in the RQ Redis, are only trimmed after their rows are
+committed, and buffers left behind by a flush that died are written by the
+scheduler.
+"""
+
+import json
+import time
+from datetime import datetime, timezone
+
+import frappe
+import redis
+from frappe.model.naming import make_autoname
+from frappe.utils import convert_utc_to_system_timezone, now
+from frappe.utils.background_jobs import get_redis_conn
+
+from vidcon.vidcon.doctype.vidcon_meeting.conference_lanes import (
+	LOCK_KEY_PREFIX,
+	LOCK_TIMEOUT,
+	drain,
+	make_key,
+	parse_publish_time
+)
+from vidcon.vidcon.doctype.vidcon_meeting.metrics import incr, observe
+from vidcon.vidcon.doctype.vidcon_meeting.participant_identity import get_participant_identities
+from vidcon.vidcon.doctype.vidcon_meeting.vidcon_logger import get_logger
+
+
+BUFFER_KEY_PREFIX = "vidcon:attendee_buffer:"
+
+# Conferences with buffered participant events
+ACTIVE_BUFFERS_KEY = "vidcon:attendee_buffers"
+
+# Sorted set of conferences scored by when their flush is due
+FLUSH_DUE_KEY = "vidcon:attendee_flush_due"
+
+# Seconds events are collected before a flush writes them
+COALESCE_WINDOW = 2
+
+# Events applied per bulk write
+MAX_BATCH = 500
+
+ATTENDEE_DOCTYPE = "VidCon Meeting Attendee"
+
+log = get_logger("attendees")
+
+
+def buffer_participant_event(conference_id, meeting, kind, participant_id, at=None):
+	"""
+	Queue a participant join or leave to be written by the conference's next flush.
+
+	Args:
+		conference_id: Meet conference ID
+		meeting: VidCon Meeting the conference belongs to
+		kind: 'joined' or 'left'
+		participant_id: Participant resource (conferenceRecords/{c}/participants/{p})
+		at: RFC 3339 time of the join or leave; defaults to now
+	"""
+	conn = get_redis_conn()
+	entry = json.dumps({
+		"meeting": meeting,
+		"kind": kind,
+		"participant_id": participant_id,
+		"at": at
+	})
+
+	conn.rpush(make_key(BUFFER_KEY_PREFIX + conference_id), entry)
+	conn.sadd(make_key(ACTIVE_BUFFERS_KEY), conference_id)
+
+	# The first event of a burst opens its coalescing window
+	conn.zadd(make_key(FLUSH_DUE_KEY), {conference_id: time.time() + COALESCE_WINDOW}, nx=True)
+	enqueue_due_flushes(conn)
+
+
+def enqueue_due_flushes(conn=None):
+	"""
+	Enqueue a flush for every conference whose coalescing window has passed.
+
+	Args:
+		conn: RQ Redis connection
+	"""
+	conn = conn or get_redis_conn()
+	due_key = make_key(FLUSH_DUE_KEY)
+
+	for conference_id in conn.zrangebyscore(due_key, 0, time.time()):
+		# Only the worker that removes the conference enqueues its flush
+		if conn.zrem(due_key, conference_id):
+			enqueue_flush(frappe.safe_decode(conference_id))
+
+
+def enqueue_flush(conference_id):
+	"""
+	Enqueue a conference's flush unless one is already queued.
+
+	Args:
+		conference_id: Meet conference ID
+	"""
+	# Events that arrive while the flush is queued are written by that same flush
+	frappe.enqueue(
+		"vidcon.vidcon.doctype.vidcon_meeting.attendee_tracker.flush_attendees",
+		queue="short",
+		job_id=f"vidcon_flush_attendees:{conference_id}",
+		deduplicate=True,
+		enqueue_after_commit=True,
+		conference_id=conference_id
+	)
+
+
+def flush_attendees(conference_id):
+	"""
+	Background job: write a conference's buffered participant events to its
+	attendee rows.
+
+	If the conference's lane lock is taken, the flush is marked due again after
+	another coalescing window rather than waiting for the lock.
+
+	Args:
+		conference_id: Meet conference ID
+	"""
+	conn = get_redis_conn()
+	buffer_key = make_key(BUFFER_KEY_PREFIX + conference_id)
+	due_key = make_key(FLUSH_DUE_KEY)
+
+	# Events buffered from here on are written by this flush
+	conn.zrem(due_key, conference_id)
+
+	while True:
+		lock = conn.lock(make_key(LOCK_KEY_PREFIX + conference_id), timeout=LOCK_TIMEOUT)
+		if not lock.acquire(blocking=False):
+			log.info("Conference %s is busy; attendee flush due again in %ss", conference_id, COALESCE_WINDOW)
+			conn.zadd(due_key, {conference_id: time.time() + COALESCE_WINDOW})
+			return
+
+		try:
+			write_buffer(conn, buffer_key)
+		finally:
+			try:
+				lock.release()
+			except redis.exceptions.LockError:
+				log.warning("Lane lock for conference %s expired while writing attendees", conference_id)
+
+		# Lane events that found the lock taken by this flush were left for us;
+		# participant events among them are buffered again
+		drain(conference_id)
+
+		if not conn.llen(buffer_key):
+			conn.srem(make_key(ACTIVE_BUFFERS_KEY), conference_id)
+			if not conn.llen(buffer_key):
+				return
+			conn.sadd(make_key(ACTIVE_BUFFERS_KEY), conference_id)
+
+
+def write_buffer(conn, buffer_key):
+	"""
+	Apply a conference's buffer in batches, committing and trimming one batch at a time.
+
+	Args:
+		conn: RQ Redis connection
+		buffer_key: Redis list holding the conference's participant events
+	"""
+	while True:
+		entries = conn.lrange(buffer_key, 0, MAX_BATCH - 1)
+		if not entries:
+			return
+
+		start = time.perf_counter()
+		events_by_meeting = {}
+		for entry in entries:
+			event = json.loads(entry)
+			events_by_meeting.setdefault(event["meeting"], []).append(event)
+
+		for meeting, events in events_by_meeting.items():
+			upsert_attendees(meeting, events)
+		frappe.db.commit()
+
+		# Events appended meanwhile stay in the buffer for the next batch
+		conn.ltrim(buffer_key, len(entries), -1)
+
+		incr("attendee_events", len(entries))
+		observe("attendee_flush_ms", (time.perf_counter() - start) * 1000)
+
+
+def flush_stalled_attendees():
+	"""
+	Scheduler job: enqueue flushes for the last window of a burst and for
+	buffers left behind by a flush that died or found the conference busy.
+	"""
+	conn = get_redis_conn()
+	for conference_id in conn.smembers(make_key(ACTIVE_BUFFERS_KEY)):
+		enqueue_flush(frappe.safe_decode(conference_id))
+
+
+def upsert_attendees(meeting, events):
+	"""
+	Apply a meeting's participant events to its attendee rows in bulk.
+
+	Participants are matched to rows by participant_id, else to an invited
+	attendee with the same name. Matched rows are updated with one statement,
+	new participants are inserted with one multi-row INSERT.
+
+	Args:
+		meeting: VidCon Meeting name
+		events: Buffered participant event dicts
+	"""
+	if not frappe.db.exists("VidCon Meeting", meeting):
+		return
+
+	events.sort(key=lambda event: parse_publish_time(event.get("at")))
+	participant_ids = list(dict.fromkeys(event["participant_id"] for event in events))
+
+	rows = frappe.get_all(
+		ATTENDEE_DOCTYPE,
+		filters={"parenttype": "VidCon Meeting", "parentfield": "attendees", "parent": meeting},
+		fields=["name", "participant_id", "full_name", "joined_at", "left_at"]
+	)
+	attendees = {row.participant_id: row for row in rows if row.participant_id in set(participant_ids)}
+
+	# Identities are only needed for participants whose row has no name yet
+	identities = get_participant_identities([
+		participant_id for participant_id in participant_ids
+		if not (attendees.get(participant_id) or {}).get("full_name")
+	])
+
+	invited = {
+		row.full_name.strip().lower(): row
+		for row in rows if not row.participant_id and row.full_name
+	}
+	for participant_id in participant_ids:
+		display_name = (identities.get(participant_id) or {}).get("display_name")
+		if participant_id not in attendees and display_name and display_name.strip().lower() in invited:
+			attendees[participant_id] = invited.pop(display_name.strip().lower())
+	existing = set(attendees)
+
+	for event in events:
+		attendee = attendees.setdefault(
+			event["participant_id"],
+			frappe._dict(name=None, full_name=None, joined_at=None, left_at=None)
+		)
+		apply_session_event(attendee, event["kind"], to_system_datetime(event.get("at")))
+
+	for participant_id, attendee in attendees.items():
+		attendee.participant_id = participant_id
+		attendee.full_name = attendee.full_name or (identities.get(participant_id) or {}).get("display_name")
+
+	updates = {
+		attendees[participant_id].name: {
+			"attended": 1,
+			"participant_id": participant_id,
+			"full_name": attendees[participant_id].full_name,
+			"joined_at": attendees[participant_id].joined_at,
+			"left_at": attendees[participant_id].left_at
+		}
+		for participant_id in existing
+	}
+	if updates:
+		frappe.db.bulk_update(ATTENDEE_DOCTYPE, updates, update_modified=False)
+
+	new_attendees = [attendees[participant_id] for participant_id in participant_ids if participant_id not in existing]
+	if new_attendees:
+		insert_attendees(meeting, new_attendees, len(rows) + 1)
+
+	# Desk forms opened before these writes must reload instead of overwriting them
+	frappe.db.set_value("VidCon Meeting", meeting, "modified", now(), update_modified=False)
+	frappe.clear_document_cache("VidCon Meeting", meeting)
+
+
+def apply_session_event(attendee, kind, at):
+	"""
+	Fold a join or leave into an attendee's first join and last leave.
+
+	Args:
+		attendee: dict with joined_at and left_at
+		kind: 'joined' or 'left'
+		at: Time of the event (naive, system timezone)
+	"""
+	if kind == "joined":
+		if not attendee.joined_at or at < attendee.joined_at:
+			attendee.joined_at = at
+
+		# Rejoined after leaving: in the meeting again
+		if attendee.left_at and at >= attendee.left_at:
+			attendee.left_at = None
+
+	elif not attendee.left_at or at > attendee.left_at:
+		attendee.left_at = at
+
+
+def insert_attendees(meeting, attendees, next_idx):
+	"""
+	Append attendee rows for newly seen participants with one multi-row INSERT.
+
+	Args:
+		meeting: VidCon Meeting name
+		attendees: dicts with participant_id, full_name, joined_at and left_at
+		next_idx: Row number of the first new attendee
+	"""
+	timestamp = now()
+	user = frappe.session.user
+
+	values = []
+	for idx, attendee in enumerate(attendees, start=next_idx):
+		values.append((
+			make_autoname("hash", ATTENDEE_DOCTYPE),
+			timestamp,
+			timestamp,
+			user,
+			user,
+			0,
+			meeting,
+			"VidCon Meeting",
+			"attendees",
+			idx,
+			"External",
+			attendee.participant_id,
+			attendee.full_name,
+			1,
+			attendee.joined_at,
+			attendee.left_at
+		))
+
+	frappe.db.bulk_insert(
+		ATTENDEE_DOCTYPE,
+		fields=[
+			"name", "creation", "modified", "owner", "modified_by", "docstatus", "parent", "parenttype",
+			"parentfield", "idx", "attendee_type", "participant_id", "full_name", "attended", "joined_at", "left_at"
+		],
+		values=values
+	)
+
+
+def to_system_datetime(value):
+	"""
+	Convert an RFC 3339 timestamp to a naive datetime in the system timezone.
+
+	Args:
+		value: e.g. '2026-10-16T09:00:00.123456789Z'; None means now
+
+	Returns:
+		datetime
+	"""
+	utc = datetime.fromtimestamp(parse_publish_time(value), timezone.utc).replace(tzinfo=None)
+	return convert_utc_to_system_timezone(utc).replace(tzinfo=None)
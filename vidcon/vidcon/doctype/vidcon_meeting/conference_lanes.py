@@ -0,0 +1,259 @@
+"""
+Per-conference ordered event lanes
+
+Events for one conference are added to a Redis sorted set scored by their
+Pub/Sub publishTime and applied one at a time, lowest score first, by a drain
+job holding the conference's lock. Submitting an event only queues it and
+enqueues the conference's drain job (deduplicated per lane), so the request
+that received it returns without running any handler. A drain that finds the
+lock taken leaves the lane to the holder, so handlers never run concurrently
+for the same conference and queued events are applied in publish order.
+Different conferences use different lanes and locks and run fully in parallel.
+
+Ordering within a lane only covers events queued together, so the publishTime
+of the last event applied is also kept per conference for the conference and
+per participant. An event older than that is marked Ignored instead of being
+applied when it would move state backwards: a started/ended event redelivered
+after a later one, or a leave published before the participant's latest join.
+A late join is still applied, since attendee_tracker.apply_session_event keeps
+the first join and never clears a later leave for it. Artifact events are
+idempotent and not tracked.
+
+Lanes live in the RQ Redis so that queued events survive cache evictions. An
+event is only removed from its lane after it has been applied. Lanes left
+behind by a worker that died, or by an event queued as a drain job was
+finishing, are drained by the scheduler.
+"""
+
+import calendar
+import json
+import time
+from datetime import datetime
+
+import frappe
+import redis
+from frappe.utils.background_jobs import get_redis_conn
+
+from vidcon.vidcon.doctype.vidcon_meeting.metrics import incr
+from vidcon.vidcon.doctype.vidcon_meeting.vidcon_logger import get_logger
+
+
+LANE_KEY_PREFIX = "vidcon:conference_lane:"
+LOCK_KEY_PREFIX = "vidcon:conference_lock:"
+
+# Conferences with events waiting in their lane
+ACTIVE_LANES_KEY = "vidcon:conference_lanes"
+
+# Hash per conference of the last publishTime applied per order field
+APPLIED_KEY_PREFIX = "vidcon:conference_applied:"
+
+# Pub/Sub retains unacked messages for up to 7 days
+APPLIED_TTL = 7 * 24 * 3600
+
+CONFERENCE_EVENT_TYPES = (
+	"google.workspace.meet.conference.v2.started",
+	"google.workspace.meet.conference.v2.ended"
+)
+PARTICIPANT_JOINED = "google.workspace.meet.participant.v2.joined"
+PARTICIPANT_LEFT = "google.workspace.meet.participant.v2.left"
+
+LOCK_TIMEOUT = 300
+
+# Queue of the per-conference drain jobs
+DRAIN_QUEUE = "short"
+
+log = get_logger("lanes")
+
+
+def submit(conference_id, publish_time, event_type, event_id, event_data, attributes=None, log_name=None,
+		references=None):
+	"""
+	Add an event to its conference's lane and enqueue the lane's drain job,
+	unless one is already queued. The conference's participants are listed
+	ahead of its participant events being written.
+
+	Args:
+		conference_id: Meet conference ID the event belongs to
+		publish_time: Pub/Sub publishTime (RFC 3339), used as the lane order
+		event_type: CloudEvents type
+		event_id: CloudEvents ce-id, keeps lane entries unique
+		event_data: Decoded event payload
+		attributes: CloudEvents attributes of the message
+		log_name: VidCon Event Log to mark Processed/Failed once applied
+		references: Extra VidCon Event Log values set when Processed
+	"""
+	conn = get_redis_conn()
+	entry = json.dumps({
+		"event_type": event_type,
+		"event_id": event_id or frappe.generate_hash(length=12),
+		"event_data": event_data,
+		"attributes": attributes,
+		"log_name": log_name,
+		"references": references
+	}, sort_keys=True, default=str)
+
+	conn.zadd(make_key(LANE_KEY_PREFIX + conference_id), {entry: parse_publish_time(publish_time)})
+	conn.sadd(make_key(ACTIVE_LANES_KEY), conference_id)
+
+	from vidcon.vidcon.doctype.vidcon_meeting.participant_identity import prefetch_participants
+
+	prefetch_participants(conference_id)
+
+	# Events arriving while the job is queued are applied by that same job
+	frappe.enqueue(
+		"vidcon.vidcon.doctype.vidcon_meeting.conference_lanes.drain",
+		queue=DRAIN_QUEUE,
+		job_id=get_drain_job_id(conference_id),
+		deduplicate=True,
+		conference_id=conference_id
+	)
+
+
+def drain(conference_id):
+	"""
+	Background job: apply the events waiting in a conference's lane in
+	publishTime order.
+
+	Returns immediately if another worker holds the conference's lock; that
+	worker will apply what was added.
+
+	Args:
+		conference_id: Meet conference ID
+	"""
+	from vidcon.vidcon.doctype.vidcon_meeting.google_meet_events import apply_event, mark_event_log_ignored
+
+	conn = get_redis_conn()
+	lane_key = make_key(LANE_KEY_PREFIX + conference_id)
+	applied_key = make_key(APPLIED_KEY_PREFIX + conference_id)
+
+	while True:
+		lock = conn.lock(make_key(LOCK_KEY_PREFIX + conference_id), timeout=LOCK_TIMEOUT)
+		if not lock.acquire(blocking=False):
+			return
+
+		try:
+			while True:
+				entries = conn.zrange(lane_key, 0, 0, withscores=True)
+				if not entries:
+					break
+
+				member, publish_time = entries[0]
+				entry = json.loads(member)
+
+				field = get_order_field(entry["event_type"], entry["event_data"])
+				applied_time = conn.hget(applied_key, field) if field else None
+
+				if entry["event_type"] != PARTICIPANT_JOINED and is_late(applied_time, publish_time):
+					log.info("Ignoring late %s for conference %s", entry["event_type"], conference_id)
+					incr("late_events")
+					if entry.get("log_name"):
+						mark_event_log_ignored(entry["log_name"], entry.get("references"))
+
+				else:
+					apply_event(
+						entry["event_type"],
+						entry["event_data"],
+						attributes=entry.get("attributes"),
+						log_name=entry.get("log_name"),
+						references=entry.get("references")
+					)
+					if field and not is_late(applied_time, publish_time):
+						conn.hset(applied_key, field, publish_time)
+						conn.expire(applied_key, APPLIED_TTL)
+
+				conn.zrem(lane_key, member)
+
+		finally:
+			try:
+				lock.release()
+			except redis.exceptions.LockError:
+				log.warning("Lane lock for conference %s expired while applying events", conference_id)
+
+		# An event added between our last check and the release found the lock
+		# taken; pick it up instead of leaving it stranded
+		if not conn.zcard(lane_key):
+			conn.srem(make_key(ACTIVE_LANES_KEY), conference_id)
+			if not conn.zcard(lane_key):
+				return
+			conn.sadd(make_key(ACTIVE_LANES_KEY), conference_id)
+
+
+def drain_stalled_lanes():
+	"""
+	Scheduler job: apply lanes left with events by a worker that died.
+	"""
+	conn = get_redis_conn()
+	for conference_id in conn.smembers(make_key(ACTIVE_LANES_KEY)):
+		drain(frappe.safe_decode(conference_id))
+
+
+def get_drain_job_id(conference_id):
+	"""Get the job ID of a conference's drain job."""
+	return f"vidcon_conference_lane:{conference_id}"
+
+
+def get_order_field(event_type, event_data):
+	"""
+	Get what an event is ordered against within its conference.
+
+	Args:
+		event_type: CloudEvents type
+		event_data: Decoded event payload
+
+	Returns:
+		str: 'conference' for lifecycle events, the participant resource name
+			for participant events, or None for events applied in any order
+	"""
+	if event_type in CONFERENCE_EVENT_TYPES:
+		return "conference"
+
+	if event_type in (PARTICIPANT_JOINED, PARTICIPANT_LEFT):
+		# conferenceRecords/CONF_ID/participants/PART_ID/participantSessions/SESSION_ID
+		parts = (event_data.get("participantSession") or {}).get("name", "").split("/")
+		if len(parts) >= 4:
+			return "/".join(parts[:4])
+
+	return None
+
+
+def is_late(applied_time, publish_time):
+	"""
+	Check whether an event was published before the last one applied for the
+	same order field.
+
+	Args:
+		applied_time: Stored publishTime (epoch seconds) of the last applied
+			event, or None
+		publish_time: The event's publishTime in epoch seconds
+
+	Returns:
+		bool
+	"""
+	return applied_time is not None and publish_time < float(applied_time)
+
+
+def parse_publish_time(value):
+	"""
+	Convert a Pub/Sub publishTime to epoch seconds.
+
+	Args:
+		value: e.g. '2026-10-16T09:00:00.123456789Z'; fractional digits may be
+			nanoseconds, which datetime can't parse
+
+	Returns:
+		float: Seconds since the epoch, or the current time if value is missing
+	"""
+	if not value:
+		return time.time()
+
+	try:
+		seconds, _, fraction = value.rstrip("Z").partition(".")
+		parsed = datetime.strptime(seconds, "%Y-%m-%dT%H:%M:%S")
+		return calendar.timegm(parsed.timetuple()) + float(f"0.{fraction or 0}")
+	except ValueError:
+		return time.time()
+
+
+def make_key(key):
+	"""Namespace a Redis key by site."""
+	return frappe.cache.make_key(key)
@@ -0,0 +1,177 @@
+"""
+Meet event dispatch registry
+
+Maps CloudEvents types to handlers declared by apps in hooks.py:
+
+	vidcon_event_handlers = {
+		"google.workspace.meet.conference.v2.started": "myapp.meet.on_conference_started"
+	}
+
+Handlers are called as handler(event_data, attributes=attributes), where
+attributes are the message's CloudEvents attributes (ce-subject names the Meet
+space, ce-source the subscription).
+
+Several apps may register handlers for the same type; all of them run. A
+handler runs inline unless it is declared with @event_handler(queue=...), in
+which case it is enqueued on that queue instead.
+
+Every handler gets call, error and enqueue counters and a timing metric, named
+after its dotted path (see metrics.get_metrics).
+"""
+
+import time
+from collections.abc import Callable
+
+import frappe
+
+from vidcon.vidcon.doctype.vidcon_meeting.metrics import incr, observe
+from vidcon.vidcon.doctype.vidcon_meeting.vidcon_logger import get_logger
+
+
+HOOK_NAME = "vidcon_event_handlers"
+
+DEFAULT_QUEUE_TIMEOUT = 1500
+
+# Resolved handlers per site: {site: {event_type: [(path, handler), ...]}}
+_registry: dict[str | None, dict[str, list[tuple[str, Callable]]]] = {}
+
+log = get_logger("dispatch")
+
+
+def event_handler(queue=None, timeout=None):
+	"""
+	Declare how a Meet event handler runs.
+
+	Args:
+		queue: RQ queue to run the handler on (e.g. 'long'); None runs it inline
+		timeout: Job timeout in seconds when queued
+
+	Usage:
+		@event_handler(queue="long")
+		def handle_transcript_ready(event_data, attributes=None):
+			...
+	"""
+	def decorator(handler):
+		handler.vidcon_queue = queue
+		handler.vidcon_timeout = timeout
+		return handler
+
+	return decorator
+
+
+def get_handlers(event_type):
+	"""
+	Get the handlers registered for an event type.
+
+	Args:
+		event_type: CloudEvents type
+
+	Returns:
+		list: (dotted path, callable) tuples
+	"""
+	site = getattr(frappe.local, "site", None)
+
+	registry = _registry.get(site)
+	if registry is None:
+		registry = _registry[site] = load_registry()
+
+	return registry.get(event_type, [])
+
+
+def load_registry():
+	"""
+	Resolve the handlers declared in hooks, once per process and site.
+
+	Returns:
+		dict: {event_type: [(dotted path, callable), ...]}
+	"""
+	registry = {}
+	for event_type, paths in (frappe.get_hooks(HOOK_NAME) or {}).items():
+		for path in paths:
+			try:
+				registry.setdefault(event_type, []).append((path, frappe.get_attr(path)))
+			except Exception as e:
+				log.failure("Invalid Meet Event Handler", f"{event_type}: {path}\nError: {str(e)}")
+
+	return registry
+
+
+def dispatch(event_type, event_data, attributes=None):
+	"""
+	Run or enqueue every handler registered for an event type.
+
+	All handlers run even if one fails; the first error is raised afterwards so
+	the caller can mark the event as failed.
+
+	Args:
+		event_type: CloudEvents type
+		event_data: Decoded event payload
+		attributes: CloudEvents attributes of the message
+	"""
+	handlers = get_handlers(event_type)
+	if not handlers:
+		incr("unhandled_events")
+		log.info("Unhandled event type: %s", event_type)
+		return
+
+	first_error = None
+	for path, handler in handlers:
+		queue = getattr(handler, "vidcon_queue", None)
+
+		try:
+			if queue:
+				frappe.enqueue(
+					"vidcon.vidcon.doctype.vidcon_meeting.event_registry.run_queued_handler",
+					queue=queue,
+					timeout=getattr(handler, "vidcon_timeout", None) or DEFAULT_QUEUE_TIMEOUT,
+					enqueue_after_commit=True,
+					path=path,
+					event_type=event_type,
+					event_data=event_data,
+					attributes=attributes
+				)
+				incr(f"handler:{path}:enqueued")
+			else:
+				run_handler(path, handler, event_data, attributes)
+		except Exception as e:
+			first_error = first_error or e
+
+	if first_error:
+		raise first_error
+
+
+def run_handler(path, handler, event_data, attributes=None):
+	"""
+	Run a handler, recording its timing and call/error counters.
+
+	Args:
+		path: Dotted path the handler was registered under
+		handler: Callable taking the event payload and attributes
+		event_data: Decoded event payload
+		attributes: CloudEvents attributes of the message
+	"""
+	start = time.perf_counter()
+	try:
+		handler(event_data, attributes=attributes or {})
+	except Exception as e:
+		incr(f"handler:{path}:errors")
+		log.failure("Meet Event Handler Error", f"{path}\nError: {str(e)}")
+		raise
+	finally:
+		incr(f"handler:{path}:calls")
+		observe(f"handler:{path}_ms", (time.perf_counter() - start) * 1000)
+
+
+def run_queued_handler(path, event_type, event_data, attributes=None):
+	"""
+	Background job: run a handler declared with a queue.
+
+	Args:
+		path: Dotted path of the handler
+		event_type: CloudEvents type, for logging
+		event_data: Decoded event payload
+		attributes: CloudEvents attributes of the message
+	"""
+	log.debug("Running queued handler %s for %s", path, event_type)
+	run_handler(path, frappe.get_attr(path), event_data, attributes)
+	frappe.db.commit()
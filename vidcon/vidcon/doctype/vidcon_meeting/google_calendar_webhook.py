@@ -62,9 +62,8 @@ def process_calendar_change(channel_id, resource_uri):
 			return
 		
 		# Get the Google Calendar service
-		from frappe.integrations.doctype.google_calendar.google_calendar import get_google_calendar_object
-		google_calendar = frappe.get_doc("Google Calendar", settings.google_calendar)
-		service = get_google_calendar_object(google_calendar)
+		from vidcon.vidcon.doctype.vidcon_meeting.google_clients import get_service
+		service = get_service('calendar', 'v3', settings.google_calendar)
 		
 		# Fetch recent events (last hour)
 		from datetime import datetime, timedelta
@@ -130,14 +129,10 @@ def update_meeting_from_event(meeting_name, event):
 				meeting.save(ignore_permissions=True)
 				frappe.logger().info(f"Meeting {meeting_name} marked as completed")
 				
-				# Trigger transcript retrieval
-				frappe.enqueue(
-					"vidcon.vidcon.doctype.vidcon_meeting.google_calendar_webhook.fetch_meeting_transcript",
-					queue="default",
-					timeout=600,
-					meeting_name=meeting_name,
-					enqueue_after_commit=True
-				)
+				# Trigger transcript retrieval once Google has had time to generate it
+				from vidcon.vidcon.doctype.vidcon_meeting.transcript_pipeline import request_transcript
+				delay_minutes = frappe.db.get_single_value("VidCon Settings", "transcript_fetch_delay") or 10
+				request_transcript(meeting_name, delay=delay_minutes * 60)
 		
 	except Exception as e:
 		frappe.logger().error(f"Error updating meeting {meeting_name}: {str(e)}")
@@ -145,87 +140,71 @@ def update_meeting_from_event(meeting_name, event):
 
 def fetch_meeting_transcript(meeting_name):
 	"""
-	Fetch transcript from Google Drive after meeting completion.
-	Transcripts are typically available 10-15 minutes after meeting ends.
+	Fetch a meeting's transcript through the transcript pipeline.
+	Kept for jobs enqueued under this name.
 	"""
-	try:
-		meeting = frappe.get_doc("VidCon Meeting", meeting_name)
-		
-		if not meeting.google_meet_link:
-			frappe.logger().error(f"No Meet link for {meeting_name}")
-			return
-		
-		# Extract meeting code from Meet link
-		# Format: https://meet.google.com/abc-defg-hij
-		meet_code = meeting.google_meet_link.split('/')[-1]
-		
-		# Get Google Drive service
-		settings = frappe.get_single("VidCon Settings")
-		if not settings.google_calendar:
-			return
-		
-		google_calendar = frappe.get_doc("Google Calendar", settings.google_calendar)
-		
-		# Build Drive service using same credentials
-		from google.oauth2.credentials import Credentials
-		from googleapiclient.discovery import build
-		
-		credentials = Credentials(
-			token=google_calendar.get_password("access_token"),
-			refresh_token=google_calendar.get_password("refresh_token"),
-			token_uri="https://oauth2.googleapis.com/token",
-			client_id=google_calendar.client_id,
-			client_secret=google_calendar.get_password("client_secret")
-		)
-		
-		drive_service = build('drive', 'v3', credentials=credentials, static_discovery=False)
-		
-		# Search for transcript file
-		# Google Meet transcripts are typically named: "Meet Recording - [Title] - [Date].txt"
-		# or stored in a specific folder
-		query = f"name contains '{meet_code}' and mimeType='text/plain'"
-		
-		results = drive_service.files().list(
-			q=query,
-			spaces='drive',
-			fields='files(id, name, createdTime, webViewLink)',
-			orderBy='createdTime desc'
-		).execute()
-		
-		files = results.get('files', [])
-		
-		if files:
-			# Found transcript file(s)
-			for file in files:
-				# Download transcript content
-				file_id = file['id']
-				content = drive_service.files().get_media(fileId=file_id).execute()
-				
-				# Store transcript in VidCon Meeting
-				meeting.transcript = content.decode('utf-8') if isinstance(content, bytes) else content
-				meeting.transcript_file_id = file_id
-				meeting.transcript_url = file.get('webViewLink')
-				meeting.save(ignore_permissions=True)
-				
-				frappe.logger().info(f"Transcript saved for {meeting_name}")
-				break
-		else:
-			# Transcript not found yet - retry after delay
-			frappe.logger().info(f"Transcript not found for {meeting_name}, will retry")
-			# Retry after 5 minutes
-			frappe.enqueue(
-				"vidcon.vidcon.doctype.vidcon_meeting.google_calendar_webhook.fetch_meeting_transcript",
-				queue="default",
-				timeout=600,
-				meeting_name=meeting_name,
-				enqueue_after_commit=True,
-				at_front=False,
-				now=False
-			)
+	from vidcon.vidcon.doctype.vidcon_meeting.transcript_pipeline import request_transcript
+	request_transcript(meeting_name)
+
+
+def store_transcript_from_drive_search(meeting, drive_service):
+	"""
+	Store a transcript found by searching Drive for the meeting code.
+	This is the most expensive source, tried after the Meet API ones.
 	
-	except Exception as e:
-		frappe.logger().error(f"Error fetching transcript for {meeting_name}: {str(e)}")
-		frappe.log_error(title="Transcript Fetch Error", message=str(e))
+	Args:
+		meeting: VidCon Meeting document
+		drive_service: Drive API client
+	
+	Returns:
+		bool: True if stored, False if no transcript file was found
+	"""
+	from vidcon.vidcon.doctype.vidcon_meeting.meet_utils import extract_space_id_from_meet_link
+	
+	# Extract meeting code from Meet link
+	# Format: https://meet.google.com/abc-defg-hij
+	meet_code = extract_space_id_from_meet_link(meeting.google_meet_link)
+	if not meet_code:
+		frappe.logger().error(f"No Meet link for {meeting.name}")
+		return False
+	
+	# Search for transcript file
+	# Google Meet transcripts are typically named: "Meet Recording - [Title] - [Date].txt"
+	# or stored in a specific folder
+	query = f"name contains '{meet_code}' and mimeType='text/plain'"
+	
+	results = drive_service.files().list(
+		q=query,
+		spaces='drive',
+		fields='files(id, name, createdTime, webViewLink)',
+		orderBy='createdTime desc',
+		pageSize=1
+	).execute()
+	
+	files = results.get('files', [])
+	if not files:
+		frappe.logger().info(f"Transcript not found in Drive for {meeting.name}")
+		return False
+	
+	# Download the newest transcript in chunks into the transcript file
+	from vidcon.vidcon.doctype.vidcon_meeting.transcript_store import TranscriptFile, download_media
+	
+	file = files[0]
+	file_id = file['id']
+	with TranscriptFile(meeting.name) as transcript_file:
+		download_media(drive_service.files().get_media(fileId=file_id), transcript_file)
+		file_doc = transcript_file.attach()
+	
+	# Store transcript in VidCon Meeting
+	meeting.transcript = transcript_file.get_inline_text()
+	meeting.transcript_file = file_doc.file_url
+	meeting.transcript_file_id = file_id
+	meeting.transcript_url = file.get('webViewLink')
+	meeting.transcript_retrieved_at = frappe.utils.now_datetime()
+	meeting.save(ignore_permissions=True)
+	
+	frappe.logger().info(f"Transcript saved for {meeting.name}")
+	return True
 
 
 def setup_calendar_watch(google_calendar_name):
@@ -234,12 +213,11 @@ def setup_calendar_watch(google_calendar_name):
 	This needs to be called to start receiving notifications.
 	"""
 	try:
-		from frappe.integrations.doctype.google_calendar.google_calendar import get_google_calendar_object
+		from vidcon.vidcon.doctype.vidcon_meeting.google_clients import get_service
 		import uuid
 		from datetime import datetime, timedelta
 		
-		google_calendar = frappe.get_doc("Google Calendar", google_calendar_name)
-		service = get_google_calendar_object(google_calendar)
+		service = get_service('calendar', 'v3', google_calendar_name)
 		
 		# Generate unique channel ID
 		channel_id = str(uuid.uuid4())
@@ -280,10 +258,9 @@ def stop_calendar_watch(channel_id, resource_id, google_calendar_name):
 	Stop Google Calendar push notifications.
 	"""
 	try:
-		from frappe.integrations.doctype.google_calendar.google_calendar import get_google_calendar_object
+		from vidcon.vidcon.doctype.vidcon_meeting.google_clients import get_service
 		
-		google_calendar = frappe.get_doc("Google Calendar", google_calendar_name)
-		service = get_google_calendar_object(google_calendar)
+		service = get_service('calendar', 'v3', google_calendar_name)
 		
 		body = {
 			'id': channel_id,
@@ -0,0 +1,252 @@
+"""
+Google API client factory
+
+build(..., static_discovery=False) downloads and parses the API's discovery
+document on every call. get_service instead builds clients from discovery
+documents cached in memory and on disk (refreshed once a day, and served stale
+if Google can't be reached), and reuses the built client per worker thread,
+site, calendar and API, so a job only pays for the API calls it makes.
+execute_batch sends many calls of one client through Google's HTTP batch
+endpoint.
+
+Clients authenticate with VidConCredentials, which take their access token
+from the shared token cache in subscription_manager instead of refreshing it
+themselves, and send requests through the pooled transport in google_transport.
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+import frappe
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import DISCOVERY_URI, V2_DISCOVERY_URI, build_from_document
+
+from vidcon.vidcon.doctype.vidcon_meeting.google_transport import get_authorized_http, request
+from vidcon.vidcon.doctype.vidcon_meeting.metrics import incr, observe
+from vidcon.vidcon.doctype.vidcon_meeting.vidcon_logger import get_logger
+
+
+# Discovery documents are refreshed this often
+DISCOVERY_TTL = 24 * 3600
+
+DISCOVERY_FETCH_TIMEOUT = 10
+
+# Calls per HTTP batch request; Google recommends at most 100
+BATCH_SIZE = 100
+
+# {(api, version): {"document": str, "fetched_at": epoch seconds}}
+_discovery: dict[tuple[str, str], dict] = {}
+_discovery_lock = threading.Lock()
+
+# Built clients; httplib2 connections aren't thread-safe, so one set per thread
+_services = threading.local()
+
+log = get_logger("google_clients")
+
+
+class VidConCredentials(Credentials):
+	"""OAuth credentials refreshed through VidCon's shared access-token cache."""
+
+	def __init__(self, google_calendar_name):
+		super().__init__(token=None)
+		self.google_calendar_name = google_calendar_name
+
+	def refresh(self, request):
+		from vidcon.vidcon.doctype.vidcon_meeting.subscription_manager import (
+			clear_vidcon_access_token,
+			get_vidcon_token
+		)
+
+		# A token that hasn't expired is only refreshed after Google rejected it
+		if self.token and not self.expired:
+			clear_vidcon_access_token(self.google_calendar_name)
+
+		token = get_vidcon_token(self.google_calendar_name)
+		self.token = token["access_token"]
+		self.expiry = datetime.fromtimestamp(token["expires_at"], timezone.utc).replace(tzinfo=None)
+
+
+def get_service(api, version, google_calendar_name=None):
+	"""
+	Get a Google API client for VidCon's Google Calendar authorization.
+
+	Args:
+		api: API name, e.g. 'meet', 'drive', 'workspaceevents'
+		version: API version, e.g. 'v2'
+		google_calendar_name: Google Calendar to authenticate as; defaults to
+			VidCon Settings' calendar
+
+	Returns:
+		googleapiclient.discovery.Resource
+	"""
+	if not google_calendar_name:
+		google_calendar_name = frappe.db.get_single_value("VidCon Settings", "google_calendar")
+
+	discovery = get_discovery_document(api, version)
+
+	services = getattr(_services, "by_key", None)
+	if services is None:
+		services = _services.by_key = {}
+
+	key = (getattr(frappe.local, "site", None), google_calendar_name, api, version)
+	cached = services.get(key)
+	if cached and cached["fetched_at"] == discovery["fetched_at"]:
+		return cached["service"]
+
+	service = build_from_document(
+		discovery["document"],
+		http=get_authorized_http(VidConCredentials(google_calendar_name))
+	)
+	services[key] = {"service": service, "fetched_at": discovery["fetched_at"]}
+	incr("google_client_builds")
+
+	return service
+
+
+def execute_batch(service, requests_by_key, title, ignore_not_found=False):
+	"""
+	Send API requests through Google's HTTP batch endpoint, BATCH_SIZE at a time.
+
+	Each call succeeds or fails on its own; failures are collected rather than
+	raised, and logged once per batch operation.
+
+	Args:
+		service: API client the requests were built from
+		requests_by_key: {key: HttpRequest}
+		title: Operation name for logs
+		ignore_not_found: Treat 404 responses as successful (e.g. deleting twice)
+
+	Returns:
+		dict: {"succeeded": {key: response}, "failed": {key: error message}}
+	"""
+	from googleapiclient.errors import HttpError
+
+	succeeded = {}
+	failed = {}
+
+	# Content-IDs must be unique within a batch; keys may be any string
+	keys = list(requests_by_key)
+
+	def callback(request_id, response, exception):
+		key = keys[int(request_id)]
+		if exception is None:
+			succeeded[key] = response
+		elif ignore_not_found and isinstance(exception, HttpError) and exception.resp.status == 404:
+			succeeded[key] = None
+		else:
+			failed[key] = str(exception)
+
+	start = time.perf_counter()
+	for offset in range(0, len(keys), BATCH_SIZE):
+		chunk = range(offset, min(offset + BATCH_SIZE, len(keys)))
+		batch = service.new_batch_http_request(callback=callback)
+		for index in chunk:
+			batch.add(requests_by_key[keys[index]], request_id=str(index))
+
+		try:
+			batch.execute()
+		except Exception as e:
+			# The batch itself failed; calls without a response failed with it
+			for index in chunk:
+				if keys[index] not in succeeded:
+					failed.setdefault(keys[index], str(e))
+
+		incr("google_batch_requests")
+
+	incr("google_batch_calls", len(keys))
+	observe("google_batch_ms", (time.perf_counter() - start) * 1000)
+
+	if failed:
+		frappe.log_error(
+			title=f"{title}: {len(failed)} of {len(keys)} Failed",
+			message="\n".join(f"{key}: {error}" for key, error in failed.items())
+		)
+
+	return {"succeeded": succeeded, "failed": failed}
+
+
+def get_discovery_document(api, version):
+	"""
+	Get an API's discovery document from memory, disk, then Google.
+
+	Args:
+		api: API name
+		version: API version
+
+	Returns:
+		dict: {"document": discovery JSON text, "fetched_at": epoch seconds}
+	"""
+	now = time.time()
+	cached = _discovery.get((api, version))
+	if cached and cached["fetched_at"] + DISCOVERY_TTL > now:
+		return cached
+
+	with _discovery_lock:
+		cached = _discovery.get((api, version)) or read_discovery_file(api, version)
+		if cached and cached["fetched_at"] + DISCOVERY_TTL > now:
+			_discovery[(api, version)] = cached
+			return cached
+
+		try:
+			cached = {"document": fetch_discovery_document(api, version), "fetched_at": now}
+			write_discovery_file(api, version, cached["document"])
+		except Exception as e:
+			if not cached:
+				raise
+			log.warning("Discovery refresh failed for %s %s, using cached document: %s", api, version, str(e))
+			# Don't retry on every call while Google is unreachable
+			cached = {"document": cached["document"], "fetched_at": now - DISCOVERY_TTL + 300}
+
+		_discovery[(api, version)] = cached
+		return cached
+
+
+def fetch_discovery_document(api, version):
+	"""
+	Download a discovery document, trying the same URLs as googleapiclient.
+
+	Returns:
+		str: Discovery JSON text
+	"""
+	error = None
+	for uri in (DISCOVERY_URI, V2_DISCOVERY_URI):
+		incr("google_discovery_fetches")
+		response = request("GET", uri.format(api=api, apiVersion=version), timeout=DISCOVERY_FETCH_TIMEOUT)
+		if response.ok:
+			# Validate before it replaces a working copy
+			json.loads(response.text)
+			return response.text
+		error = f"HTTP {response.status_code} from {response.url}"
+
+	raise Exception(f"Discovery document not found for {api} {version}: {error}")
+
+
+def read_discovery_file(api, version):
+	"""Read a discovery document saved by an earlier worker, if any."""
+	path = get_discovery_path(api, version)
+	try:
+		with open(path) as f:
+			return {"document": f.read(), "fetched_at": os.path.getmtime(path)}
+	except OSError:
+		return None
+
+
+def write_discovery_file(api, version, document):
+	"""Save a discovery document atomically for other workers and restarts."""
+	path = get_discovery_path(api, version)
+	try:
+		os.makedirs(os.path.dirname(path), exist_ok=True)
+		temp_path = f"{path}.{os.getpid()}.tmp"
+		with open(temp_path, "w") as f:
+			f.write(document)
+		os.replace(temp_path, path)
+	except OSError as e:
+		log.warning("Could not save discovery document %s: %s", path, str(e))
+
+
+def get_discovery_path(api, version):
+	"""Discovery documents are kept under the site's private folder."""
+	return frappe.get_site_path("private", "vidcon_discovery", f"{api}.{version}.json")
@@ -1,12 +1,30 @@
 import frappe
 from frappe import _
-import json
-import base64
 import jwt
-from jwt import PyJWKClient
 import requests
+import time
 from datetime import datetime
 
+from vidcon.vidcon.doctype.vidcon_meeting.meeting_resolver import get_space_resource, resolve_meeting
+from vidcon.vidcon.doctype.vidcon_meeting.pubsub_envelope import decode_envelope
+from vidcon.vidcon.doctype.vidcon_meeting.vidcon_logger import get_logger
+
+
+log = get_logger("meet_events")
+
+# Pub/Sub redelivers for up to 7 days, but nearly all redeliveries arrive within
+# minutes; older duplicates are caught by the unique index on event_id
+EVENT_DEDUP_WINDOW = 24 * 3600
+EVENT_DEDUP_PREFIX = "vidcon:pubsub_event:"
+
+# An event is only claimed for this long until it has been recorded, so a
+# redelivery after a worker died mid-event is processed again (matches the
+# maximum Pub/Sub ack deadline)
+EVENT_CLAIM_TIMEOUT = 600
+
+# Maximum page size accepted by transcripts.entries.list
+TRANSCRIPT_ENTRIES_PAGE_SIZE = 100
+
 
 def verify_pubsub_jwt(token, audience):
 	"""
@@ -20,147 +38,146 @@ def verify_pubsub_jwt(token, audience):
 		dict: Decoded token payload if valid, None otherwise
 	"""
 	try:
-		# Google's public keys URL
-		jwks_url = "https://www.googleapis.com/oauth2/v3/certs"
+		from vidcon.vidcon.doctype.vidcon_meeting.pubsub_auth import (
+			GOOGLE_ISSUERS,
+			cache_claims,
+			get_cached_claims,
+			get_signing_key
+		)
 		
-		# Create JWK client to fetch Google's public keys
-		jwks_client = PyJWKClient(jwks_url)
+		# Pub/Sub reuses the same token until it expires; skip RSA verification on a hit
+		decoded = get_cached_claims(token, audience)
+		if decoded:
+			return decoded
 		
-		# Get the signing key from the token
-		signing_key = jwks_client.get_signing_key_from_jwt(token)
+		# Get the signing key from the token (served from the shared JWKS cache)
+		signing_key = get_signing_key(token)
 		
 		# Verify and decode the token
 		decoded = jwt.decode(
 			token,
-			signing_key.key,
+			signing_key,
 			algorithms=["RS256"],
 			audience=audience,
 			options={"verify_exp": True}
 		)
 		
 		# Verify issuer is Google
-		if decoded.get('iss') not in ['accounts.google.com', 'https://accounts.google.com']:
-			frappe.log_error(title="Invalid JWT Issuer", message=f"Issuer: {decoded.get('iss')}")
+		if decoded.get('iss') not in GOOGLE_ISSUERS:
+			log.warning("Rejected Pub/Sub JWT with issuer %s", decoded.get('iss'))
 			return None
 		
-		frappe.log_error(title="Pub/Sub JWT Verified", message=f"Token verified for email: {decoded.get('email')}")
+		cache_claims(token, decoded)
+		
+		log.debug("Pub/Sub JWT verified for %s", decoded.get('email'))
 		return decoded
 		
 	except jwt.ExpiredSignatureError:
-		frappe.log_error(title="JWT Expired", message="Pub/Sub JWT token has expired")
+		log.warning("Rejected expired Pub/Sub JWT")
 		return None
 	except jwt.InvalidAudienceError:
-		frappe.log_error(title="Invalid JWT Audience", message=f"Expected: {audience}")
+		log.warning("Rejected Pub/Sub JWT with wrong audience, expected %s", audience)
+		return None
+	except jwt.InvalidTokenError as e:
+		log.warning("Rejected invalid Pub/Sub JWT: %s", str(e))
 		return None
 	except Exception as e:
-		frappe.log_error(title="JWT Verification Failed", message=str(e))
+		log.failure("JWT Verification Failed", str(e))
 		return None
 
 
-def log_event(event_type, event_id, subscription_id, event_data, raw_payload):
+def log_event(event_type, event_id, subscription_id, event_data, raw_payload, attributes=None):
 	"""
 	Log incoming Pub/Sub event to VidCon Event Log for monitoring.
+	
+	The row is inserted and committed before the event is applied, so the unique
+	index on event_id gates dispatch when the Redis claim is gone (outside its
+	window, or while Redis is down). Only the fast-ack path buffers its rows.
+	
+	Returns:
+		str: Name of the VidCon Event Log row, or None if the event_id is
+			already logged (a redelivery)
+	
+	Raises:
+		Exception: If the row can't be written; the event is not applied
 	"""
 	try:
-		frappe.logger().info("\n" + "="*80)
-		frappe.logger().info("LOG_EVENT CALLED")
-		frappe.logger().info(f"event_type: {event_type}")
-		frappe.logger().info(f"event_type length: {len(event_type) if event_type else 0}")
-		frappe.logger().info(f"event_type type: {type(event_type)}")
-		frappe.logger().info(f"event_id: {event_id}")
-		frappe.logger().info(f"subscription_id: {subscription_id}")
-		frappe.logger().info("="*80 + "\n")
-		
-		# Extract space_id and conference_id from event data
-		space_id = None
-		conference_id = None
-		meeting = None
-		
-		# Parse based on event structure
-		if 'conferenceRecord' in event_data:
-			conference_name = event_data['conferenceRecord'].get('name', '')
-			if conference_name:
-				conference_id = conference_name.split('/')[-1]
-				frappe.logger().info(f"Extracted conference_id: {conference_id}")
-				# Try to find meeting by conference_id
-				meetings = frappe.get_all(
-					"VidCon Meeting",
-					filters={"google_conference_id": conference_id},
-					limit=1
-				)
-				if meetings:
-					meeting = meetings[0].name
-					frappe.logger().info(f"Found meeting: {meeting}")
-		
-		elif 'participantSession' in event_data:
-			session_name = event_data['participantSession'].get('name', '')
-			if session_name:
-				# Format: conferenceRecords/CONF_ID/participants/PART_ID/participantSessions/SESSION_ID
-				parts = session_name.split('/')
-				if len(parts) >= 2:
-					conference_id = parts[1]
-					frappe.logger().info(f"Extracted conference_id from session: {conference_id}")
-					# Try to find meeting by conference_id
-					meetings = frappe.get_all(
-						"VidCon Meeting",
-						filters={"google_conference_id": conference_id},
-						limit=1
-					)
-					if meetings:
-						meeting = meetings[0].name
-						frappe.logger().info(f"Found meeting: {meeting}")
-		
-		frappe.logger().info("\nCreating VidCon Event Log document...")
-		frappe.logger().info(f"  event_type: '{event_type}' (len={len(event_type) if event_type else 0})")
-		frappe.logger().info(f"  event_id: '{event_id}'")
-		frappe.logger().info(f"  subscription_id: '{subscription_id}'")
-		frappe.logger().info(f"  space_id: '{space_id}'")
-		frappe.logger().info(f"  conference_id: '{conference_id}'")
-		frappe.logger().info(f"  meeting: '{meeting}'")
-		frappe.logger().info(f"  raw_payload length: {len(raw_payload) if raw_payload else 0}")
+		conference_id, meeting = get_event_references(event_data, attributes)
 		
 		# Create event log
-		log = frappe.get_doc({
+		event_log = frappe.get_doc({
 			"doctype": "VidCon Event Log",
 			"event_type": event_type,
-			"event_id": event_id,
+			"event_id": event_id or None,
 			"subscription_id": subscription_id,
 			"received_at": frappe.utils.now(),
 			"status": "Received",
-			"space_id": space_id,
+			"space_id": get_space_resource(attributes),
 			"conference_id": conference_id,
 			"meeting": meeting,
 			"raw_payload": raw_payload
 		})
+		event_log.insert(ignore_permissions=True)
+		frappe.db.commit()
 		
-		frappe.logger().info("Document created, calling insert()...")
-		log.insert(ignore_permissions=True)
-		frappe.logger().info(f"Insert successful! Log name: {log.name}")
+		log.debug("Event log %s created for %s (%s)", event_log.name, event_type, event_id)
+		return event_log.name
 		
-		frappe.db.commit()
-		frappe.logger().info("Commit successful!")
-		frappe.logger().info("="*80 + "\n")
+	except frappe.UniqueValidationError:
+		# Unique index on event_id caught a redelivery outside the Redis window
+		frappe.db.rollback()
+		frappe.clear_messages()
+		return None
 		
 	except Exception as e:
 		import traceback
-		frappe.logger().info("\n" + "!"*80)
-		frappe.logger().info("ERROR IN LOG_EVENT!")
-		frappe.logger().info(f"Exception type: {type(e).__name__}")
-		frappe.logger().info(f"Exception message: {str(e)}")
-		frappe.logger().info(f"\nFull traceback:")
-		frappe.logger().info(traceback.format_exc())
-		frappe.logger().info("!"*80 + "\n")
 		
 		error_details = {
 			"error": str(e),
 			"traceback": traceback.format_exc(),
 			"event_type": event_type,
-			"event_type_length": len(event_type) if event_type else 0,
 			"event_id": event_id,
 			"subscription_id": subscription_id
 		}
-		frappe.logger().error(f"Error logging event: {str(e)}")
-		frappe.log_error(title="Event Logging Failed", message=frappe.as_json(error_details, indent=2))
+		log.failure("Event Logging Failed", frappe.as_json(error_details, indent=2))
+		raise
+
+
+def get_event_references(event_data, attributes=None):
+	"""
+	Get the conference ID and linked VidCon Meeting for an event payload.
+	
+	Args:
+		event_data: Decoded event payload
+		attributes: CloudEvents attributes of the message
+	
+	Returns:
+		tuple: (conference_id, meeting) - either may be None
+	"""
+	conference_id = get_conference_id(event_data)
+	return conference_id, resolve_meeting(conference_id, attributes)
+
+
+def get_conference_id(event_data):
+	"""
+	Get the conference ID from an event payload.
+	
+	Conference, participant session, recording and transcript resources are all
+	named under their conference record, e.g.
+	conferenceRecords/CONF_ID/participants/PART_ID/participantSessions/SESSION_ID
+	
+	Args:
+		event_data: Decoded event payload
+	
+	Returns:
+		str: Conference ID, or None
+	"""
+	for resource in ('conferenceRecord', 'participantSession', 'recording', 'transcript'):
+		name = (event_data.get(resource) or {}).get('name', '')
+		if name.startswith('conferenceRecords/'):
+			return name.split('/')[1]
+	
+	return None
 
 
 @frappe.whitelist(allow_guest=True, methods=['POST'])
@@ -169,26 +186,22 @@ def handle_pubsub_push():
 	Handle incoming Pub/Sub push notifications from Google Workspace Events.
 	This is the webhook endpoint that receives Meet event notifications.
 	
+	When Fast Ack is enabled in VidCon Settings, the request only authenticates,
+	buffers the envelope durably for the event log writer and acknowledges; the
+	event is dispatched to its handler by process_event_log on a background queue.
+	
 	Note: allow_guest=True is required for Pub/Sub push endpoint.
 	Security is handled by validating the JWT token from Google.
 	"""
+	from vidcon.vidcon.doctype.vidcon_meeting.metrics import observe
+	
+	started_at = time.perf_counter()
+	
 	try:
-		# Get the request data
-		envelope = frappe.local.form_dict
-		
-		# Log raw incoming message using frappe.log_error for visibility
-		frappe.log_error(
-			title="Pub/Sub Message Received",
-			message=f"Raw envelope:\n{json.dumps(envelope, indent=2)}"
-		)
-		
 		# Verify JWT token from Authorization header
 		auth_header = frappe.request.headers.get('Authorization', '')
 		if not auth_header.startswith('Bearer '):
-			frappe.log_error(
-				title="Missing JWT Token",
-				message="No Bearer token in Authorization header"
-			)
+			log.warning("Rejected Pub/Sub push without Bearer token")
 			return {"status": "error", "message": "Unauthorized"}, 401
 		
 		token = auth_header.replace('Bearer ', '')
@@ -200,647 +213,729 @@ def handle_pubsub_push():
 		# Verify the JWT token
 		decoded_token = verify_pubsub_jwt(token, audience)
 		if not decoded_token:
-			frappe.log_error(
-				title="JWT Verification Failed",
-				message="Invalid or expired JWT token from Pub/Sub"
-			)
 			return {"status": "error", "message": "Unauthorized"}, 401
 		
-		frappe.log_error(
-			title="JWT Verified Successfully",
-			message=f"Verified token for: {decoded_token.get('email')}"
+		# Frappe has already parsed the JSON body into form_dict; reuse it and
+		# keep the original bytes for storage
+		form_dict = frappe.local.form_dict
+		envelope = decode_envelope(
+			frappe.request.get_data(),
+			parsed=form_dict if form_dict.get('message') else None
 		)
 		
-		# Get the Pub/Sub message from request
-		envelope = frappe.request.get_json()
-		
 		if not envelope:
-			frappe.log_error(title="Empty Pub/Sub Message", message="No message in request body")
-			return {"status": "error", "message": "No message"}
-		
-		# Extract the Pub/Sub message
-		pubsub_message = envelope.get('message', {})
-		
-		if not pubsub_message:
-			frappe.logger().error("Invalid Pub/Sub envelope")
+			log.warning("Invalid Pub/Sub envelope")
 			return {"status": "error", "message": "Invalid envelope"}
 		
-		# Decode the base64-encoded data
-		data = pubsub_message.get('data', '')
-		if data:
-			decoded_data = base64.b64decode(data).decode('utf-8')
-			event_data = json.loads(decoded_data)
-		else:
-			event_data = {}
-		
-		# Get attributes
-		attributes = pubsub_message.get('attributes', {})
-		
-		# Debug logging
-		frappe.logger().info(f"\n=== Pub/Sub Message Received ===")
-		frappe.logger().info(f"Raw Envelope: {json.dumps(envelope, indent=2)}")
-		frappe.logger().info(f"\nAttributes: {json.dumps(attributes, indent=2)}")
-		frappe.logger().info(f"Event Data Keys: {list(event_data.keys())}")
-		frappe.logger().info(f"Event Data: {json.dumps(event_data, indent=2)}")
-		
-		# Extract event type - try multiple locations
-		# CloudEvents format uses 'type' in attributes
-		event_type = (
-			attributes.get('ce-type', '') or  # CloudEvents type in attributes
-			event_data.get('eventType', '') or  # eventType in data
-			event_data.get('type', '') or  # type in data
-			''
-		)
+		fast_ack = frappe.db.get_single_value("VidCon Settings", "enable_fast_ack")
 		
-		frappe.logger().info(f"Extracted event_type: '{event_type}'")
-		frappe.logger().info(f"Event type length: {len(event_type)}")
-		
-		# Get event ID and subscription from attributes or data
-		event_id = attributes.get('ce-id', pubsub_message.get('messageId', ''))
-		subscription_id = envelope.get('subscription', '')
+		# Always return 200 to acknowledge receipt
+		return receive_pubsub_envelope(envelope, fast_ack=fast_ack)
 		
-		frappe.logger().info(f"\n{'='*80}")
-		frappe.logger().info(f"PROCESSING EVENT: {event_type}")
-		frappe.logger().info(f"{'='*80}")
-		frappe.logger().info(f"Received Meet event: {event_type}")
+	except Exception as e:
+		log.failure("Pub/Sub Handler Error", str(e))
+		# Return 200 to prevent Pub/Sub from retrying
+		return {"status": "error", "message": str(e)}
+	
+	finally:
+		observe("webhook_ack_ms", (time.perf_counter() - started_at) * 1000)
+
+
+def receive_pubsub_envelope(envelope, fast_ack=False):
+	"""
+	Log and apply one authenticated Pub/Sub envelope. Shared by the push
+	endpoint and the streaming pull worker.
+	
+	Args:
+		envelope: PubSubEnvelope
+		fast_ack: Only buffer the envelope; it is dispatched by process_event_log
+	
+	Returns:
+		dict: Response status
+	"""
+	from vidcon.vidcon.doctype.vidcon_meeting.metrics import incr
+	
+	event_type = envelope.event_type
+	event_id = envelope.event_id
+	event_data = envelope.event_data
+	
+	log.debug("Event data: %s", event_data)
+	
+	# Pub/Sub is at-least-once; ack redeliveries without touching the database
+	if is_duplicate_event(event_id):
+		incr("duplicate_events")
+		return {"status": "ok", "duplicate": True}
+	
+	log.info("Received Meet event %s (%s)", event_type, event_id)
+	
+	log_name = None
+	try:
+		if fast_ack:
+			from vidcon.vidcon.doctype.vidcon_event_log.event_log_writer import buffer_event_log
+			
+			# Persist the raw envelope; it is dispatched once its log row is written
+			buffer_event_log({
+				"event_type": event_type,
+				"event_id": event_id or None,
+				"subscription_id": envelope.subscription,
+				"received_at": frappe.utils.now(),
+				"status": "Received",
+				"raw_payload": envelope.raw
+			}, dispatch=True)
+			confirm_event(event_id)
+			return {"status": "ok"}
 		
 		# Log the event to VidCon Event Log
-		log_event(
+		log_name = log_event(
 			event_type=event_type,
 			event_id=event_id,
-			subscription_id=subscription_id,
+			subscription_id=envelope.subscription,
 			event_data=event_data,
-			raw_payload=json.dumps(envelope, indent=2)
+			raw_payload=envelope.raw,
+			attributes=envelope.attributes
 		)
-		
-		# Process the event based on type
-		if event_type == 'google.workspace.meet.conference.v2.started':
-			frappe.logger().info(f"→ Calling handle_conference_started()")
-			handle_conference_started(event_data)
-		elif event_type == 'google.workspace.meet.conference.v2.ended':
-			frappe.logger().info(f"→ Calling handle_conference_ended()")
-			handle_conference_ended(event_data)
-		elif event_type == 'google.workspace.meet.participant.v2.joined':
-			frappe.logger().info(f"→ Calling handle_participant_joined()")
-			handle_participant_joined(event_data)
-		elif event_type == 'google.workspace.meet.participant.v2.left':
-			frappe.logger().info(f"→ Calling handle_participant_left()")
-			handle_participant_left(event_data)
-		elif event_type == 'google.workspace.meet.recording.v2.fileGenerated':
-			frappe.logger().info(f"→ Calling handle_recording_ready()")
-			handle_recording_ready(event_data)
-		elif event_type == 'google.workspace.meet.transcript.v2.fileGenerated':
-			frappe.logger().info(f"→ Calling handle_transcript_ready()")
-			handle_transcript_ready(event_data)
+		if not log_name:
+			incr("duplicate_events")
+			confirm_event(event_id)
+			return {"status": "ok", "duplicate": True}
+		
+		conference_id = get_conference_id(event_data)
+		if conference_id:
+			from vidcon.vidcon.doctype.vidcon_meeting.conference_lanes import submit
+			
+			# Serialized with the conference's other events, in publishTime order
+			submit(
+				conference_id,
+				envelope.publish_time,
+				event_type,
+				event_id,
+				event_data,
+				attributes=envelope.attributes,
+				log_name=log_name
+			)
 		else:
-			frappe.logger().info(f"⚠ Unhandled event type: {event_type}")
-			frappe.logger().info(f"Unhandled event type: {event_type}")
-		
-		frappe.logger().info(f"{'='*80}\n")
-		
-		# Always return 200 to acknowledge receipt
-		return {"status": "ok"}
-		
-	except Exception as e:
-		frappe.logger().error(f"Error handling Pub/Sub message: {str(e)}")
-		frappe.log_error(title="Pub/Sub Handler Error", message=str(e))
-		# Return 200 to prevent Pub/Sub from retrying
-		return {"status": "error", "message": str(e)}
+			apply_event(event_type, event_data, attributes=envelope.attributes, log_name=log_name)
+		
+	except Exception:
+		# Let a redelivery of this event through; its log row would otherwise
+		# mark it as a duplicate
+		if log_name:
+			frappe.db.rollback()
+			frappe.delete_doc("VidCon Event Log", log_name, ignore_permissions=True, force=True)
+			frappe.db.commit()
+		release_event(event_id)
+		raise
+	
+	confirm_event(event_id)
+	return {"status": "ok"}
 
 
-def handle_conference_started(event_data):
+def is_duplicate_event(event_id):
 	"""
-	Handle conference.started event.
-	Update VidCon Meeting status to In Progress.
+	Check whether an event was already received, claiming it if not.
+	
+	Uses an atomic Redis SET NX. The claim only lasts EVENT_CLAIM_TIMEOUT until
+	confirm_event extends it to the dedup window, and release_event drops it if
+	the event fails. If Redis can't answer, falls back to the unique index on
+	VidCon Event Log.event_id.
+	
+	Args:
+		event_id: CloudEvents ce-id (or Pub/Sub messageId)
+	
+	Returns:
+		bool: True if the event was seen before
 	"""
+	if not event_id:
+		return False
+	
 	try:
-		frappe.logger().info(f"\n=== HANDLING CONFERENCE STARTED ===")
-		frappe.logger().info(f"Event data: {json.dumps(event_data, indent=2)}")
-		
-		# Extract conference details
-		conference_record = event_data.get('conferenceRecord', {})
-		conference_name = conference_record.get('name', '')
-		conference_id = conference_name.split('/')[-1] if conference_name else ''
-		start_time = conference_record.get('startTime')
-		
-		frappe.logger().info(f"Conference ID: {conference_id}")
-		frappe.logger().info(f"Start time: {start_time}")
-		
-		# Find VidCon Meeting by conference ID or space ID
-		meetings = frappe.get_all(
-			"VidCon Meeting",
-			filters={
-				"google_conference_id": conference_id,
-				"status": "Scheduled"
-			},
-			fields=["name", "google_space_id", "google_meet_link"]
+		claimed = frappe.cache.set(
+			get_event_dedup_key(event_id),
+			1,
+			nx=True,
+			ex=EVENT_CLAIM_TIMEOUT
 		)
-		
-		frappe.logger().info(f"Found {len(meetings)} meetings by conference_id")
-		
-		# If not found by conference ID, try by space ID from subscription
-		if not meetings:
-			# Get space ID from the event (it's in the ce-subject attribute)
-			# We'll need to pass it from the main handler
-			frappe.logger().info(f"No meetings found by conference_id, trying all scheduled meetings")
-			meetings = frappe.get_all(
-				"VidCon Meeting",
-				filters={"status": "Scheduled"},
-				fields=["name", "google_space_id", "google_meet_link", "google_conference_id"]
-			)
-			frappe.logger().info(f"All scheduled meetings: {json.dumps(meetings, indent=2)}")
-		
-		for meeting in meetings:
-			meeting_doc = frappe.get_doc("VidCon Meeting", meeting.name)
-			
-			# Store conference ID if not already set
-			if not meeting_doc.google_conference_id:
-				meeting_doc.google_conference_id = conference_id
-			
-			meeting_doc.status = "In Progress"
-			meeting_doc.actual_start_time = start_time
-			meeting_doc.save(ignore_permissions=True)
-			
-			frappe.logger().info(f"✓ Meeting {meeting.name} marked as In Progress")
-			frappe.logger().info(f"Meeting {meeting.name} marked as In Progress")
-		
-		if not meetings:
-			frappe.logger().info(f"✗ No meetings found for conference {conference_id}")
-		
-		frappe.db.commit()
-		frappe.logger().info(f"=== CONFERENCE STARTED HANDLER COMPLETE ===\n")
-		
-	except Exception as e:
-		frappe.logger().info(f"✗ Error handling conference started: {str(e)}")
-		frappe.logger().error(f"Error handling conference started: {str(e)}")
-		frappe.log_error(title="Conference Started Handler Error", message=str(e))
+		return not claimed
+	except Exception:
+		return bool(frappe.db.exists("VidCon Event Log", {"event_id": event_id}))
 
 
-def handle_participant_joined(event_data):
+def confirm_event(event_id):
 	"""
-	Handle participant.joined event.
-	Create or update attendee record.
+	Keep an event's claim for the whole dedup window once it has been recorded.
+	
+	Args:
+		event_id: CloudEvents ce-id (or Pub/Sub messageId)
 	"""
+	if not event_id:
+		return
+	
 	try:
-		# Extract participant details
-		participant_session = event_data.get('participantSession', {})
-		session_name = participant_session.get('name', '')
-		
-		# Parse: conferenceRecords/CONF_ID/participants/PART_ID/participantSessions/SESSION_ID
-		parts = session_name.split('/')
-		if len(parts) >= 2:
-			conference_id = parts[1]
-			
-			frappe.logger().info(f"Participant joined conference: {conference_id}")
-			
-			# TODO: Implement attendee tracking
-			# - Find VidCon Meeting by conference_id
-			# - Extract participant email/name from session data
-			# - Create/update VidCon Meeting Attendee record
-			# - Set joined_at timestamp
-		
+		frappe.cache.expire(get_event_dedup_key(event_id), EVENT_DEDUP_WINDOW)
+	except Exception:
+		# The unique index on event_id still catches redeliveries
+		pass
+
+
+def release_event(event_id):
+	"""
+	Drop an event's claim so that a redelivery is processed again.
+	
+	Args:
+		event_id: CloudEvents ce-id (or Pub/Sub messageId)
+	"""
+	if not event_id:
+		return
+	
+	try:
+		frappe.cache.delete(get_event_dedup_key(event_id))
+	except Exception:
+		# The claim expires after EVENT_CLAIM_TIMEOUT
+		pass
+
+
+def get_event_dedup_key(event_id):
+	"""Redis key claiming an event ID for this site."""
+	return frappe.cache.make_key(f"{EVENT_DEDUP_PREFIX}{event_id}")
+
+
+def dispatch_event(event_type, event_data, attributes=None):
+	"""
+	Run the handlers registered for a Meet event type under the
+	vidcon_event_handlers hook (see event_registry).
+	
+	Args:
+		event_type: CloudEvents type (e.g. google.workspace.meet.conference.v2.started)
+		event_data: Decoded event payload
+		attributes: CloudEvents attributes of the message
+	
+	Raises:
+		Exception: The first error raised by a handler, after all have run
+	"""
+	from vidcon.vidcon.doctype.vidcon_meeting.event_registry import dispatch
+	
+	dispatch(event_type, event_data, attributes)
+
+
+def process_event_log(log_name):
+	"""
+	Background job: dispatch an event stored by the fast-ack webhook path.
+	Enqueued by the event log writer once the row has been written. Events that
+	belong to a conference go through its ordered lane (see conference_lanes).
+	
+	Args:
+		log_name: VidCon Event Log name
+	"""
+	event_log = frappe.db.get_value(
+		"VidCon Event Log",
+		log_name,
+		["name", "event_type", "status", "raw_payload"],
+		as_dict=True
+	)
+	if not event_log or event_log.status != "Received":
+		return
+	
+	envelope = None
+	try:
+		envelope = decode_envelope(event_log.raw_payload)
+		conference_id, meeting = get_event_references(envelope.event_data, envelope.attributes)
 	except Exception as e:
-		frappe.logger().error(f"Error handling participant joined: {str(e)}")
-		frappe.log_error(title="Participant Joined Handler Error", message=str(e))
+		mark_event_log_failed(log_name, e)
+		if envelope:
+			release_event(envelope.event_id)
+		return
+	
+	references = {
+		"conference_id": conference_id,
+		"meeting": meeting,
+		"space_id": get_space_resource(envelope.attributes)
+	}
+	
+	if conference_id:
+		from vidcon.vidcon.doctype.vidcon_meeting.conference_lanes import submit
+		
+		submit(
+			conference_id,
+			envelope.publish_time,
+			envelope.event_type,
+			envelope.event_id,
+			envelope.event_data,
+			attributes=envelope.attributes,
+			log_name=log_name,
+			references=references
+		)
+	else:
+		apply_event(
+			envelope.event_type,
+			envelope.event_data,
+			attributes=envelope.attributes,
+			log_name=log_name,
+			references=references
+		)
 
 
-def handle_participant_left(event_data):
+def apply_event(event_type, event_data, attributes=None, log_name=None, references=None):
 	"""
-	Handle participant.left event.
-	Update attendee record with left timestamp.
+	Dispatch an event and record the outcome on its VidCon Event Log, if any.
+	
+	Args:
+		event_type: CloudEvents type
+		event_data: Decoded event payload
+		attributes: CloudEvents attributes of the message
+		log_name: VidCon Event Log to mark Processed or Failed
+		references: Extra VidCon Event Log values set when Processed
 	"""
 	try:
-		# Extract participant details
-		participant_session = event_data.get('participantSession', {})
-		session_name = participant_session.get('name', '')
-		
-		# Parse: conferenceRecords/CONF_ID/participants/PART_ID/participantSessions/SESSION_ID
-		parts = session_name.split('/')
-		if len(parts) >= 2:
-			conference_id = parts[1]
-			
-			frappe.logger().info(f"Participant left conference: {conference_id}")
-			
-			# TODO: Implement attendee tracking
-			# - Find VidCon Meeting by conference_id
-			# - Find attendee record by participant session
-			# - Set left_at timestamp
-		
+		dispatch_event(event_type, event_data, attributes)
 	except Exception as e:
-		frappe.logger().error(f"Error handling participant left: {str(e)}")
-		frappe.log_error(title="Participant Left Handler Error", message=str(e))
+		# Already counted and logged per handler by the registry
+		frappe.db.rollback()
+		if log_name:
+			mark_event_log_failed(log_name, e)
+		return
+	
+	if log_name:
+		frappe.db.set_value("VidCon Event Log", log_name, {
+			"status": "Processed",
+			**(references or {})
+		}, update_modified=False)
+	frappe.db.commit()
+
+
+def mark_event_log_failed(log_name, error):
+	"""
+	Mark a VidCon Event Log as Failed, keeping the error message on the row.
+	
+	Args:
+		log_name: VidCon Event Log name
+		error: Exception raised while processing the event
+	"""
+	frappe.db.rollback()
+	frappe.db.set_value("VidCon Event Log", log_name, {
+		"status": "Failed",
+		"error_message": str(error)
+	}, update_modified=False)
+	frappe.db.commit()
+	log.warning("Event Log %s failed: %s", log_name, str(error))
+
+
+def mark_event_log_ignored(log_name, references=None):
+	"""
+	Mark a VidCon Event Log as Ignored, e.g. a lifecycle event that arrived
+	after a later one for its conference was applied.
+	
+	Args:
+		log_name: VidCon Event Log name
+		references: Extra VidCon Event Log values to set
+	"""
+	frappe.db.set_value("VidCon Event Log", log_name, {
+		"status": "Ignored",
+		**(references or {})
+	}, update_modified=False)
+	frappe.db.commit()
+
+
+def handle_conference_started(event_data, attributes=None):
+	"""
+	Handle conference.started event.
+	Update VidCon Meeting status to In Progress.
+	"""
+	# Extract conference details
+	conference_record = event_data.get('conferenceRecord', {})
+	conference_name = conference_record.get('name', '')
+	conference_id = conference_name.split('/')[-1] if conference_name else ''
+	start_time = conference_record.get('startTime')
+	
+	log.debug("Conference %s started at %s", conference_id, start_time)
+	
+	meeting = resolve_meeting(conference_id, attributes)
+	if not meeting:
+		log.info("No meeting found for conference %s", conference_id)
+		return
+	
+	meeting_doc = frappe.get_doc("VidCon Meeting", meeting)
+	if meeting_doc.status != "Scheduled":
+		log.info("Meeting %s is already %s", meeting, meeting_doc.status)
+		return
+	
+	# Store conference ID so later events for this conference resolve directly
+	if not meeting_doc.google_conference_id:
+		meeting_doc.google_conference_id = conference_id
+	
+	meeting_doc.status = "In Progress"
+	meeting_doc.actual_start_time = start_time
+	meeting_doc.save(ignore_permissions=True)
+	
+	log.info("Meeting %s marked as In Progress", meeting)
+	
+	frappe.db.commit()
+
+
+def handle_participant_joined(event_data, attributes=None):
+	"""
+	Handle participant.joined event.
+	Record the participant as attended; writes are coalesced per conference
+	by attendee_tracker.
+	"""
+	buffer_participant_session(event_data, attributes, "joined")
+
+
+def handle_participant_left(event_data, attributes=None):
+	"""
+	Handle participant.left event.
+	Record when the participant left; writes are coalesced per conference
+	by attendee_tracker.
+	"""
+	buffer_participant_session(event_data, attributes, "left")
+
 
+def buffer_participant_session(event_data, attributes, kind):
+	"""
+	Queue a participant session's join or leave for its meeting's attendees.
+	
+	Args:
+		event_data: Decoded participant event payload
+		attributes: CloudEvents attributes of the message
+		kind: 'joined' or 'left'
+	"""
+	from vidcon.vidcon.doctype.vidcon_meeting.attendee_tracker import buffer_participant_event
+	
+	# Extract participant details
+	participant_session = event_data.get('participantSession', {})
+	session_name = participant_session.get('name', '')
+	
+	# Parse: conferenceRecords/CONF_ID/participants/PART_ID/participantSessions/SESSION_ID
+	parts = session_name.split('/')
+	if len(parts) < 4:
+		log.warning("Invalid participant session name: %s", session_name)
+		return
+	
+	conference_id = parts[1]
+	log.debug("Participant %s conference: %s", kind, conference_id)
+	
+	meeting = resolve_meeting(conference_id, attributes)
+	if not meeting:
+		log.info("No meeting found for conference %s", conference_id)
+		return
+	
+	# Session times are only present when the subscription includes resources
+	at = (
+		participant_session.get('startTime' if kind == "joined" else 'endTime')
+		or (attributes or {}).get('ce-time')
+	)
+	
+	buffer_participant_event(conference_id, meeting, kind, "/".join(parts[:4]), at)
 
-def handle_conference_ended(event_data):
+
+def handle_conference_ended(event_data, attributes=None):
 	"""
 	Handle conference.ended event.
 	Update VidCon Meeting status and trigger transcript fetch.
 	"""
-	try:
-		frappe.logger().info(f"\n=== HANDLING CONFERENCE ENDED ===")
-		frappe.logger().info(f"Event data: {json.dumps(event_data, indent=2)}")
-		
-		# Extract conference details
-		conference_record = event_data.get('conferenceRecord', {})
-		conference_name = conference_record.get('name', '')
-		conference_id = conference_name.split('/')[-1] if conference_name else ''
-		space_name = conference_record.get('space', '')
-		end_time = conference_record.get('endTime')
-		
-		frappe.logger().info(f"Conference ID: {conference_id}")
-		frappe.logger().info(f"End time: {end_time}")
-		
-		# Find VidCon Meeting by conference ID
-		meetings = frappe.get_all(
-			"VidCon Meeting",
-			filters={
-				"google_conference_id": conference_id,
-				"status": ["in", ["Scheduled", "In Progress"]]
-			},
-			fields=["name", "google_meet_link", "google_conference_id"]
-		)
-		
-		frappe.logger().info(f"Found {len(meetings)} meetings by conference_id")
-		
-		# If not found, try all in-progress meetings
-		if not meetings:
-			frappe.logger().info(f"No meetings found by conference_id, trying all in-progress meetings")
-			meetings = frappe.get_all(
-				"VidCon Meeting",
-				filters={"status": ["in", ["Scheduled", "In Progress"]]},
-				fields=["name", "google_meet_link", "google_conference_id"]
-			)
-			frappe.logger().info(f"All in-progress meetings: {json.dumps(meetings, indent=2)}")
-		
-		for meeting in meetings:
-			meeting_doc = frappe.get_doc("VidCon Meeting", meeting.name)
-			
-			# Store conference ID if not already set
-			if not meeting_doc.google_conference_id:
-				meeting_doc.google_conference_id = conference_id
-			
-			meeting_doc.status = "Completed"
-			meeting_doc.actual_end_time = end_time
-			meeting_doc.save(ignore_permissions=True)
-			
-			frappe.logger().info(f"✓ Meeting {meeting.name} marked as Completed")
-			frappe.logger().info(f"Meeting {meeting.name} marked as completed")
-			
-			# Enqueue transcript fetch after delay
-			settings = frappe.get_single("VidCon Settings")
-			delay_minutes = settings.transcript_fetch_delay or 10
-			
-			frappe.enqueue(
-				"vidcon.vidcon.doctype.vidcon_meeting.google_meet_events.fetch_transcript_for_conference",
-				queue="default",
-				timeout=600,
-				conference_id=conference_id,
-				meeting_name=meeting.name,
-				enqueue_after_commit=True,
-				# Schedule for later based on delay
-				at_front=False
-			)
-			frappe.logger().info(f"Transcript fetch enqueued for {meeting.name} after {delay_minutes} minutes")
-		
-		frappe.db.commit()
-		frappe.logger().info(f"=== CONFERENCE ENDED HANDLER COMPLETE ===\n")
-		
-	except Exception as e:
-		frappe.logger().info(f"✗ Error handling conference ended: {str(e)}")
-		frappe.logger().error(f"Error handling conference ended: {str(e)}")
-		frappe.log_error(title="Conference Ended Handler Error", message=str(e))
+	
+	# Extract conference details
+	conference_record = event_data.get('conferenceRecord', {})
+	conference_name = conference_record.get('name', '')
+	conference_id = conference_name.split('/')[-1] if conference_name else ''
+	end_time = conference_record.get('endTime')
+	
+	log.debug("Conference %s ended at %s", conference_id, end_time)
+	
+	meeting = resolve_meeting(conference_id, attributes)
+	if not meeting:
+		log.info("No meeting found for conference %s", conference_id)
+		return
+	
+	meeting_doc = frappe.get_doc("VidCon Meeting", meeting)
+	if meeting_doc.status not in ("Scheduled", "In Progress"):
+		log.info("Meeting %s is already %s", meeting, meeting_doc.status)
+		return
+	
+	# Store conference ID if not already set
+	if not meeting_doc.google_conference_id:
+		meeting_doc.google_conference_id = conference_id
+	
+	meeting_doc.status = "Completed"
+	meeting_doc.actual_end_time = end_time
+	meeting_doc.save(ignore_permissions=True)
+	
+	log.info("Meeting %s marked as Completed", meeting)
+	
+	# Enqueue transcript fetch after delay
+	settings = frappe.get_single("VidCon Settings")
+	delay_minutes = settings.transcript_fetch_delay or 10
+	
+	from vidcon.vidcon.doctype.vidcon_meeting.transcript_pipeline import request_transcript
+	request_transcript(meeting, conference_id=conference_id, delay=delay_minutes * 60)
+	log.debug("Transcript fetch scheduled for %s in %s minutes", meeting, delay_minutes)
+	
+	frappe.db.commit()
 
 
-def handle_recording_ready(event_data):
+def handle_recording_ready(event_data, attributes=None):
 	"""
 	Handle recording.fileGenerated event.
 	Store recording details in VidCon Meeting.
 	"""
-	try:
-		recording = event_data.get('recording', {})
-		conference_id = recording.get('conferenceRecord', '').split('/')[-1]
-		drive_file_id = recording.get('driveDestination', {}).get('file', '').split('/')[-1]
-		
-		frappe.logger().info(f"Recording ready for conference: {conference_id}")
-		
-		# Find VidCon Meeting
-		meetings = frappe.get_all(
-			"VidCon Meeting",
-			filters={"google_meet_link": ["like", f"%{conference_id}%"]},
-			fields=["name"]
-		)
-		
-		for meeting in meetings:
-			meeting_doc = frappe.get_doc("VidCon Meeting", meeting.name)
-			
-			# Store recording file ID (could add a field for this)
-			frappe.logger().info(f"Recording available for {meeting.name}: {drive_file_id}")
-			
-			# TODO: Add recording_file_id field to VidCon Meeting if needed
-			
-		frappe.db.commit()
-		
-	except Exception as e:
-		frappe.logger().error(f"Error handling recording ready: {str(e)}")
+	recording = event_data.get('recording', {})
+	conference_id = get_conference_id(event_data)
+	drive_file_id = recording.get('driveDestination', {}).get('file', '').split('/')[-1]
+	
+	log.debug("Recording ready for conference: %s", conference_id)
+	
+	# Find VidCon Meeting by conference, space or subscription (keyed lookups)
+	meeting = resolve_meeting(conference_id, attributes)
+	if not meeting:
+		log.warning("No meeting found for conference %s", conference_id)
+		return
+	
+	# Store recording file ID (could add a field for this)
+	log.debug("Recording available for %s: %s", meeting, drive_file_id)
+	
+	# TODO: Add recording_file_id field to VidCon Meeting if needed
 
 
-def handle_transcript_ready(event_data):
+def handle_transcript_ready(event_data, attributes=None):
 	"""
 	Handle transcript.fileGenerated event.
-	Get transcript details from Meet API and download from Drive.
+	Hand the transcript resource to the transcript pipeline, which tries it first.
 	"""
-	try:
-		frappe.logger().info(f"\n=== HANDLING TRANSCRIPT READY ===")
-		frappe.logger().info(f"Event data: {json.dumps(event_data, indent=2)}")
-		
-		transcript = event_data.get('transcript', {})
-		transcript_name = transcript.get('name', '')
-		
-		frappe.logger().info(f"Transcript name: {transcript_name}")
-		frappe.logger().info(f"Transcript ready: {transcript_name}")
-		
-		# Extract conference ID from transcript name
-		# Format: conferenceRecords/{conferenceId}/transcripts/{transcriptId}
-		parts = transcript_name.split('/')
-		if len(parts) >= 2:
-			conference_id = parts[1]
-		else:
-			frappe.logger().error(f"Invalid transcript name format: {transcript_name}")
-			return
-		
-		# Find VidCon Meeting by conference ID
-		meetings = frappe.get_all(
-			"VidCon Meeting",
-			filters={"google_conference_id": conference_id},
-			fields=["name"]
-		)
-		
-		if not meetings:
-			# Try finding by Meet link containing conference ID
-			meetings = frappe.get_all(
-				"VidCon Meeting",
-				filters={"google_meet_link": ["like", f"%{conference_id}%"]},
-				fields=["name"]
-			)
-		
-		frappe.logger().info(f"Found {len(meetings)} meetings for conference {conference_id}")
-		
-		for meeting in meetings:
-			frappe.logger().info(f"Downloading transcript for meeting: {meeting.name}")
-			# Get transcript details from Meet API and download
-			download_transcript_from_meet_api(meeting.name, transcript_name)
-		
-		if not meetings:
-			frappe.logger().warning(f"✗ No meetings found for conference {conference_id}")
-		
-		frappe.db.commit()
-		frappe.logger().info(f"=== TRANSCRIPT READY HANDLER COMPLETE ===")
-		
-	except Exception as e:
-		frappe.logger().error(f"✗ Error handling transcript ready: {str(e)}")
-		frappe.logger().error(f"Error handling transcript ready: {str(e)}")
-		frappe.log_error(title="Transcript Ready Handler Error", message=str(e))
+	transcript = event_data.get('transcript', {})
+	transcript_name = transcript.get('name', '')
+	
+	log.info("Transcript ready: %s", transcript_name)
+	
+	# Extract conference ID from transcript name
+	# Format: conferenceRecords/{conferenceId}/transcripts/{transcriptId}
+	parts = transcript_name.split('/')
+	if len(parts) >= 2:
+		conference_id = parts[1]
+	else:
+		log.error("Invalid transcript name format: %s", transcript_name)
+		return
+	
+	meeting = resolve_meeting(conference_id, attributes)
+	if not meeting:
+		log.warning("No meeting found for conference %s", conference_id)
+		return
+	
+	from vidcon.vidcon.doctype.vidcon_meeting.transcript_pipeline import request_transcript
+	request_transcript(meeting, conference_id=conference_id, transcript_name=transcript_name)
+	
+	frappe.db.commit()
 
 
 def fetch_transcript_for_conference(conference_id, meeting_name):
 	"""
-	Fetch transcript from Google Drive using Meet API.
-	Called after conference ends with a delay.
+	Fetch a conference's transcript through the transcript pipeline.
+	Kept for jobs enqueued under this name.
 	"""
-	try:
-		meeting_doc = frappe.get_doc("VidCon Meeting", meeting_name)
-		
-		# Get Google Calendar credentials (we'll use same OAuth)
-		settings = frappe.get_single("VidCon Settings")
-		if not settings.google_calendar:
-			frappe.logger().error("No Google Calendar configured")
-			return
-		
-		google_calendar = frappe.get_doc("Google Calendar", settings.google_calendar)
-		google_settings = frappe.get_single("Google Settings")
-		
-		# Build Meet API service
-		from google.oauth2.credentials import Credentials
-		from googleapiclient.discovery import build
-		from vidcon.vidcon.doctype.vidcon_meeting.subscription_manager import get_vidcon_access_token
-		
-		credentials = Credentials(
-			token=get_vidcon_access_token(settings.google_calendar),
-			refresh_token=google_calendar.get_password("refresh_token"),
-			token_uri="https://oauth2.googleapis.com/token",
-			client_id=google_settings.client_id,
-			client_secret=google_settings.get_password("client_secret")
-		)
-		
-		# Use Meet API to list transcripts for this conference
-		meet_service = build('meet', 'v2', credentials=credentials, static_discovery=False)
-		
-		# List transcripts for the conference
-		conference_name = f"conferenceRecords/{conference_id}"
-		
-		try:
-			transcripts_response = meet_service.conferenceRecords().transcripts().list(
-				parent=conference_name
-			).execute()
-			
-			transcripts = transcripts_response.get('transcripts', [])
+	from vidcon.vidcon.doctype.vidcon_meeting.transcript_pipeline import request_transcript
+	request_transcript(meeting_name, conference_id=conference_id)
+
+
+def store_conference_transcript(meeting_doc, meet_service, conference_id):
+	"""
+	Store a conference's transcript from its Meet transcript entries.
+	
+	Args:
+		meeting_doc: VidCon Meeting document
+		meet_service: Meet API client
+		conference_id: Meet conference ID
+	
+	Returns:
+		bool: True if stored, False if the conference has no transcript yet
+	"""
+	# List transcripts for the conference
+	conference_name = f"conferenceRecords/{conference_id}"
+	
+	transcripts_response = meet_service.conferenceRecords().transcripts().list(
+		parent=conference_name
+	).execute()
+	
+	transcripts = transcripts_response.get('transcripts', [])
+	if not transcripts:
+		log.debug("No transcripts found yet for %s", conference_id)
+		return False
+	
+	# Get the first transcript
+	transcript = transcripts[0]
+	transcript_name = transcript.get('name')
+	
+	# Stream the entries page by page into the transcript file
+	from vidcon.vidcon.doctype.vidcon_meeting.participant_identity import get_participant_identities
+	from vidcon.vidcon.doctype.vidcon_meeting.transcript_store import TranscriptFile
+	
+	entry_count = 0
+	with TranscriptFile(meeting_doc.name) as transcript_file:
+		for entries in iter_transcript_entry_pages(meet_service, transcript_name):
+			# Label speakers by name, resolving a page's participants at once
+			identities = get_participant_identities([entry['participant'] for entry in entries if entry.get('participant')])
 			
-			if transcripts:
-				# Get the first transcript
-				transcript = transcripts[0]
-				transcript_name = transcript.get('name')
-				
-				# List transcript entries (the actual content)
-				entries_response = meet_service.conferenceRecords().transcripts().entries().list(
-					parent=transcript_name
-				).execute()
-				
-				entries = entries_response.get('entries', [])
-				
-				# Combine all transcript text
-				full_transcript = []
-				for entry in entries:
-					participant = entry.get('participant', '')
-					text = entry.get('text', '')
-					start_time = entry.get('startTime', '')
-					
-					full_transcript.append(f"[{start_time}] {participant}: {text}")
-				
-				# Store transcript
-				meeting_doc.transcript = "\n".join(full_transcript)
-				meeting_doc.transcript_retrieved_at = frappe.utils.now_datetime()
-				meeting_doc.status = "Transcript Retrieved"
-				
-				# Get Drive file info if available
-				drive_destination = transcript.get('driveDestination', {})
-				if drive_destination:
-					file_id = drive_destination.get('file', '').split('/')[-1]
-					meeting_doc.transcript_file_id = file_id
-					meeting_doc.transcript_url = f"https://drive.google.com/file/d/{file_id}/view"
-				
-				meeting_doc.save(ignore_permissions=True)
-				frappe.db.commit()
-				
-				frappe.logger().info(f"Transcript saved for {meeting_name}")
-			else:
-				frappe.logger().info(f"No transcripts found yet for {conference_id}, will retry")
-				
-				# Retry after 5 minutes if no transcript found
-				frappe.enqueue(
-					"vidcon.vidcon.doctype.vidcon_meeting.google_meet_events.fetch_transcript_for_conference",
-					queue="default",
-					timeout=600,
-					conference_id=conference_id,
-					meeting_name=meeting_name,
-					enqueue_after_commit=True,
-					at_front=False
-				)
+			for entry in entries:
+				transcript_file.write(format_transcript_entry(entry, identities))
+			entry_count += len(entries)
 		
-		except Exception as api_error:
-			frappe.logger().error(f"Meet API error: {str(api_error)}")
-			# Transcript might not be ready yet, retry
-			frappe.enqueue(
-				"vidcon.vidcon.doctype.vidcon_meeting.google_meet_events.fetch_transcript_for_conference",
-				queue="default",
-				timeout=600,
-				conference_id=conference_id,
-				meeting_name=meeting_name,
-				enqueue_after_commit=True,
-				at_front=False
-			)
+		file_doc = transcript_file.attach()
 	
-	except Exception as e:
-		frappe.logger().error(f"Error fetching transcript: {str(e)}")
-		frappe.log_error(title="Transcript Fetch Error", message=str(e))
+	log.debug("Streamed %s transcript entries (%s bytes) for %s", entry_count, transcript_file.size, meeting_doc.name)
+	
+	# Store transcript
+	meeting_doc.transcript = transcript_file.get_inline_text()
+	meeting_doc.transcript_file = file_doc.file_url
+	meeting_doc.transcript_retrieved_at = frappe.utils.now_datetime()
+	
+	# Link the Google Docs transcript if available
+	document_id = transcript.get('docsDestination', {}).get('document', '').split('/')[-1]
+	if document_id:
+		meeting_doc.transcript_file_id = document_id
+		meeting_doc.transcript_url = f"https://docs.google.com/document/d/{document_id}/view"
+	
+	meeting_doc.save(ignore_permissions=True)
+	
+	log.debug("Transcript saved for %s", meeting_doc.name)
+	return True
 
 
-def download_transcript_from_meet_api(meeting_name, transcript_name):
+def iter_transcript_entry_pages(meet_service, transcript_name):
 	"""
-	Get transcript details from Meet API and download from Drive.
+	Yield a transcript's entries one page at a time, following nextPageToken.
 	
 	Args:
-		meeting_name: VidCon Meeting name
-		transcript_name: Full transcript resource name from Meet API
+		meet_service: Meet API client
+		transcript_name: conferenceRecords/{c}/transcripts/{t}
+	
+	Yields:
+		list: Transcript entries of one page
 	"""
-	try:
-		meeting_doc = frappe.get_doc("VidCon Meeting", meeting_name)
-		
-		# Get credentials
-		settings = frappe.get_single("VidCon Settings")
-		google_calendar = frappe.get_doc("Google Calendar", settings.google_calendar)
-		google_settings = frappe.get_single("Google Settings")
-		
-		# Build Meet API service
-		from google.oauth2.credentials import Credentials
-		from googleapiclient.discovery import build
-		from vidcon.vidcon.doctype.vidcon_meeting.subscription_manager import get_vidcon_access_token
-		
-		credentials = Credentials(
-			token=get_vidcon_access_token(settings.google_calendar),
-			refresh_token=google_calendar.get_password("refresh_token"),
-			token_uri="https://oauth2.googleapis.com/token",
-			client_id=google_settings.client_id,
-			client_secret=google_settings.get_password("client_secret")
-		)
-		
-		meet_service = build('meet', 'v2', credentials=credentials, static_discovery=False)
-		
-		# Get transcript details from Meet API
-		frappe.logger().info(f"Getting transcript details: {transcript_name}")
-		transcript_details = meet_service.conferenceRecords().transcripts().get(
-			name=transcript_name
+	entries_api = meet_service.conferenceRecords().transcripts().entries()
+	
+	page_token = None
+	while True:
+		response = entries_api.list(
+			parent=transcript_name,
+			pageSize=TRANSCRIPT_ENTRIES_PAGE_SIZE,
+			pageToken=page_token
 		).execute()
 		
-		frappe.logger().info(f"Transcript details: {json.dumps(transcript_details, indent=2)}")
+		yield response.get('entries', [])
 		
-		# Extract Drive file ID from transcript details
-		drive_destination = transcript_details.get('docsDestination', {})
-		document_id = drive_destination.get('document', '').split('/')[-1]
-		
-		if not document_id:
-			frappe.logger().error(f"No Drive document ID in transcript details: {transcript_details}")
+		page_token = response.get('nextPageToken')
+		if not page_token:
 			return
-		
-		frappe.logger().info(f"Drive document ID: {document_id}")
-		
-		# Download transcript from Drive
-		drive_service = build('drive', 'v3', credentials=credentials, static_discovery=False)
-		
-		# Get file metadata to check for Gemini notes
-		file_metadata = drive_service.files().get(
-			fileId=document_id,
-			fields='name,description,properties'
-		).execute()
-		
-		frappe.logger().info(f"File metadata: {json.dumps(file_metadata, indent=2)}")
-		
-		# Export transcript as plain text
-		request = drive_service.files().export(
-			fileId=document_id,
-			mimeType='text/plain'
+
+
+def format_transcript_entry(entry, identities=None):
+	"""
+	Format a transcript entry as a line of the stored transcript.
+	
+	Args:
+		entry: TranscriptEntry resource
+		identities: {participant name: identity} to label speakers with
+	
+	Returns:
+		str: '[startTime] speaker: text' with a trailing newline
+	"""
+	participant = entry.get('participant', '')
+	participant = ((identities or {}).get(participant) or {}).get('display_name') or participant
+	
+	return f"[{entry.get('startTime', '')}] {participant}: {entry.get('text', '')}\n"
+
+
+def download_transcript_from_meet_api(meeting_name, transcript_name):
+	"""
+	Download a transcript resource's document through the transcript pipeline.
+	Kept for jobs enqueued under this name.
+	
+	Args:
+		meeting_name: VidCon Meeting name
+		transcript_name: Full transcript resource name from Meet API
+	"""
+	from vidcon.vidcon.doctype.vidcon_meeting.transcript_pipeline import request_transcript
+	request_transcript(meeting_name, transcript_name=transcript_name)
+
+
+def store_transcript_document(meeting_doc, meet_service, drive_service, transcript_name):
+	"""
+	Store a transcript from the Google Docs document of a Meet transcript resource.
+	
+	Args:
+		meeting_doc: VidCon Meeting document
+		meet_service: Meet API client
+		drive_service: Drive API client
+		transcript_name: Full transcript resource name from Meet API
+	
+	Returns:
+		bool: True if stored, False if the transcript has no document yet
+	"""
+	# Get transcript details from Meet API
+	log.debug("Getting transcript details: %s", transcript_name)
+	transcript_details = meet_service.conferenceRecords().transcripts().get(
+		name=transcript_name
+	).execute()
+	
+	log.debug("Transcript details: %s", transcript_details)
+	
+	# Extract Drive file ID from transcript details
+	drive_destination = transcript_details.get('docsDestination', {})
+	document_id = drive_destination.get('document', '').split('/')[-1]
+	
+	if not document_id:
+		log.info("No Docs transcript yet for %s", transcript_name)
+		return False
+	
+	log.debug("Drive document ID: %s", document_id)
+	
+	# Get file metadata to check for Gemini notes
+	file_metadata = drive_service.files().get(
+		fileId=document_id,
+		fields='name,description,properties'
+	).execute()
+	
+	log.debug("File metadata: %s", file_metadata)
+	
+	# Export transcript as plain text, streamed into the transcript file
+	from vidcon.vidcon.doctype.vidcon_meeting.transcript_store import TranscriptFile, download_media
+	
+	file_doc = None
+	with TranscriptFile(meeting_doc.name) as transcript_file:
+		download_media(
+			drive_service.files().export_media(fileId=document_id, mimeType='text/plain'),
+			transcript_file
 		)
-		transcript_content = request.execute()
-		
-		# Decode transcript content
-		if isinstance(transcript_content, bytes):
-			transcript_text = transcript_content.decode('utf-8')
-		else:
-			transcript_text = transcript_content
-		
-		frappe.logger().info(f"Transcript length: {len(transcript_text)} characters")
-		frappe.logger().info(f"Transcript preview (first 500 chars):\n{transcript_text[:500]}")
-		
-		# Try to extract Gemini notes from transcript
-		# Gemini notes are usually at the beginning of the transcript
-		gemini_notes = extract_gemini_notes(transcript_text)
 		
-		# Save transcript as file attachment
-		file_name = f"transcript_{meeting_doc.name}_{frappe.utils.now_datetime().strftime('%Y%m%d_%H%M%S')}.txt"
-		
-		frappe.logger().info(f"Creating file attachment: {file_name}")
+		log.debug("Transcript length: %s bytes", transcript_file.size)
 		
 		try:
-			# Create file doc
-			file_doc = frappe.get_doc({
-				"doctype": "File",
-				"file_name": file_name,
-				"attached_to_doctype": "VidCon Meeting",
-				"attached_to_name": meeting_doc.name,
-				"attached_to_field": "transcript_file",
-				"content": transcript_text,
-				"is_private": 1
-			})
-			file_doc.save(ignore_permissions=True)
-			frappe.db.commit()
+			file_doc = transcript_file.attach()
 			
-			frappe.logger().info(f"✓ Transcript saved as attachment: {file_name}")
-			frappe.logger().info(f"  File URL: {file_doc.file_url}")
-			frappe.logger().info(f"  File size: {len(transcript_text)} bytes")
+			log.debug("Transcript saved as attachment: %s", file_doc.file_url)
 			
 		except Exception as file_error:
-			frappe.logger().error(f"✗ Error creating file attachment: {str(file_error)}")
-			frappe.log_error(title="File Attachment Error", message=f"Meeting: {meeting_doc.name}\nError: {str(file_error)}")
+			log.failure("File Attachment Error", f"Meeting: {meeting_doc.name}\nError: {str(file_error)}")
 			# Continue even if file attachment fails - we still have the URL
-		
-		# Update meeting with transcript metadata and notes
-		meeting_doc.transcript_file_id = document_id
-		meeting_doc.transcript_url = f"https://docs.google.com/document/d/{document_id}/view"
-		meeting_doc.transcript_retrieved_at = frappe.utils.now_datetime()
-		
-		if gemini_notes:
-			meeting_doc.meeting_notes = gemini_notes
-			frappe.logger().info(f"✓ Extracted Gemini notes ({len(gemini_notes)} characters)")
-		else:
-			frappe.logger().warning(f"⚠ No Gemini notes found in transcript")
-		
-		meeting_doc.save(ignore_permissions=True)
-		
-		frappe.logger().info(f"✓ Transcript downloaded and stored for {meeting_name}")
-		frappe.logger().info(f"Transcript downloaded and stored for {meeting_name}")
-		
-	except Exception as e:
-		frappe.logger().error(f"Error downloading transcript from Meet API: {str(e)}")
-		frappe.log_error(title="Transcript Download Error", message=str(e))
+	
+	# Try to extract Gemini notes from transcript
+	# Gemini notes are at the beginning of the transcript, within the inline part
+	gemini_notes = extract_gemini_notes(transcript_file.get_inline_text())
+	
+	# Update meeting with transcript metadata and notes
+	if file_doc:
+		meeting_doc.transcript_file = file_doc.file_url
+	meeting_doc.transcript_file_id = document_id
+	meeting_doc.transcript_url = f"https://docs.google.com/document/d/{document_id}/view"
+	meeting_doc.transcript_retrieved_at = frappe.utils.now_datetime()
+	
+	if gemini_notes:
+		meeting_doc.meeting_notes = gemini_notes
+		log.debug("Extracted Gemini notes (%s characters)", len(gemini_notes))
+	else:
+		log.info("No Gemini notes found in transcript")
+	
+	meeting_doc.save(ignore_permissions=True)
+	
+	log.info("Transcript downloaded and stored for %s", meeting_doc.name)
+	return True
 
 
 def extract_gemini_notes(transcript_text):
@@ -905,10 +1000,10 @@ def extract_gemini_notes(transcript_text):
 			
 			# Verify this looks like Gemini notes
 			if any(keyword in notes_section.lower() for keyword in ['summary', 'details', 'meeting']):
-				frappe.logger().info(f"Extracted Gemini notes: {len(notes_section)} characters")
+				log.debug("Extracted Gemini notes: %s characters", len(notes_section))
 				return notes_section
 	
-	frappe.logger().warning("No Gemini notes section found in transcript")
+	log.debug("No Gemini notes section found in transcript")
 	return None
 
 
@@ -921,41 +1016,31 @@ def download_and_store_transcript(meeting_name, drive_file_id):
 		
 		# Get Google Calendar credentials
 		settings = frappe.get_single("VidCon Settings")
-		google_calendar = frappe.get_doc("Google Calendar", settings.google_calendar)
-		google_settings = frappe.get_single("Google Settings")
 		
 		# Build Drive service
-		from google.oauth2.credentials import Credentials
-		from googleapiclient.discovery import build
-		from vidcon.vidcon.doctype.vidcon_meeting.subscription_manager import get_vidcon_access_token
+		from vidcon.vidcon.doctype.vidcon_meeting.google_clients import get_service
+		drive_service = get_service('drive', 'v3', settings.google_calendar)
 		
-		credentials = Credentials(
-			token=get_vidcon_access_token(settings.google_calendar),
-			refresh_token=google_calendar.get_password("refresh_token"),
-			token_uri="https://oauth2.googleapis.com/token",
-			client_id=google_settings.client_id,
-			client_secret=google_settings.get_password("client_secret")
-		)
-		
-		drive_service = build('drive', 'v3', credentials=credentials, static_discovery=False)
+		# Download file content in chunks into the transcript file
+		from vidcon.vidcon.doctype.vidcon_meeting.transcript_store import TranscriptFile, download_media
 		
-		# Download file content
-		request = drive_service.files().get_media(fileId=drive_file_id)
-		content = request.execute()
+		with TranscriptFile(meeting_name) as transcript_file:
+			download_media(drive_service.files().get_media(fileId=drive_file_id), transcript_file)
+			file_doc = transcript_file.attach()
 		
 		# Store transcript
-		meeting_doc.transcript = content.decode('utf-8') if isinstance(content, bytes) else content
+		meeting_doc.transcript = transcript_file.get_inline_text()
+		meeting_doc.transcript_file = file_doc.file_url
 		meeting_doc.transcript_file_id = drive_file_id
 		meeting_doc.transcript_url = f"https://drive.google.com/file/d/{drive_file_id}/view"
 		meeting_doc.transcript_retrieved_at = frappe.utils.now_datetime()
 		meeting_doc.status = "Transcript Retrieved"
 		meeting_doc.save(ignore_permissions=True)
 		
-		frappe.logger().info(f"Transcript downloaded and stored for {meeting_name}")
+		log.debug("Transcript downloaded and stored for %s", meeting_name)
 		
 	except Exception as e:
-		frappe.logger().error(f"Error downloading transcript: {str(e)}")
-		frappe.log_error(title="Transcript Download Error", message=str(e))
+		log.failure("Transcript Download Error", str(e))
 
 
 def create_meet_subscription(user_email):
@@ -965,21 +1050,11 @@ def create_meet_subscription(user_email):
 	"""
 	try:
 		settings = frappe.get_single("VidCon Settings")
-		google_calendar = frappe.get_doc("Google Calendar", settings.google_calendar)
-		
-		from google.oauth2.credentials import Credentials
-		from googleapiclient.discovery import build
 		
-		credentials = Credentials(
-			token=google_calendar.get_password("access_token"),
-			refresh_token=google_calendar.get_password("refresh_token"),
-			token_uri="https://oauth2.googleapis.com/token",
-			client_id=google_calendar.client_id,
-			client_secret=google_calendar.get_password("client_secret")
-		)
+		from vidcon.vidcon.doctype.vidcon_meeting.google_clients import get_service
 		
 		# Build Workspace Events API service
-		events_service = build('workspaceevents', 'v1', credentials=credentials, static_discovery=False)
+		events_service = get_service('workspaceevents', 'v1', settings.google_calendar)
 		
 		# Get Pub/Sub topic from settings
 		pubsub_topic = settings.pubsub_topic_name  # e.g., "projects/PROJECT_ID/topics/meet-events"
@@ -1007,12 +1082,11 @@ def create_meet_subscription(user_email):
 		settings.meet_subscription_state = response.get('state')
 		settings.save(ignore_permissions=True)
 		
-		frappe.logger().info(f"Meet subscription created: {response.get('name')}")
+		log.debug("Meet subscription created: %s", response.get('name'))
 		return response
 		
 	except Exception as e:
-		frappe.logger().error(f"Error creating Meet subscription: {str(e)}")
-		frappe.log_error(title="Meet Subscription Error", message=str(e))
+		log.failure("Meet Subscription Error", str(e))
 		raise
 
 
@@ -1022,24 +1096,14 @@ def delete_meet_subscription(subscription_id):
 	"""
 	try:
 		settings = frappe.get_single("VidCon Settings")
-		google_calendar = frappe.get_doc("Google Calendar", settings.google_calendar)
-		
-		from google.oauth2.credentials import Credentials
-		from googleapiclient.discovery import build
 		
-		credentials = Credentials(
-			token=google_calendar.get_password("access_token"),
-			refresh_token=google_calendar.get_password("refresh_token"),
-			token_uri="https://oauth2.googleapis.com/token",
-			client_id=google_calendar.client_id,
-			client_secret=google_calendar.get_password("client_secret")
-		)
+		from vidcon.vidcon.doctype.vidcon_meeting.google_clients import get_service
 		
-		events_service = build('workspaceevents', 'v1', credentials=credentials, static_discovery=False)
+		events_service = get_service('workspaceevents', 'v1', settings.google_calendar)
 		
 		events_service.subscriptions().delete(name=subscription_id).execute()
 		
-		frappe.logger().info(f"Meet subscription deleted: {subscription_id}")
+		log.debug("Meet subscription deleted: %s", subscription_id)
 		
 	except Exception as e:
-		frappe.logger().error(f"Error deleting Meet subscription: {str(e)}")
+		log.error("Error deleting Meet subscription: %s", str(e))
@@ -0,0 +1,211 @@
+"""
+Pooled HTTP transport for Google and OAuth traffic
+
+All Google requests of a worker (token refreshes, discovery, certs, and the
+Meet, Drive, Calendar and Workspace Events clients) go through one
+requests.Session per site, whose connection pool keeps TLS connections to
+googleapis.com alive between calls instead of opening new ones per request.
+
+Timeouts, retries and the per-host pool size come from VidCon Settings. They
+are read when the session is built and checked again every
+CONFIG_CHECK_INTERVAL seconds, not on every request.
+Connection errors and 429/5xx responses of idempotent requests are retried
+with exponential backoff, honouring Retry-After.
+
+googleapiclient expects an httplib2.Http; SessionHttp adapts the session to
+that interface.
+
+Connections are HTTP/1.1: requests and urllib3 don't speak HTTP/2, and
+googleapiclient's batch requests already cut the number of round trips that
+multiplexing would save.
+"""
+
+import threading
+import time
+
+import frappe
+import httplib2
+import requests
+from frappe.utils import cint, flt
+from google_auth_httplib2 import AuthorizedHttp
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from vidcon.vidcon.doctype.vidcon_meeting.metrics import incr
+
+
+DEFAULT_TIMEOUT = 30
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_POOL_SIZE = 10
+
+# Distinct hosts pooled (oauth2, www, meet, drive, calendar, workspaceevents, ...)
+POOL_HOSTS = 10
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+RETRY_BACKOFF_FACTOR = 0.5
+
+# Seconds between checks of VidCon Settings for transport changes
+CONFIG_CHECK_INTERVAL = 60
+
+# {site: {"config": (timeout, max_retries, pool_size), "checked_at": epoch seconds, "session": requests.Session}}
+_sessions: dict[str | None, dict] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_transport_config():
+	"""
+	Get the transport settings from VidCon Settings.
+
+	Returns:
+		tuple: (timeout seconds, max retries, connections per host)
+	"""
+	settings = frappe.get_cached_doc("VidCon Settings")
+	max_retries = settings.get("google_api_max_retries")
+
+	return (
+		flt(settings.get("google_api_timeout")) or DEFAULT_TIMEOUT,
+		DEFAULT_MAX_RETRIES if max_retries is None else cint(max_retries),
+		cint(settings.get("google_api_pool_size")) or DEFAULT_POOL_SIZE
+	)
+
+
+def get_session():
+	"""
+	Get the site's pooled session, rebuilding it when the settings change.
+
+	Returns:
+		requests.Session
+	"""
+	return get_cached_session()["session"]
+
+
+def get_timeout():
+	"""Get the configured request timeout without reading VidCon Settings."""
+	return get_cached_session()["config"][0]
+
+
+def get_cached_session():
+	"""
+	Get the site's session entry, building it on first use.
+
+	Settings are re-read at most every CONFIG_CHECK_INTERVAL seconds; the
+	session is only rebuilt if they changed.
+
+	Returns:
+		dict: {"config": (timeout, max_retries, pool_size), "checked_at": float, "session": requests.Session}
+	"""
+	site = getattr(frappe.local, "site", None)
+
+	cached = _sessions.get(site)
+	if cached and time.monotonic() - cached["checked_at"] < CONFIG_CHECK_INTERVAL:
+		return cached
+
+	with _sessions_lock:
+		cached = _sessions.get(site)
+		if cached and time.monotonic() - cached["checked_at"] < CONFIG_CHECK_INTERVAL:
+			return cached
+
+		config = get_transport_config()
+		if cached and cached["config"] == config:
+			cached["checked_at"] = time.monotonic()
+			return cached
+
+		_sessions[site] = {
+			"config": config,
+			"checked_at": time.monotonic(),
+			"session": create_session(config[1], config[2])
+		}
+		return _sessions[site]
+
+
+def create_session(max_retries, pool_size):
+	"""
+	Create a keep-alive session with retrying, size-limited connection pools.
+
+	Args:
+		max_retries: Retries for connection errors and retryable responses
+		pool_size: Connections kept per host
+
+	Returns:
+		requests.Session
+	"""
+	retry = Retry(
+		total=max_retries,
+		backoff_factor=RETRY_BACKOFF_FACTOR,
+		status_forcelist=RETRY_STATUSES,
+		respect_retry_after_header=True,
+		raise_on_status=False
+	)
+
+	session = requests.Session()
+	session.mount("https://", HTTPAdapter(
+		pool_connections=POOL_HOSTS,
+		pool_maxsize=pool_size,
+		max_retries=retry
+	))
+	incr("google_http_sessions")
+
+	return session
+
+
+def request(method, url, **kwargs):
+	"""
+	Send a request through the pooled session with the configured timeout.
+
+	Args:
+		method: HTTP method
+		url: Request URL
+		kwargs: Passed to requests (data, json, headers, ...)
+
+	Returns:
+		requests.Response
+	"""
+	cached = get_cached_session()
+	kwargs.setdefault("timeout", cached["config"][0])
+	return cached["session"].request(method, url, **kwargs)
+
+
+def get_authorized_http(credentials):
+	"""
+	Get an httplib2-compatible, authorized transport for googleapiclient.
+
+	Args:
+		credentials: google.auth credentials
+
+	Returns:
+		google_auth_httplib2.AuthorizedHttp
+	"""
+	return AuthorizedHttp(credentials, http=SessionHttp())
+
+
+class SessionHttp:
+	"""httplib2.Http interface on top of the pooled session."""
+
+	# Redirects are followed by requests
+	redirect_codes: frozenset[int] = frozenset()
+
+	@property
+	def timeout(self):
+		return get_timeout()
+
+	def request(self, uri, method="GET", body=None, headers=None, redirections=5, connection_type=None):
+		"""
+		Send a request the way httplib2.Http.request does.
+
+		Returns:
+			tuple: (httplib2.Response, body bytes)
+		"""
+		response = request(method, uri, data=body, headers=headers, allow_redirects=redirections > 0)
+
+		info = {key.lower(): value for key, value in response.headers.items()}
+		info["status"] = response.status_code
+
+		# requests has already decoded the body; describe it the way httplib2 does
+		if "content-encoding" in info:
+			info["-content-encoding"] = info.pop("content-encoding")
+			info["content-length"] = str(len(response.content))
+
+		resp = httplib2.Response(info)
+		resp.reason = response.reason
+
+		return resp, response.content
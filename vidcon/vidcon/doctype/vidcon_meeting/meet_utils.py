@@ -7,10 +7,17 @@ import frappe
 from frappe import _
 
 
+# Meeting code format: xxx-xxxx-xxx
+MEETING_CODE_PATTERN = r'[a-z]{3}-[a-z]{4}-[a-z]{3}'
+
+
 def extract_space_id_from_meet_link(meet_link):
 	"""
 	Extract the space ID from a Google Meet link.
 	
+	The result is normalized (lowercase, no query string) so it can be matched
+	exactly against VidCon Meeting.google_space_id.
+	
 	Args:
 		meet_link: Google Meet URL (e.g., https://meet.google.com/abc-defg-hij)
 	
@@ -22,21 +29,43 @@ def extract_space_id_from_meet_link(meet_link):
 		'abc-defg-hij'
 		>>> extract_space_id_from_meet_link('meet.google.com/xyz-abcd-efg')
 		'xyz-abcd-efg'
+		>>> extract_space_id_from_meet_link('https://meet.google.com/ABC-DEFG-HIJ?authuser=0')
+		'abc-defg-hij'
 	"""
 	if not meet_link:
 		return None
 	
 	# Pattern: meet.google.com/{space_id}
 	# Space ID format: xxx-xxxx-xxx (3 groups separated by hyphens)
-	pattern = r'meet\.google\.com/([a-z]{3}-[a-z]{4}-[a-z]{3})'
+	pattern = r'meet\.google\.com/(' + MEETING_CODE_PATTERN + ')'
 	
-	match = re.search(pattern, meet_link)
+	match = re.search(pattern, meet_link.strip().lower())
 	if match:
 		return match.group(1)
 	
 	return None
 
 
+def normalize_meeting_code(value):
+	"""
+	Normalize a meeting code or Meet link to the key stored in google_space_id.
+	
+	Args:
+		value: Meeting code (e.g. ' ABC-defg-hij ') or Google Meet URL
+	
+	Returns:
+		str: Lowercase meeting code (e.g. 'abc-defg-hij') or None if not valid
+	"""
+	if not value:
+		return None
+	
+	value = value.strip().lower()
+	if re.fullmatch(MEETING_CODE_PATTERN, value):
+		return value
+	
+	return extract_space_id_from_meet_link(value)
+
+
 def create_space_subscription(meeting_doc):
 	"""
 	Create a Google Workspace Events subscription for a meeting's space.
@@ -82,6 +111,14 @@ def create_space_subscription(meeting_doc):
 		
 		frappe.logger().info(f"Created subscription for meeting {meeting_doc.name}: {response.get('name')}")
 		
+		# Record the space and subscription so incoming events resolve to this meeting
+		correlation = {
+			"meet_subscription_id": response.get("name"),
+			"google_space_resource": space_resource
+		}
+		frappe.db.set_value("VidCon Meeting", meeting_doc.name, correlation, update_modified=False)
+		meeting_doc.update(correlation)
+		
 		return response
 		
 	except Exception as e:
@@ -121,3 +158,196 @@ def delete_space_subscription(subscription_id):
 			title="Meet Subscription Deletion Failed",
 			message=f"Subscription ID: {subscription_id}\nError: {str(e)}"
 		)
+
+
+def create_space_subscriptions(meeting_names):
+	"""
+	Create subscriptions for many meetings' spaces with batched API calls.
+	
+	Space resources not yet known are looked up in one batch, subscriptions are
+	created in another, and the results are stored with one bulk update.
+	
+	Args:
+		meeting_names: VidCon Meeting names
+	
+	Returns:
+		dict: {"succeeded": {meeting: subscription name}, "failed": {meeting: error message}}
+	"""
+	settings = frappe.get_single("VidCon Settings")
+	if not settings.enable_meet_events:
+		frappe.throw(_("Meet Events are not enabled in VidCon Settings"))
+	
+	from vidcon.vidcon.doctype.vidcon_meeting.subscription_manager import (
+		create_meet_subscriptions,
+		get_space_resource_names
+	)
+	
+	meetings = frappe.get_all(
+		"VidCon Meeting",
+		filters={"name": ["in", list(meeting_names)]},
+		fields=["name", "google_meet_link", "google_space_id", "google_space_resource"]
+	)
+	failed = {name: _("Meeting not found") for name in set(meeting_names) - {m.name for m in meetings}}
+	
+	# Only meetings without a known space resource need a lookup
+	codes = {}
+	for meeting in meetings:
+		if not meeting.google_space_resource:
+			code = normalize_meeting_code(meeting.google_meet_link) or normalize_meeting_code(meeting.google_space_id)
+			if code:
+				codes[meeting.name] = code
+			else:
+				failed[meeting.name] = _("No valid Meet link")
+	
+	lookup = get_space_resource_names(settings.google_calendar, codes.values()) if codes else {"succeeded": {}, "failed": {}}
+	
+	space_resources = {}
+	for meeting in meetings:
+		if meeting.google_space_resource:
+			space_resources[meeting.name] = meeting.google_space_resource
+		elif meeting.name in codes:
+			code = codes[meeting.name]
+			if lookup["succeeded"].get(code):
+				space_resources[meeting.name] = lookup["succeeded"][code]
+			else:
+				failed[meeting.name] = lookup["failed"].get(code) or _("Space not found")
+	
+	if not space_resources:
+		return {"succeeded": {}, "failed": failed}
+	
+	result = create_meet_subscriptions(settings.google_calendar, space_resources, settings.pubsub_topic_name)
+	failed.update(result["failed"])
+	
+	# Record the space and subscription so incoming events resolve to these meetings
+	succeeded = {name: response.get("name") for name, response in result["succeeded"].items()}
+	if succeeded:
+		frappe.db.bulk_update("VidCon Meeting", {
+			name: {"meet_subscription_id": subscription_id, "google_space_resource": space_resources[name]}
+			for name, subscription_id in succeeded.items()
+		}, update_modified=False)
+		for name in succeeded:
+			frappe.clear_document_cache("VidCon Meeting", name)
+	
+	return {"succeeded": succeeded, "failed": failed}
+
+
+def backfill_space_resources():
+	"""
+	Record the space resource of open meetings that only have a meeting code.
+	
+	Unbound conferences are resolved by the space resource name (ce-subject),
+	which is only recorded when a subscription is created, so meetings from
+	older versions can't be matched by space. Runs as a background job (see
+	vidcon_meeting.enqueue_space_resource_backfill) because it calls Google;
+	meetings Google can't resolve are left as they are.
+	
+	Returns:
+		dict: {"succeeded": {meeting: space resource}, "failed": {meeting: error message}}
+	"""
+	settings = frappe.get_single("VidCon Settings")
+	if not settings.enable_meet_events or not settings.google_calendar:
+		return {"succeeded": {}, "failed": {}}
+	
+	from vidcon.vidcon.doctype.vidcon_meeting.meeting_resolver import OPEN_STATUSES
+	from vidcon.vidcon.doctype.vidcon_meeting.subscription_manager import get_space_resource_names
+	
+	meetings = frappe.get_all(
+		"VidCon Meeting",
+		filters={
+			"status": ["in", OPEN_STATUSES],
+			"google_space_id": ["is", "set"],
+			"google_space_resource": ["is", "not set"]
+		},
+		fields=["name", "google_space_id"]
+	)
+	if not meetings:
+		return {"succeeded": {}, "failed": {}}
+	
+	lookup = get_space_resource_names(settings.google_calendar, [m.google_space_id for m in meetings])
+	
+	succeeded = {}
+	failed = {}
+	for meeting in meetings:
+		space_resource = lookup["succeeded"].get(meeting.google_space_id)
+		if space_resource:
+			succeeded[meeting.name] = space_resource
+		else:
+			failed[meeting.name] = lookup["failed"].get(meeting.google_space_id) or _("Space not found")
+	
+	if succeeded:
+		frappe.db.bulk_update("VidCon Meeting", {
+			name: {"google_space_resource": space_resource}
+			for name, space_resource in succeeded.items()
+		}, update_modified=False)
+		for name in succeeded:
+			frappe.clear_document_cache("VidCon Meeting", name)
+	
+	if failed:
+		frappe.log_error(
+			title="Space Resource Backfill Incomplete",
+			message="\n".join(f"{name}: {error}" for name, error in sorted(failed.items()))
+		)
+	
+	return {"succeeded": succeeded, "failed": failed}
+
+
+def delete_space_subscriptions(subscription_ids):
+	"""
+	Delete many Google Workspace Events subscriptions with batched requests.
+	
+	Args:
+		subscription_ids: Full subscription names from Google API
+	
+	Returns:
+		dict: {"succeeded": {...}, "failed": {subscription_id: error message}} or None if disabled
+	"""
+	subscription_ids = [subscription_id for subscription_id in subscription_ids if subscription_id]
+	if not subscription_ids:
+		return None
+	
+	settings = frappe.get_single("VidCon Settings")
+	if not settings.enable_meet_events:
+		return None
+	
+	from vidcon.vidcon.doctype.vidcon_meeting.subscription_manager import delete_meet_subscriptions
+	
+	return delete_meet_subscriptions(settings.google_calendar, subscription_ids)
+
+
+def queue_subscription_deletion(subscription_id):
+	"""
+	Delete a subscription once the current transaction commits.
+	
+	Subscriptions of all meetings deleted in the same transaction are deleted
+	together in one batch request, and none are deleted if it rolls back.
+	
+	Args:
+		subscription_id: Full subscription name from Google API
+	"""
+	pending = frappe.local.flags.setdefault("vidcon_subscriptions_to_delete", set())
+	if not pending:
+		frappe.db.after_commit.add(delete_queued_subscriptions)
+		# A rollback drops the callback; drop the queue with it so the next
+		# deletion registers a new one
+		frappe.db.after_rollback.add(clear_queued_subscriptions)
+	pending.add(subscription_id)
+
+
+def delete_queued_subscriptions():
+	"""Delete the subscriptions queued by queue_subscription_deletion."""
+	pending = frappe.local.flags.pop("vidcon_subscriptions_to_delete", None)
+	if not pending:
+		return
+	
+	try:
+		delete_space_subscriptions(pending)
+	except Exception as e:
+		frappe.log_error(
+			title="Meet Subscription Deletion Failed",
+			message=f"Subscription IDs: {', '.join(sorted(pending))}\nError: {str(e)}"
+		)
+
+
+def clear_queued_subscriptions():
+	"""Forget the subscriptions queued in a transaction that was rolled back."""
+	frappe.local.flags.pop("vidcon_subscriptions_to_delete", None)
@@ -0,0 +1,169 @@
+"""
+Conference to VidCon Meeting resolution
+
+Every Meet event is resolved to its meeting once per request: the result is
+memoized on frappe.local, so log_event, the handlers and the lanes share it.
+Conferences already bound to a meeting (google_conference_id is set) are also
+kept in Redis, so most events cost no database lookup at all; the binding is
+cached when the meeting is saved with a conference ID and removed when the
+meeting is deleted.
+
+Conferences that aren't bound yet are resolved with indexed lookups on the
+Meet space (ce-subject) and subscription (ce-source) recorded when the
+meeting's subscription was created.
+"""
+
+import frappe
+
+from vidcon.vidcon.doctype.vidcon_meeting.vidcon_logger import get_logger
+
+
+CACHE_KEY_PREFIX = "vidcon:conference_meeting:"
+
+# Conferences stop sending events long before this
+CACHE_TTL = 7 * 24 * 3600
+
+# A conference that isn't bound yet can only belong to a meeting in these statuses
+OPEN_STATUSES = ("Scheduled", "In Progress")
+
+log = get_logger("resolver")
+
+
+def resolve_meeting(conference_id, attributes=None):
+	"""
+	Get the VidCon Meeting a Meet event belongs to.
+
+	Lookup order: per-request memo, Redis, google_conference_id, then the
+	earliest open meeting for the event's space or subscription.
+
+	Args:
+		conference_id: Meet conference ID from the payload
+		attributes: CloudEvents attributes of the message
+
+	Returns:
+		str: VidCon Meeting name, or None
+	"""
+	memo = get_memo()
+	memo_key = (conference_id, get_space_resource(attributes), get_subscription_name(attributes))
+	if memo_key in memo:
+		return memo[memo_key]
+
+	meeting = None
+	if conference_id:
+		meeting = frappe.cache.get_value(CACHE_KEY_PREFIX + conference_id)
+
+		if not meeting:
+			meeting = frappe.db.get_value("VidCon Meeting", {"google_conference_id": conference_id}, "name")
+			if meeting:
+				cache_binding(conference_id, meeting)
+
+	if not meeting:
+		meeting = find_open_meeting(attributes)
+
+	memo[memo_key] = meeting
+	return meeting
+
+
+def find_open_meeting(attributes):
+	"""
+	Find the earliest open meeting for an event's space, else its subscription.
+
+	A space can belong to several meetings (recurring events reuse their Meet
+	link); only a Scheduled or In Progress one can own a new conference.
+
+	Args:
+		attributes: CloudEvents attributes of the message
+
+	Returns:
+		str: VidCon Meeting name, or None
+	"""
+	lookups = (
+		("google_space_resource", get_space_resource(attributes)),
+		("meet_subscription_id", get_subscription_name(attributes))
+	)
+
+	for fieldname, value in lookups:
+		if not value:
+			continue
+
+		meetings = frappe.get_all(
+			"VidCon Meeting",
+			filters={fieldname: value, "status": ["in", OPEN_STATUSES]},
+			order_by="meeting_date asc, start_time asc",
+			limit=1,
+			pluck="name"
+		)
+		if meetings:
+			log.debug("Resolved meeting %s by %s", meetings[0], fieldname)
+			return meetings[0]
+
+	return None
+
+
+def cache_binding(conference_id, meeting):
+	"""
+	Remember that a conference belongs to a meeting.
+
+	Args:
+		conference_id: Meet conference ID
+		meeting: VidCon Meeting name
+	"""
+	frappe.cache.set_value(CACHE_KEY_PREFIX + conference_id, meeting, expires_in_sec=CACHE_TTL)
+
+	# Unbound lookups memoized earlier in this request now resolve directly
+	memo = get_memo()
+	for key in [key for key in memo if key[0] == conference_id]:
+		memo[key] = meeting
+
+
+def clear_binding(conference_id):
+	"""
+	Forget a conference's meeting, e.g. when the meeting is deleted.
+
+	Args:
+		conference_id: Meet conference ID
+	"""
+	frappe.cache.delete_value(CACHE_KEY_PREFIX + conference_id)
+
+	memo = get_memo()
+	for key in [key for key in memo if key[0] == conference_id]:
+		del memo[key]
+
+
+def get_memo():
+	"""Per-request (or per-job) memo of resolved meetings."""
+	if getattr(frappe.local, "vidcon_meeting_memo", None) is None:
+		frappe.local.vidcon_meeting_memo = {}
+	return frappe.local.vidcon_meeting_memo
+
+
+def get_space_resource(attributes):
+	"""
+	Get the Meet space an event is about from its ce-subject attribute.
+
+	Args:
+		attributes: CloudEvents attributes, e.g.
+			{"ce-subject": "//meet.googleapis.com/spaces/AAAAbbbbCCC"}
+
+	Returns:
+		str: Space resource name (e.g. 'spaces/AAAAbbbbCCC'), or None
+	"""
+	subject = (attributes or {}).get("ce-subject", "")
+	index = subject.find("spaces/")
+	return subject[index:] if index != -1 else None
+
+
+def get_subscription_name(attributes):
+	"""
+	Get the subscription that delivered an event from its ce-source attribute.
+
+	Args:
+		attributes: CloudEvents attributes, e.g.
+			{"ce-source": "//workspaceevents.googleapis.com/subscriptions/XYZ"}
+
+	Returns:
+		str: Subscription name (e.g. 'subscriptions/XYZ'), or None
+	"""
+	source = (attributes or {}).get("ce-source", "")
+	index = source.find("subscriptions/")
+	return source[index:] if index != -1 else None
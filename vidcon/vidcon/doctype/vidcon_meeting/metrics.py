@@ -0,0 +1,117 @@
+"""
+VidCon runtime metrics
+
+Counters are kept in a Redis hash so that every gunicorn and RQ worker of a
+site adds to the same totals. Timings are kept as a capped list of recent
+samples per metric, from which percentiles are reported.
+"""
+
+import math
+
+import frappe
+
+
+METRICS_KEY = "vidcon:metrics"
+SAMPLES_KEY_PREFIX = "vidcon:metrics:samples:"
+
+# Number of recent samples kept per timing metric
+MAX_SAMPLES = 1000
+
+
+def incr(name, amount=1):
+	"""
+	Increment a counter. Failures are swallowed so metrics never break a request.
+
+	Args:
+		name: Counter name (e.g. 'jwt_cache_hit')
+		amount: Value to add
+	"""
+	try:
+		frappe.cache.hincrby(frappe.cache.make_key(METRICS_KEY), name, amount)
+	except Exception:
+		pass
+
+
+def observe(name, value):
+	"""
+	Record a timing sample (e.g. milliseconds). Failures are swallowed.
+
+	Args:
+		name: Timing metric name (e.g. 'webhook_ack_ms')
+		value: Sample value
+	"""
+	try:
+		key = SAMPLES_KEY_PREFIX + name
+		frappe.cache.lpush(key, round(value, 3))
+		frappe.cache.ltrim(key, 0, MAX_SAMPLES - 1)
+		frappe.cache.sadd(SAMPLES_KEY_PREFIX + "names", name)
+	except Exception:
+		pass
+
+
+def get_summary(name):
+	"""
+	Get percentiles over the recent samples of a timing metric.
+
+	Args:
+		name: Timing metric name
+
+	Returns:
+		dict: count, p50, p95, p99 and max of the recent samples
+	"""
+	samples = sorted(float(value) for value in frappe.cache.lrange(SAMPLES_KEY_PREFIX + name, 0, -1))
+	if not samples:
+		return {"count": 0}
+
+	return {
+		"count": len(samples),
+		"p50": percentile(samples, 50),
+		"p95": percentile(samples, 95),
+		"p99": percentile(samples, 99),
+		"max": samples[-1]
+	}
+
+
+def percentile(sorted_samples, pct):
+	"""Nearest-rank percentile of an already sorted list."""
+	index = max(math.ceil(pct / 100 * len(sorted_samples)) - 1, 0)
+	return sorted_samples[min(index, len(sorted_samples) - 1)]
+
+
+def get_counters():
+	"""
+	Get all counters.
+
+	Returns:
+		dict: Counter name to integer value
+	"""
+	# Counters are stored as plain integers, so bypass the pickling hgetall wrapper
+	values = frappe.cache.execute_command("HGETALL", frappe.cache.make_key(METRICS_KEY)) or {}
+	return {frappe.safe_decode(key): int(value) for key, value in values.items()}
+
+
+@frappe.whitelist()
+def get_metrics():
+	"""
+	Whitelisted method to view VidCon metrics from the UI.
+	"""
+	frappe.only_for("System Manager")
+
+	timing_names = sorted(frappe.safe_decode(name) for name in frappe.cache.smembers(SAMPLES_KEY_PREFIX + "names"))
+
+	return {
+		"counters": get_counters(),
+		"timings": {name: get_summary(name) for name in timing_names}
+	}
+
+
+@frappe.whitelist(methods=["POST"])
+def reset_metrics():
+	"""
+	Whitelisted method to reset all VidCon metrics.
+	"""
+	frappe.only_for("System Manager")
+
+	frappe.cache.delete(frappe.cache.make_key(METRICS_KEY))
+	for name in frappe.cache.smembers(SAMPLES_KEY_PREFIX + "names"):
+		frappe.cache.delete(frappe.cache.make_key(SAMPLES_KEY_PREFIX + frappe.safe_decode(name)))
@@ -0,0 +1,306 @@
+"""
+Meet participant identity cache
+
+Participant events and transcript entries only name a participant resource
+(conferenceRecords/{c}/participants/{p}). Its identity (display name, Google
+user ID, signed-in/anonymous/phone) comes from the Meet API, so it is cached:
+in a per-process LRU, then in Redis per conference, shared by all workers.
+
+A conference's participants are listed (paginated) by a background job,
+enqueued from the conference's first event in its lane (see
+conference_lanes.submit) and again at most every REFRESH_INTERVAL seconds
+while its events keep arriving. Lookups never list: participants missing from
+the cache are fetched individually, unless a list is queued or running, in
+which case they are left unresolved until a later flush. API calls scale with
+conferences and refresh intervals, not with events.
+
+The Meet API doesn't return emails; attendee rows get theirs by being matched
+to invited attendees by name (see attendee_tracker).
+"""
+
+from collections import OrderedDict
+
+import frappe
+
+from vidcon.vidcon.doctype.vidcon_meeting.metrics import incr
+from vidcon.vidcon.doctype.vidcon_meeting.vidcon_logger import get_logger
+
+
+CACHE_KEY_PREFIX = "vidcon:participants:"
+LISTED_KEY_PREFIX = "vidcon:participants_listed:"
+
+# Conference records stop changing long before this
+CACHE_TTL = 24 * 3600
+
+# Seconds between participants.list calls for one conference
+REFRESH_INTERVAL = 30
+
+# Values of the listed key: a list is queued or running, or ran within the interval
+LISTING = "listing"
+LISTED = "listed"
+
+# Identities kept per process
+LRU_SIZE = 4096
+
+# Maximum page size accepted by participants.list
+PAGE_SIZE = 250
+
+# {(site, participant name): identity}
+_lru: OrderedDict[tuple[str | None, str], dict] = OrderedDict()
+
+log = get_logger("participants")
+
+
+def get_participant_identities(participant_names):
+	"""
+	Get the identities of participants, fetching unknown ones from the Meet API.
+
+	Args:
+		participant_names: Participant resources, e.g.
+			['conferenceRecords/abc/participants/123']
+
+	Returns:
+		dict: {participant name: identity} for the participants found, where an
+			identity is {"display_name": ..., "user": 'users/...' or None,
+			"kind": 'signedin', 'anonymous' or 'phone'}
+	"""
+	identities = {}
+	missing_by_conference = {}
+
+	for name in set(participant_names):
+		identity = lru_get(name)
+		if identity:
+			identities[name] = identity
+		else:
+			missing_by_conference.setdefault(get_conference_name(name), []).append(name)
+
+	for conference_name, names in missing_by_conference.items():
+		identities.update(load_conference_identities(conference_name, names))
+
+	return identities
+
+
+def load_conference_identities(conference_name, names):
+	"""
+	Resolve participants of one conference from Redis, then the Meet API.
+
+	Args:
+		conference_name: conferenceRecords/{c}
+		names: Participant resources not found in the LRU
+
+	Returns:
+		dict: {participant name: identity}
+	"""
+	cache_key = CACHE_KEY_PREFIX + conference_name
+	identities = {}
+
+	cached = frappe.cache.get_value(cache_key) or {}
+	for name in names:
+		if name in cached:
+			identities[name] = lru_put(name, cached[name])
+
+	missing = [name for name in names if name not in identities]
+	if not missing:
+		return identities
+
+	# The queued list will name them; a later flush picks them up from the cache
+	listed_key = frappe.cache.make_key(LISTED_KEY_PREFIX + conference_name)
+	if frappe.safe_decode(frappe.cache.get(listed_key)) == LISTING:
+		return identities
+
+	# Joined since the last list
+	fetched = fetch_identities(conference_name, missing)
+	if fetched:
+		store_identities(conference_name, fetched)
+		for name, identity in fetched.items():
+			identities[name] = lru_put(name, identity)
+
+	return identities
+
+
+def prefetch_participants(conference_id):
+	"""
+	Enqueue listing a conference's participants, unless it was listed within
+	REFRESH_INTERVAL seconds or a list is already queued.
+
+	Args:
+		conference_id: Meet conference ID
+	"""
+	conference_name = f"conferenceRecords/{conference_id}"
+	listed_key = frappe.cache.make_key(LISTED_KEY_PREFIX + conference_name)
+
+	if frappe.cache.set(listed_key, LISTING, ex=REFRESH_INTERVAL, nx=True):
+		frappe.enqueue(
+			"vidcon.vidcon.doctype.vidcon_meeting.participant_identity.list_conference_participants",
+			queue="short",
+			job_id=f"vidcon_list_participants:{conference_id}",
+			deduplicate=True,
+			conference_name=conference_name
+		)
+
+
+def list_conference_participants(conference_name):
+	"""
+	Background job: list a conference's participants into the identity cache.
+
+	Args:
+		conference_name: conferenceRecords/{c}
+	"""
+	listed_key = frappe.cache.make_key(LISTED_KEY_PREFIX + conference_name)
+
+	try:
+		listed = list_participants(get_meet_service(), conference_name)
+	except Exception as e:
+		# Let the conference's next event try again
+		frappe.cache.delete(listed_key)
+		log.warning("Listing participants of %s failed: %s", conference_name, str(e))
+		return
+
+	if listed:
+		store_identities(conference_name, listed)
+
+	# Lookups fetch participants missing from here on individually
+	frappe.cache.set(listed_key, LISTED, ex=REFRESH_INTERVAL)
+
+
+def fetch_identities(conference_name, names):
+	"""
+	Get participants one by one.
+
+	Args:
+		conference_name: conferenceRecords/{c}
+		names: Participant resources to resolve
+
+	Returns:
+		dict: {participant name: identity} for the participants fetched
+	"""
+	try:
+		service = get_meet_service()
+	except Exception as e:
+		log.warning("Participant lookup failed for %s: %s", conference_name, str(e))
+		return {}
+
+	fetched = {}
+	for name in names:
+		try:
+			fetched[name] = get_participant(service, name)
+		except Exception as e:
+			log.warning("Participant lookup failed for %s: %s", name, str(e))
+
+	return fetched
+
+
+def store_identities(conference_name, identities):
+	"""
+	Add identities to a conference's Redis cache.
+
+	Args:
+		conference_name: conferenceRecords/{c}
+		identities: {participant name: identity}
+	"""
+	cache_key = CACHE_KEY_PREFIX + conference_name
+
+	# Merge with what other workers stored meanwhile
+	cached = frappe.cache.get_value(cache_key) or {}
+	cached.update(identities)
+	frappe.cache.set_value(cache_key, cached, expires_in_sec=CACHE_TTL)
+
+
+def list_participants(service, conference_name):
+	"""
+	List every participant of a conference, following pagination.
+
+	Args:
+		service: Meet API client
+		conference_name: conferenceRecords/{c}
+
+	Returns:
+		dict: {participant name: identity}
+	"""
+	participants = service.conferenceRecords().participants()
+
+	identities = {}
+	page_token = None
+	while True:
+		response = participants.list(
+			parent=conference_name,
+			pageSize=PAGE_SIZE,
+			pageToken=page_token
+		).execute()
+		incr("participant_api_calls")
+
+		for participant in response.get("participants", []):
+			identities[participant["name"]] = to_identity(participant)
+
+		page_token = response.get("nextPageToken")
+		if not page_token:
+			break
+
+	log.debug("Listed %s participants of %s", len(identities), conference_name)
+	return identities
+
+
+def get_participant(service, participant_name):
+	"""
+	Get one participant from the Meet API.
+
+	Args:
+		service: Meet API client
+		participant_name: Participant resource
+
+	Returns:
+		dict: Identity
+	"""
+	participant = service.conferenceRecords().participants().get(name=participant_name).execute()
+	incr("participant_api_calls")
+	return to_identity(participant)
+
+
+def to_identity(participant):
+	"""
+	Reduce a Meet Participant resource to the identity that is cached.
+
+	Args:
+		participant: Participant resource (one of signedinUser, anonymousUser, phoneUser set)
+
+	Returns:
+		dict: {"display_name", "user", "kind"}
+	"""
+	for kind, field in (("signedin", "signedinUser"), ("anonymous", "anonymousUser"), ("phone", "phoneUser")):
+		user = participant.get(field)
+		if user:
+			return {
+				"display_name": user.get("displayName"),
+				"user": user.get("user"),
+				"kind": kind
+			}
+
+	return {"display_name": None, "user": None, "kind": None}
+
+
+def get_meet_service():
+	"""Meet API client with VidCon's Google Calendar credentials."""
+	from vidcon.vidcon.doctype.vidcon_meeting.google_clients import get_service
+	return get_service('meet', 'v2')
+
+
+def get_conference_name(participant_name):
+	"""'conferenceRecords/c/participants/p' -> 'conferenceRecords/c'"""
+	return "/".join(participant_name.split("/")[:2])
+
+
+def lru_get(name):
+	"""Get an identity from the process LRU, namespaced by site."""
+	key = (getattr(frappe.local, "site", None), name)
+	identity = _lru.get(key)
+	if identity is not None:
+		_lru.move_to_end(key)
+	return identity
+
+
+def lru_put(name, identity):
+	"""Store an identity in the process LRU, evicting the least recently used."""
+	_lru[(getattr(frappe.local, "site", None), name)] = identity
+	while len(_lru) > LRU_SIZE:
+		_lru.popitem(last=False)
+	return identity
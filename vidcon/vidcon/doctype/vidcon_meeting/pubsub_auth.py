@@ -0,0 +1,235 @@
+"""
+Google Pub/Sub push authentication helpers
+
+Keeps Google's OIDC signing keys in a process-wide cache backed by Redis so that
+push requests don't have to fetch the certs endpoint on every delivery, and
+caches the claims of already verified tokens until they expire.
+"""
+
+import hashlib
+import re
+import threading
+import time
+from typing import Any
+
+import frappe
+import jwt
+
+from vidcon.vidcon.doctype.vidcon_meeting.vidcon_logger import get_logger
+
+
+# Google's public keys for OIDC tokens attached to Pub/Sub push requests
+GOOGLE_CERTS_URL = "https://www.googleapis.com/oauth2/v3/certs"
+
+# Redis key shared by all gunicorn/RQ workers of the site
+JWKS_CACHE_KEY = "vidcon:pubsub_jwks"
+
+# Used when the certs response has no usable Cache-Control max-age
+DEFAULT_JWKS_TTL = 3600
+
+# Keys are kept this long past their max-age and served if Google is unreachable
+JWKS_STALE_GRACE = 24 * 3600
+
+# Minimum seconds between forced refreshes caused by an unknown kid
+JWKS_MIN_REFRESH_INTERVAL = 60
+
+JWKS_FETCH_TIMEOUT = 5
+
+# Issuers Google uses for Pub/Sub push OIDC tokens
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+# Verified token claims, keyed by token digest
+TOKEN_CACHE_PREFIX = "vidcon:pubsub_token:"
+
+_jwks = {"keys": {}, "fetched_at": 0, "expires_at": 0, "stale_until": 0}
+_signing_keys: dict[str, Any] = {}
+_jwks_lock = threading.Lock()
+
+log = get_logger("auth")
+
+
+def get_signing_key(token):
+	"""
+	Get the public key that signed a Pub/Sub push token.
+
+	Keys are looked up by the token's `kid`. The cached key set is only refreshed
+	when it has expired or when the `kid` is not in it.
+
+	Args:
+		token: JWT token from Authorization header
+
+	Returns:
+		Public key object usable with jwt.decode
+
+	Raises:
+		jwt.InvalidTokenError: If no key with the token's kid is published
+	"""
+	kid = jwt.get_unverified_header(token).get("kid")
+
+	jwks = get_jwks()
+	if kid not in jwks["keys"]:
+		# Google rotates keys; a new kid means our copy is out of date
+		jwks = get_jwks(force_refresh=True)
+
+	jwk = jwks["keys"].get(kid)
+	if not jwk:
+		raise jwt.InvalidTokenError(f"No Google signing key found for kid: {kid}")
+
+	signing_key = _signing_keys.get(kid)
+	if not signing_key or signing_key[0] != jwk:
+		signing_key = (jwk, jwt.PyJWK(jwk).key)
+		_signing_keys[kid] = signing_key
+
+	return signing_key[1]
+
+
+def get_jwks(force_refresh=False):
+	"""
+	Get Google's signing keys, keyed by kid.
+
+	Lookup order is the in-process copy, then the shared Redis copy, then the
+	certs endpoint. If the endpoint fails, keys within their stale grace period
+	are served so that a Google certs outage doesn't reject every push.
+
+	Args:
+		force_refresh: Fetch from Google even if the cached keys haven't expired
+
+	Returns:
+		dict: {"keys": {kid: jwk}, "fetched_at", "expires_at", "stale_until"}
+	"""
+	global _jwks
+
+	now = time.time()
+	if not force_refresh and _jwks["expires_at"] > now:
+		return _jwks
+
+	with _jwks_lock:
+		shared = frappe.cache.get_value(JWKS_CACHE_KEY)
+		if shared and shared["fetched_at"] > _jwks["fetched_at"]:
+			_jwks = shared
+
+		if not force_refresh and _jwks["expires_at"] > now:
+			return _jwks
+
+		if force_refresh and now - _jwks["fetched_at"] < JWKS_MIN_REFRESH_INTERVAL:
+			# Another worker (or we) just refreshed; don't hammer Google for bogus kids
+			return _jwks
+
+		try:
+			_jwks = fetch_jwks()
+		except Exception as e:
+			if _jwks["stale_until"] > now:
+				log.warning("Google certs refresh failed, serving cached keys: %s", str(e))
+				return _jwks
+			raise
+
+		frappe.cache.set_value(
+			JWKS_CACHE_KEY,
+			_jwks,
+			expires_in_sec=int(_jwks["stale_until"] - now)
+		)
+		return _jwks
+
+
+def fetch_jwks():
+	"""
+	Fetch Google's signing keys from the certs endpoint.
+
+	Returns:
+		dict: Key set with expiry taken from the response's cache headers
+	"""
+	from vidcon.vidcon.doctype.vidcon_meeting.google_transport import request
+
+	response = request("GET", GOOGLE_CERTS_URL, timeout=JWKS_FETCH_TIMEOUT)
+	response.raise_for_status()
+
+	keys = {jwk["kid"]: jwk for jwk in response.json().get("keys", []) if jwk.get("kid")}
+	ttl = get_max_age(response.headers)
+	now = time.time()
+
+	return {
+		"keys": keys,
+		"fetched_at": now,
+		"expires_at": now + ttl,
+		"stale_until": now + ttl + JWKS_STALE_GRACE
+	}
+
+
+def get_max_age(headers):
+	"""
+	Get the remaining freshness lifetime in seconds from HTTP cache headers.
+
+	Args:
+		headers: Response headers (Cache-Control and Age are used)
+
+	Returns:
+		int: Seconds the response may be cached for
+	"""
+	cache_control = headers.get("Cache-Control", "") or ""
+	match = re.search(r"max-age=(\d+)", cache_control)
+	if not match or "no-store" in cache_control or "no-cache" in cache_control:
+		return DEFAULT_JWKS_TTL
+
+	try:
+		age = int(headers.get("Age", 0) or 0)
+	except ValueError:
+		age = 0
+
+	return max(int(match.group(1)) - age, 0)
+
+
+def get_cached_claims(token, audience):
+	"""
+	Get the claims of a token that was already fully verified.
+
+	Expiry, audience and issuer are still checked against the cached claims, so
+	a hit is only returned for a token that would pass verification again.
+
+	Args:
+		token: JWT token from Authorization header
+		audience: Expected audience (your webhook URL)
+
+	Returns:
+		dict: Decoded token payload, or None if not cached or no longer valid
+	"""
+	from vidcon.vidcon.doctype.vidcon_meeting.metrics import incr
+
+	claims = frappe.cache.get_value(get_token_cache_key(token))
+
+	if (
+		not claims
+		or claims.get("exp", 0) <= time.time()
+		or not audience_matches(claims, audience)
+		or claims.get("iss") not in GOOGLE_ISSUERS
+	):
+		incr("jwt_cache_miss")
+		return None
+
+	incr("jwt_cache_hit")
+	return claims
+
+
+def cache_claims(token, claims):
+	"""
+	Cache the claims of a verified token until the token's exp.
+
+	Args:
+		token: JWT token from Authorization header
+		claims: Decoded token payload
+	"""
+	ttl = int(claims.get("exp", 0) - time.time())
+	if ttl > 0:
+		frappe.cache.set_value(get_token_cache_key(token), claims, expires_in_sec=ttl)
+
+
+def get_token_cache_key(token):
+	"""Cache key for a token; the token itself is never stored."""
+	return TOKEN_CACHE_PREFIX + hashlib.sha256(token.encode()).hexdigest()
+
+
+def audience_matches(claims, audience):
+	"""Check the aud claim the same way jwt.decode does (string or list)."""
+	aud = claims.get("aud")
+	if isinstance(aud, str):
+		return aud == audience
+	return bool(aud) and audience in aud
@@ -0,0 +1,151 @@
+"""
+Pub/Sub envelope decoding
+
+Decodes a push body (or a pulled message) in a single pass into a compact
+PubSubEnvelope. The original body is kept as-is for VidCon Event Log's
+raw_payload instead of being re-serialized, and orjson is used for parsing
+when it is installed (it ships with Frappe v15).
+
+Only depends on the standard library so it can be benchmarked on its own
+(see vidcon/benchmarks/bench_envelope_decoding.py).
+"""
+
+import base64
+import json
+from datetime import timezone
+from types import ModuleType
+
+orjson: ModuleType | None
+try:
+	import orjson
+except ImportError:
+	orjson = None
+
+
+def loads(data):
+	"""Parse JSON from str or bytes with the fastest available backend."""
+	if orjson:
+		return orjson.loads(data)
+	return json.loads(data)
+
+
+def dumps(obj):
+	"""Serialize to compact JSON text with the fastest available backend."""
+	if orjson:
+		return orjson.dumps(obj, default=str).decode()
+	return json.dumps(obj, separators=(",", ":"), default=str)
+
+
+class PubSubEnvelope:
+	"""A decoded Pub/Sub message carrying a Workspace Events CloudEvent."""
+
+	__slots__ = ("raw", "subscription", "message_id", "publish_time", "attributes", "event_type", "event_id", "event_data")
+
+	def __init__(self, raw, subscription, message_id, publish_time, attributes, event_type, event_id, event_data):
+		self.raw = raw
+		self.subscription = subscription
+		self.message_id = message_id
+		self.publish_time = publish_time
+		self.attributes = attributes
+		self.event_type = event_type
+		self.event_id = event_id
+		self.event_data = event_data
+
+
+def decode_envelope(raw, parsed=None):
+	"""
+	Decode a push envelope.
+
+	Args:
+		raw: Request body (bytes or str), kept for storage
+		parsed: The body already parsed by the caller (e.g. Frappe's form_dict),
+			so it isn't parsed twice
+
+	Returns:
+		PubSubEnvelope, or None if the body has no message
+	"""
+	if isinstance(raw, bytes):
+		raw = raw.decode("utf-8")
+
+	envelope = parsed if parsed is not None else loads(raw)
+	message = envelope.get("message") if envelope else None
+	if not message:
+		return None
+
+	data = message.get("data")
+	return decode_message(
+		raw,
+		envelope.get("subscription", ""),
+		message.get("messageId", ""),
+		message.get("publishTime"),
+		message.get("attributes") or {},
+		base64.b64decode(data) if data else b""
+	)
+
+
+def decode_pulled_message(subscription, message):
+	"""
+	Decode a message received by streaming pull.
+
+	The data is already raw bytes; the push-format envelope is serialized once,
+	compactly, only because it is stored as raw_payload.
+
+	Args:
+		subscription: Full subscription path
+		message: google.cloud.pubsub_v1.subscriber.message.Message
+
+	Returns:
+		PubSubEnvelope
+	"""
+	attributes = dict(message.attributes)
+	# publish_time is a timezone-aware datetime; store it as push delivers it
+	publish_time = message.publish_time.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+	raw = dumps({
+		"message": {
+			"data": base64.b64encode(message.data).decode(),
+			"attributes": attributes,
+			"messageId": message.message_id,
+			"publishTime": publish_time
+		},
+		"subscription": subscription
+	})
+
+	return decode_message(raw, subscription, message.message_id, publish_time, attributes, message.data)
+
+
+def decode_message(raw, subscription, message_id, publish_time, attributes, data):
+	"""
+	Build a PubSubEnvelope from a message's parts.
+
+	Args:
+		raw: Envelope JSON text for storage
+		subscription: Full subscription path
+		message_id: Pub/Sub messageId
+		publish_time: Pub/Sub publishTime (RFC 3339)
+		attributes: Message attributes (CloudEvents ce-* headers)
+		data: Decoded message data (JSON bytes)
+
+	Returns:
+		PubSubEnvelope
+	"""
+	event_data = loads(data) if data else {}
+
+	# CloudEvents type is in the attributes; older payloads carry it in the data
+	event_type = (
+		attributes.get("ce-type")
+		or event_data.get("eventType")
+		or event_data.get("type")
+		or ""
+	)
+
+	return PubSubEnvelope(
+		raw=raw,
+		subscription=subscription,
+		message_id=message_id,
+		publish_time=publish_time,
+		attributes=attributes,
+		event_type=event_type,
+		event_id=attributes.get("ce-id", message_id),
+		event_data=event_data
+	)
@@ -0,0 +1,142 @@
+"""
+Streaming pull consumer for the Meet events subscription
+
+An alternative to push delivery for high-volume sites: a long-running worker
+(`bench --site <site> vidcon-pull-events`) holds a streaming pull on the
+subscription, collects messages into batches, runs them through the same path
+as the push endpoint and acknowledges each message once it has been committed.
+
+Requires the optional google-cloud-pubsub package. Set PUBSUB_EMULATOR_HOST
+(or pass --emulator-host) to run against the local Pub/Sub emulator.
+"""
+
+import os
+import queue
+import time
+
+import frappe
+
+from vidcon.vidcon.doctype.vidcon_meeting.metrics import incr, observe
+from vidcon.vidcon.doctype.vidcon_meeting.vidcon_logger import get_logger
+
+
+DEFAULT_MAX_MESSAGES = 1000
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+DEFAULT_BATCH_SIZE = 100
+
+# Seconds to wait for the first message of a batch
+BATCH_WAIT = 1.0
+
+log = get_logger("pubsub_pull")
+
+
+def run(subscription, max_messages=DEFAULT_MAX_MESSAGES, max_bytes=DEFAULT_MAX_BYTES,
+		batch_size=DEFAULT_BATCH_SIZE, emulator_host=None):
+	"""
+	Consume a subscription until interrupted or the stream fails.
+
+	Args:
+		subscription: Full subscription path (projects/PROJECT/subscriptions/NAME)
+		max_messages: Flow control: messages leased but not yet acked
+		max_bytes: Flow control: bytes leased but not yet acked
+		batch_size: Messages taken from the stream at a time
+		emulator_host: host:port of a Pub/Sub emulator
+
+	Raises:
+		ImportError: If google-cloud-pubsub is not installed
+	"""
+	if emulator_host:
+		# Read by the client when it is created
+		os.environ["PUBSUB_EMULATOR_HOST"] = emulator_host
+
+	from google.cloud import pubsub_v1
+
+	received = queue.Queue()
+	subscriber = pubsub_v1.SubscriberClient()
+
+	# The callback runs on the client's threads; the Frappe connection is not
+	# thread-safe, so messages are handed to this thread for processing
+	future = subscriber.subscribe(
+		subscription,
+		callback=received.put,
+		flow_control=pubsub_v1.types.FlowControl(max_messages=max_messages, max_bytes=max_bytes)
+	)
+	log.info("Pulling from %s", subscription)
+
+	try:
+		while not future.done():
+			batch = next_batch(received, batch_size)
+			if batch:
+				process_batch(subscription, batch)
+
+		# Raises the error that ended the stream
+		future.result()
+
+	except KeyboardInterrupt:
+		pass
+
+	finally:
+		future.cancel()
+		subscriber.close()
+
+
+def next_batch(received, batch_size):
+	"""
+	Wait for the next message, then take whatever else is ready up to batch_size.
+
+	Returns:
+		list: Pub/Sub messages, empty if none arrived within BATCH_WAIT
+	"""
+	try:
+		batch = [received.get(timeout=BATCH_WAIT)]
+	except queue.Empty:
+		return []
+
+	while len(batch) < batch_size:
+		try:
+			batch.append(received.get_nowait())
+		except queue.Empty:
+			break
+
+	return batch
+
+
+def process_batch(subscription, batch):
+	"""
+	Apply a batch of messages, acknowledging each once its work is committed.
+
+	Every message is committed on its own, so a failing message can't roll back
+	the work of those before it. Messages that fail outside their handlers are
+	rolled back and nacked for redelivery; receive_pubsub_envelope has released
+	their dedup claim, so the redelivery is not taken for a duplicate.
+
+	Args:
+		subscription: Full subscription path
+		batch: Pub/Sub messages
+	"""
+	from vidcon.vidcon.doctype.vidcon_meeting.google_meet_events import receive_pubsub_envelope
+	from vidcon.vidcon.doctype.vidcon_meeting.pubsub_envelope import decode_pulled_message
+
+	started_at = time.perf_counter()
+
+	# Pick up settings changes between batches; memoized meetings are per batch
+	frappe.local.vidcon_log_config = None
+	frappe.local.vidcon_meeting_memo = None
+
+	processed = 0
+	for message in batch:
+		try:
+			receive_pubsub_envelope(decode_pulled_message(subscription, message))
+			frappe.db.commit()
+		except Exception as e:
+			frappe.db.rollback()
+			message.nack()
+			log.failure("Pub/Sub Pull Error", f"Message: {message.message_id}\nError: {str(e)}")
+			continue
+
+		# Acks are batched into acknowledge requests by the client
+		message.ack()
+		processed += 1
+
+	incr("pull_messages", processed)
+	observe("pull_batch_ms", (time.perf_counter() - started_at) * 1000)
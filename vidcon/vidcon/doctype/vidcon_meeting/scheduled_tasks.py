@@ -1,40 +1,176 @@
 import frappe
-from frappe.utils import now_datetime, add_to_date
+from frappe.utils import add_to_date, now_datetime
+
+
+# Meetings fetched by one sweep batch job
+SWEEP_BATCH_SIZE = 50
+
+# Batch jobs per sweep, i.e. transcript fetches running at once
+SWEEP_MAX_JOBS = 4
+
+# How far back the first sweep looks, before a watermark is stored
+SWEEP_INITIAL_LOOKBACK_HOURS = 2
+
+SWEEP_JOB_TIMEOUT = 3600
 
 
 def check_pending_transcripts():
 	"""
-	Scheduled task to check for meetings that have completed but don't have transcripts yet.
+	Scheduled task to fetch transcripts for completed meetings that don't have one yet.
 	Run every 15 minutes.
+
+	Meetings are read from a watermark stored in VidCon Settings, so each sweep only
+	looks at meetings completed or changed since the previous one. The watermark is
+	a (modified, name) pair, so it advances even when more meetings share one
+	modified time than a sweep takes. Meetings whose
+	fetch is already queued, running or scheduled for a retry are skipped; the rest
+	are split into at most SWEEP_MAX_JOBS batch jobs, which bounds how many fetches
+	run at once.
 	"""
 	try:
-		# Find meetings that completed in the last 2 hours but don't have transcripts
-		cutoff_time = add_to_date(now_datetime(), hours=-2)
-		
-		meetings = frappe.get_all(
-			"VidCon Meeting",
-			filters={
-				"status": "Completed",
-				"transcript": ["is", "not set"],
-				"modified": [">=", cutoff_time]
-			},
-			fields=["name", "google_meet_link"]
+		settings = frappe.get_single("VidCon Settings")
+		if not settings.enable_auto_transcript_fetch:
+			return
+
+		# The previous sweep's batches are still fetching; pick up from the same watermark later
+		if any(is_sweep_job_running(index) for index in range(SWEEP_MAX_JOBS)):
+			frappe.logger().info("Transcript sweep skipped: previous sweep still running")
+			return
+
+		meetings = get_meetings_after_watermark(
+			settings.transcript_sweep_watermark
+			or add_to_date(now_datetime(), hours=-SWEEP_INITIAL_LOOKBACK_HOURS),
+			settings.transcript_sweep_watermark_name,
+			SWEEP_BATCH_SIZE * SWEEP_MAX_JOBS
 		)
-		
-		for meeting in meetings:
-			if meeting.google_meet_link:
-				# Extract conference ID from Meet link
-				conference_id = meeting.google_meet_link.split('/')[-1]
-				
-				# Enqueue transcript fetch
-				frappe.enqueue(
-					"vidcon.vidcon.doctype.vidcon_meeting.google_meet_events.fetch_transcript_for_conference",
-					queue="default",
-					timeout=600,
-					conference_id=conference_id,
-					meeting_name=meeting.name
-				)
-				frappe.logger().info(f"Queued transcript fetch for {meeting.name}")
-	
+		if not meetings:
+			return
+
+		from vidcon.vidcon.doctype.vidcon_meeting.transcript_pipeline import get_in_flight_meetings
+
+		in_flight = get_in_flight_meetings(meeting.name for meeting in meetings)
+		pending = [meeting.name for meeting in meetings if meeting.name not in in_flight]
+
+		for index, offset in enumerate(range(0, len(pending), SWEEP_BATCH_SIZE)):
+			frappe.enqueue(
+				"vidcon.vidcon.doctype.vidcon_meeting.scheduled_tasks.fetch_pending_transcripts",
+				queue="long",
+				timeout=SWEEP_JOB_TIMEOUT,
+				job_id=get_sweep_job_id(index),
+				deduplicate=True,
+				enqueue_after_commit=True,
+				meeting_names=pending[offset:offset + SWEEP_BATCH_SIZE]
+			)
+
+		frappe.db.set_single_value("VidCon Settings", {
+			"transcript_sweep_watermark": meetings[-1].modified,
+			"transcript_sweep_watermark_name": meetings[-1].name
+		}, update_modified=False)
+		frappe.db.commit()
+
+		frappe.logger().info(
+			f"Transcript sweep: {len(pending)} queued, {len(in_flight)} already in flight"
+		)
+
 	except Exception as e:
 		frappe.logger().error(f"Error in check_pending_transcripts: {str(e)}")
+
+
+def get_meetings_after_watermark(modified, name, limit):
+	"""
+	Get completed meetings without a transcript that sort after a watermark.
+
+	Meetings are ordered by (modified, name). Those modified at the watermark
+	itself are read first, past its name, then those modified after it.
+
+	Args:
+		modified: Modified time of the watermark
+		name: Meeting name of the watermark; None includes every meeting
+			modified at the watermark
+		limit: Maximum number of meetings
+
+	Returns:
+		list: Meetings with name and modified, in order
+	"""
+	filters = {"status": "Completed", "transcript_retrieved_at": ["is", "not set"]}
+
+	meetings = frappe.get_all(
+		"VidCon Meeting",
+		filters={**filters, "modified": modified, **({"name": [">", name]} if name else {})},
+		fields=["name", "modified"],
+		order_by="name asc",
+		limit=limit
+	)
+	if len(meetings) < limit:
+		meetings += frappe.get_all(
+			"VidCon Meeting",
+			filters={**filters, "modified": [">", modified]},
+			fields=["name", "modified"],
+			order_by="modified asc, name asc",
+			limit=limit - len(meetings)
+		)
+
+	return meetings
+
+
+def fetch_pending_transcripts(meeting_names):
+	"""
+	Fetch transcripts for a batch of swept meetings, one after another.
+
+	The batch shares one set of API clients. Which meetings' conferences have a
+	transcript yet is asked in one batched Meet API request; those without one
+	are scheduled for a retry without being fetched.
+
+	Args:
+		meeting_names: VidCon Meeting names
+	"""
+	from vidcon.vidcon.doctype.vidcon_meeting.google_clients import execute_batch, get_service
+	from vidcon.vidcon.doctype.vidcon_meeting.transcript_pipeline import add_hints, run_transcript_pipeline
+	from vidcon.vidcon.doctype.vidcon_meeting.transcript_retries import schedule_transcript_retry
+
+	meetings = frappe.get_all(
+		"VidCon Meeting",
+		filters={"name": ["in", meeting_names], "transcript_retrieved_at": ["is", "not set"]},
+		fields=["name", "google_conference_id"]
+	)
+
+	# The conference ID, not the meeting code from the Meet link, names the conference record
+	listed = {"succeeded": {}, "failed": {}}
+	try:
+		google_calendar = frappe.db.get_single_value("VidCon Settings", "google_calendar")
+		meet_service = get_service('meet', 'v2', google_calendar)
+		transcripts = meet_service.conferenceRecords().transcripts()
+		listed = execute_batch(meet_service, {
+			meeting.name: transcripts.list(parent=f"conferenceRecords/{meeting.google_conference_id}")
+			for meeting in meetings if meeting.google_conference_id
+		}, "List Conference Transcripts")
+	except Exception as e:
+		# The watermark has moved past these meetings; their pipelines still run
+		# below and schedule their own retries
+		frappe.logger().error(f"Listing conference transcripts failed: {str(e)}")
+
+	for meeting in meetings:
+		if meeting.name in listed["succeeded"]:
+			conference_transcripts = listed["succeeded"][meeting.name].get("transcripts", [])
+			if not conference_transcripts:
+				schedule_transcript_retry(meeting.name)
+				continue
+
+			add_hints(meeting.name, {"transcript_name": conference_transcripts[0]["name"]})
+
+		try:
+			run_transcript_pipeline(meeting.name)
+		except Exception as e:
+			frappe.db.rollback()
+			frappe.log_error(title=f"Transcript Fetch Failed - {meeting.name}", message=str(e))
+
+	frappe.db.commit()
+
+
+def get_sweep_job_id(index):
+	return f"vidcon_transcript_sweep:{index}"
+
+
+def is_sweep_job_running(index):
+	from frappe.utils.background_jobs import is_job_enqueued
+	return is_job_enqueued(get_sweep_job_id(index))
@@ -4,11 +4,16 @@ Google Workspace Events API Subscription Manager
 Handles creation, deletion, and monitoring of Meet event subscriptions.
 """
 
+import hashlib
+import time
+
 import frappe
 from frappe import _
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-import requests
+import redis
+
+from vidcon.vidcon.doctype.vidcon_meeting.google_clients import execute_batch, get_service
+from vidcon.vidcon.doctype.vidcon_meeting.google_transport import request
+from vidcon.vidcon.doctype.vidcon_meeting.metrics import incr, observe
 
 
 # VidCon scopes required for Workspace Events API
@@ -18,12 +23,111 @@ VIDCON_SCOPES = " ".join([
 	"https://www.googleapis.com/auth/drive.readonly"
 ])
 
+GOOGLE_TOKEN_URL = "https://oauth2.googleapis.com/token"
+
+# Access tokens, keyed by calendar and scope set
+TOKEN_CACHE_PREFIX = "vidcon:access_token:"
+
+# Tokens are refreshed this many seconds before they expire
+TOKEN_EXPIRY_MARGIN = 300
+
+# Google access tokens live an hour unless the response says otherwise
+DEFAULT_TOKEN_EXPIRES_IN = 3600
+
+# Fixed rather than taken from VidCon Settings: the refresh lock must outlast it
+TOKEN_REQUEST_TIMEOUT = 10
+
+# Longer than a token request, so waiting workers get the refreshed token
+TOKEN_REFRESH_LOCK_TIMEOUT = 15
+
+MEET_EVENT_TYPES = [
+	"google.workspace.meet.conference.v2.started",
+	"google.workspace.meet.conference.v2.ended",
+	"google.workspace.meet.participant.v2.joined",
+	"google.workspace.meet.participant.v2.left",
+	"google.workspace.meet.transcript.v2.fileGenerated"
+]
+
 
-def get_vidcon_access_token(google_calendar_name):
+
+def get_vidcon_access_token(google_calendar_name, scopes=VIDCON_SCOPES):
 	"""
 	Get access token with VidCon scopes (calendar, meet, drive).
 	
 	This bypasses Frappe's get_access_token() which only requests calendar scope.
+	Tokens are cached in Redis, shared by all workers, until shortly before they
+	expire; only one worker at a time refreshes a calendar's token.
+	
+	Args:
+		google_calendar_name: Name of the Google Calendar document
+		scopes: Space-separated OAuth scopes
+	
+	Returns:
+		str: Access token
+	"""
+	return get_vidcon_token(google_calendar_name, scopes)["access_token"]
+
+
+def get_vidcon_token(google_calendar_name, scopes=VIDCON_SCOPES):
+	"""
+	Get a cached or newly refreshed access token with its expiry.
+	
+	Args:
+		google_calendar_name: Name of the Google Calendar document
+		scopes: Space-separated OAuth scopes
+	
+	Returns:
+		dict: {"access_token": ..., "expires_at": epoch seconds}
+	"""
+	cache_key = get_access_token_cache_key(google_calendar_name, scopes)
+	
+	token = get_cached_access_token(cache_key)
+	if token:
+		return token
+	
+	# Single flight: workers that find a refresh in progress wait for its token
+	lock = frappe.cache.lock(
+		frappe.cache.make_key(cache_key + ":refresh"),
+		timeout=TOKEN_REFRESH_LOCK_TIMEOUT,
+		blocking_timeout=TOKEN_REFRESH_LOCK_TIMEOUT
+	)
+	acquired = lock.acquire()
+	
+	try:
+		token = get_cached_access_token(cache_key)
+		if token:
+			return token
+		
+		tokens = request_access_token(google_calendar_name, scopes)
+		expires_in = int(tokens.get("expires_in") or DEFAULT_TOKEN_EXPIRES_IN)
+		token = {
+			"access_token": tokens.get("access_token"),
+			"expires_at": time.time() + expires_in
+		}
+		
+		if expires_in > TOKEN_EXPIRY_MARGIN:
+			frappe.cache.set_value(cache_key, token, expires_in_sec=expires_in - TOKEN_EXPIRY_MARGIN)
+		
+		return token
+	
+	finally:
+		if acquired:
+			try:
+				lock.release()
+			except redis.exceptions.LockError:
+				pass
+
+
+def request_access_token(google_calendar_name, scopes):
+	"""
+	Exchange the calendar's refresh token for a new access token.
+	
+	Args:
+		google_calendar_name: Name of the Google Calendar document
+		scopes: Space-separated OAuth scopes
+	
+	Returns:
+		dict: Token endpoint response (access_token, expires_in, ...)
 	"""
 	google_calendar = frappe.get_doc("Google Calendar", google_calendar_name)
 	google_settings = frappe.get_single("Google Settings")
@@ -38,17 +142,56 @@ def get_vidcon_access_token(google_calendar_name):
 		"client_secret": google_settings.get_password("client_secret"),
 		"refresh_token": refresh_token,
 		"grant_type": "refresh_token",
-		"scope": VIDCON_SCOPES
+		"scope": scopes
 	}
 	
+	start = time.perf_counter()
+	incr("oauth_token_requests")
 	try:
-		response = requests.post("https://oauth2.googleapis.com/token", data=token_data)
+		response = request("POST", GOOGLE_TOKEN_URL, data=token_data, timeout=TOKEN_REQUEST_TIMEOUT)
 		response.raise_for_status()
-		tokens = response.json()
-		return tokens.get("access_token")
+		return response.json()
 	except Exception as e:
+		incr("oauth_token_errors")
 		frappe.log_error(title="VidCon Token Refresh Failed", message=str(e))
 		frappe.throw(_("Failed to refresh access token: {0}").format(str(e)))
+	finally:
+		observe("oauth_token_ms", (time.perf_counter() - start) * 1000)
+
+
+def get_cached_access_token(cache_key):
+	"""
+	Get a cached access token that isn't about to expire.
+	
+	Args:
+		cache_key: Key from get_access_token_cache_key
+	
+	Returns:
+		dict: {"access_token", "expires_at"}, or None
+	"""
+	cached = frappe.cache.get_value(cache_key)
+	if cached and cached["expires_at"] - TOKEN_EXPIRY_MARGIN > time.time():
+		incr("oauth_token_cache_hit")
+		return cached
+	
+	return None
+
+
+def clear_vidcon_access_token(google_calendar_name, scopes=VIDCON_SCOPES):
+	"""
+	Drop a calendar's cached access token, e.g. after it is re-authorized.
+	
+	Args:
+		google_calendar_name: Name of the Google Calendar document
+		scopes: Space-separated OAuth scopes
+	"""
+	frappe.cache.delete_value(get_access_token_cache_key(google_calendar_name, scopes))
+
+
+def get_access_token_cache_key(google_calendar_name, scopes):
+	"""Cache key per calendar and scope set (scope order doesn't matter)."""
+	scope_set = " ".join(sorted(set(scopes.split())))
+	return f"{TOKEN_CACHE_PREFIX}{google_calendar_name}:{hashlib.sha256(scope_set.encode()).hexdigest()[:16]}"
 
 
 def get_space_resource_name(google_calendar_name, meeting_code):
@@ -66,19 +209,8 @@ def get_space_resource_name(google_calendar_name, meeting_code):
 		str: Full space resource name (e.g., 'spaces/ABC123XYZ')
 	"""
 	try:
-		google_calendar = frappe.get_doc("Google Calendar", google_calendar_name)
-		google_settings = frappe.get_single("Google Settings")
-		
-		credentials = Credentials(
-			token=get_vidcon_access_token(google_calendar_name),
-			refresh_token=google_calendar.get_password("refresh_token"),
-			token_uri="https://oauth2.googleapis.com/token",
-			client_id=google_settings.client_id,
-			client_secret=google_settings.get_password("client_secret")
-		)
-		
 		# Build Meet API service
-		meet_service = build('meet', 'v2', credentials=credentials, static_discovery=False)
+		meet_service = get_service('meet', 'v2', google_calendar_name)
 		
 		# Get space using meeting code as alias
 		# According to Google docs, you can use spaces/{meetingCode} to get the space
@@ -92,6 +224,29 @@ def get_space_resource_name(google_calendar_name, meeting_code):
 		frappe.throw(_("Failed to get space resource name: {0}").format(str(e)))
 
 
+def get_space_resource_names(google_calendar_name, meeting_codes):
+	"""
+	Resolve many meeting codes to space resource names with batched requests.
+	
+	Args:
+		google_calendar_name: Name of the Google Calendar document
+		meeting_codes: Meeting codes from Meet URLs (e.g., 'uir-zdje-xqv')
+	
+	Returns:
+		dict: {"succeeded": {meeting_code: 'spaces/...'}, "failed": {meeting_code: error message}}
+	"""
+	meet_service = get_service('meet', 'v2', google_calendar_name)
+	spaces = meet_service.spaces()
+	
+	result = execute_batch(meet_service, {
+		meeting_code: spaces.get(name=f"spaces/{meeting_code}")
+		for meeting_code in set(meeting_codes)
+	}, "Meet Space Lookup")
+	
+	result["succeeded"] = {code: space.get('name') for code, space in result["succeeded"].items()}
+	return result
+
+
 def create_meet_subscription(google_calendar_name, space_resource=None, user_email=None, pubsub_topic=None):
 	"""
 	Create a Google Workspace Events subscription for Meet events.
@@ -110,21 +265,8 @@ def create_meet_subscription(google_calendar_name, space_resource=None, user_ema
 		dict: Subscription response from Google API
 	"""
 	try:
-		# Get Google Calendar and Google Settings
-		google_calendar = frappe.get_doc("Google Calendar", google_calendar_name)
-		google_settings = frappe.get_single("Google Settings")
-		
-		# Build credentials with VidCon scopes (calendar, meet, drive)
-		credentials = Credentials(
-			token=get_vidcon_access_token(google_calendar_name),
-			refresh_token=google_calendar.get_password("refresh_token"),
-			token_uri="https://oauth2.googleapis.com/token",
-			client_id=google_settings.client_id,
-			client_secret=google_settings.get_password("client_secret")
-		)
-		
 		# Build Workspace Events API service
-		events_service = build('workspaceevents', 'v1', credentials=credentials, static_discovery=False)
+		events_service = get_service('workspaceevents', 'v1', google_calendar_name)
 		
 		# Determine target resource
 		if space_resource:
@@ -139,22 +281,7 @@ def create_meet_subscription(google_calendar_name, space_resource=None, user_ema
 			frappe.throw(_("Either space_resource or user_email must be provided"))
 		
 		# Create subscription body
-		subscription_body = {
-			"targetResource": target_resource,
-			"eventTypes": [
-				"google.workspace.meet.conference.v2.started",
-				"google.workspace.meet.conference.v2.ended",
-				"google.workspace.meet.participant.v2.joined",
-				"google.workspace.meet.participant.v2.left",
-				"google.workspace.meet.transcript.v2.fileGenerated"
-			],
-			"notificationEndpoint": {
-				"pubsubTopic": pubsub_topic
-			},
-			"payloadOptions": {
-				"includeResource": False
-			}
-		}
+		subscription_body = get_subscription_body(target_resource, pubsub_topic)
 		
 		# Create subscription
 		response = events_service.subscriptions().create(body=subscription_body).execute()
@@ -168,6 +295,29 @@ def create_meet_subscription(google_calendar_name, space_resource=None, user_ema
 		raise
 
 
+def get_subscription_body(target_resource, pubsub_topic):
+	"""
+	Build the subscription body for Meet events on a target resource.
+	
+	Args:
+		target_resource: Full target resource name (//meet.googleapis.com/spaces/...)
+		pubsub_topic: Full Pub/Sub topic name (projects/PROJECT_ID/topics/TOPIC)
+	
+	Returns:
+		dict: Subscription resource to create
+	"""
+	return {
+		"targetResource": target_resource,
+		"eventTypes": MEET_EVENT_TYPES,
+		"notificationEndpoint": {
+			"pubsubTopic": pubsub_topic
+		},
+		"payloadOptions": {
+			"includeResource": False
+		}
+	}
+
+
 def delete_meet_subscription(google_calendar_name, subscription_id):
 	"""
 	Delete a Google Workspace Events subscription.
@@ -177,21 +327,8 @@ def delete_meet_subscription(google_calendar_name, subscription_id):
 		subscription_id: Full subscription name from Google API
 	"""
 	try:
-		# Get Google Calendar and Google Settings
-		google_calendar = frappe.get_doc("Google Calendar", google_calendar_name)
-		google_settings = frappe.get_single("Google Settings")
-		
-		# Build credentials with VidCon scopes (calendar, meet, drive)
-		credentials = Credentials(
-			token=get_vidcon_access_token(google_calendar_name),
-			refresh_token=google_calendar.get_password("refresh_token"),
-			token_uri="https://oauth2.googleapis.com/token",
-			client_id=google_settings.client_id,
-			client_secret=google_settings.get_password("client_secret")
-		)
-		
 		# Build Workspace Events API service
-		events_service = build('workspaceevents', 'v1', credentials=credentials, static_discovery=False)
+		events_service = get_service('workspaceevents', 'v1', google_calendar_name)
 		
 		# Delete subscription
 		events_service.subscriptions().delete(name=subscription_id).execute()
@@ -215,21 +352,8 @@ def get_subscription_status(google_calendar_name, subscription_id):
 		dict: Subscription details including state
 	"""
 	try:
-		# Get Google Calendar and Google Settings
-		google_calendar = frappe.get_doc("Google Calendar", google_calendar_name)
-		google_settings = frappe.get_single("Google Settings")
-		
-		# Build credentials with VidCon scopes (calendar, meet, drive)
-		credentials = Credentials(
-			token=get_vidcon_access_token(google_calendar_name),
-			refresh_token=google_calendar.get_password("refresh_token"),
-			token_uri="https://oauth2.googleapis.com/token",
-			client_id=google_settings.client_id,
-			client_secret=google_settings.get_password("client_secret")
-		)
-		
 		# Build Workspace Events API service
-		events_service = build('workspaceevents', 'v1', credentials=credentials, static_discovery=False)
+		events_service = get_service('workspaceevents', 'v1', google_calendar_name)
 		
 		# Get subscription
 		response = events_service.subscriptions().get(name=subscription_id).execute()
@@ -252,21 +376,8 @@ def list_subscriptions(google_calendar_name):
 		list: List of subscriptions
 	"""
 	try:
-		# Get Google Calendar and Google Settings
-		google_calendar = frappe.get_doc("Google Calendar", google_calendar_name)
-		google_settings = frappe.get_single("Google Settings")
-		
-		# Build credentials with VidCon scopes (calendar, meet, drive)
-		credentials = Credentials(
-			token=get_vidcon_access_token(google_calendar_name),
-			refresh_token=google_calendar.get_password("refresh_token"),
-			token_uri="https://oauth2.googleapis.com/token",
-			client_id=google_settings.client_id,
-			client_secret=google_settings.get_password("client_secret")
-		)
-		
 		# Build Workspace Events API service
-		events_service = build('workspaceevents', 'v1', credentials=credentials, static_discovery=False)
+		events_service = get_service('workspaceevents', 'v1', google_calendar_name)
 		
 		# List subscriptions
 		response = events_service.subscriptions().list().execute()
@@ -278,6 +389,69 @@ def list_subscriptions(google_calendar_name):
 		raise
 
 
+def create_meet_subscriptions(google_calendar_name, space_resources, pubsub_topic):
+	"""
+	Create space-based subscriptions for many meetings with batched requests.
+	
+	Args:
+		google_calendar_name: Name of the Google Calendar document
+		space_resources: {key: space resource name}, e.g. {meeting name: 'spaces/ABC123XYZ'}
+		pubsub_topic: Full Pub/Sub topic name (projects/PROJECT_ID/topics/TOPIC)
+	
+	Returns:
+		dict: {"succeeded": {key: response}, "failed": {key: error message}}
+	"""
+	events_service = get_service('workspaceevents', 'v1', google_calendar_name)
+	subscriptions = events_service.subscriptions()
+	
+	return execute_batch(events_service, {
+		key: subscriptions.create(body=get_subscription_body(f"//meet.googleapis.com/{space_resource}", pubsub_topic))
+		for key, space_resource in space_resources.items()
+	}, "Create Meet Subscriptions")
+
+
+def delete_meet_subscriptions(google_calendar_name, subscription_ids):
+	"""
+	Delete many subscriptions with batched requests.
+	
+	Subscriptions that no longer exist count as deleted.
+	
+	Args:
+		google_calendar_name: Name of the Google Calendar document
+		subscription_ids: Full subscription names from Google API
+	
+	Returns:
+		dict: {"succeeded": {subscription_id: response}, "failed": {subscription_id: error message}}
+	"""
+	events_service = get_service('workspaceevents', 'v1', google_calendar_name)
+	subscriptions = events_service.subscriptions()
+	
+	return execute_batch(events_service, {
+		subscription_id: subscriptions.delete(name=subscription_id)
+		for subscription_id in set(subscription_ids)
+	}, "Delete Meet Subscriptions", ignore_not_found=True)
+
+
+def get_subscription_statuses(google_calendar_name, subscription_ids):
+	"""
+	Get many subscriptions with batched requests.
+	
+	Args:
+		google_calendar_name: Name of the Google Calendar document
+		subscription_ids: Full subscription names from Google API
+	
+	Returns:
+		dict: {"succeeded": {subscription_id: subscription}, "failed": {subscription_id: error message}}
+	"""
+	events_service = get_service('workspaceevents', 'v1', google_calendar_name)
+	subscriptions = events_service.subscriptions()
+	
+	return execute_batch(events_service, {
+		subscription_id: subscriptions.get(name=subscription_id)
+		for subscription_id in set(subscription_ids)
+	}, "Get Subscription Statuses")
+
+
 @frappe.whitelist()
 def check_subscription_status():
 	"""
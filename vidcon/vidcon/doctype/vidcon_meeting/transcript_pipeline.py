@@ -0,0 +1,303 @@
+"""
+Transcript acquisition pipeline
+
+A meeting's transcript can be found in three places, tried in this order:
+
+1. Meet Event: the transcript resource named by a transcript.fileGenerated
+   event. One transcripts.get and one Docs export, no searching.
+2. Meet Conference: the conference's transcripts listed through the Meet API,
+   their entries streamed page by page.
+3. Drive Search: a Drive full-text search for a file named after the meeting
+   code, the most expensive and least precise.
+
+Every trigger (conference ended, transcript event, calendar webhook, scheduler)
+calls request_transcript. It records what the trigger knows in the meeting's
+hints and enqueues the meeting's single pipeline job, now or after a delay;
+triggers that arrive while the job is queued only add their hints. The job stops
+at the first source that has the transcript and records it in VidCon
+Meeting.transcript_source; if none has it yet, the next attempt is scheduled with
+backoff (see transcript_retries). A per-meeting lock keeps two fetches of the
+same meeting from ever running at once.
+"""
+
+import time
+
+import frappe
+import redis
+
+from vidcon.vidcon.doctype.vidcon_meeting.metrics import incr, observe
+from vidcon.vidcon.doctype.vidcon_meeting.vidcon_logger import get_logger
+
+
+HINTS_KEY_PREFIX = "vidcon:transcript_hints:"
+LOCK_KEY_PREFIX = "vidcon:transcript_lock:"
+
+# Hints outlive any reasonable wait for a transcript
+HINTS_TTL = 7 * 24 * 3600
+
+JOB_TIMEOUT = 1500
+
+# Longer than the job, so the lock is never lost while a fetch still runs
+LOCK_TIMEOUT = JOB_TIMEOUT + 60
+
+log = get_logger("transcripts")
+
+
+def request_transcript(meeting_name, conference_id=None, transcript_name=None, delay=None):
+	"""
+	Ask for a meeting's transcript to be fetched.
+
+	Args:
+		meeting_name: VidCon Meeting name
+		conference_id: Meet conference ID, if known
+		transcript_name: Transcript resource (conferenceRecords/{c}/transcripts/{t}), if known
+		delay: Seconds to wait before fetching (see transcript_retries); None fetches now
+	"""
+	hints = {"conference_id": conference_id, "transcript_name": transcript_name}
+	add_hints(meeting_name, {field: value for field, value in hints.items() if value})
+
+	if delay:
+		from vidcon.vidcon.doctype.vidcon_meeting.transcript_retries import schedule_transcript_fetch
+		schedule_transcript_fetch(meeting_name, delay)
+	else:
+		enqueue_transcript_job(meeting_name)
+
+	incr("transcript_requests")
+
+
+def enqueue_transcript_job(meeting_name):
+	"""
+	Enqueue a meeting's pipeline job.
+
+	Requests made while the job is queued or running are folded into it.
+
+	Args:
+		meeting_name: VidCon Meeting name
+	"""
+	frappe.enqueue(
+		"vidcon.vidcon.doctype.vidcon_meeting.transcript_pipeline.run_transcript_pipeline",
+		queue="long",
+		timeout=JOB_TIMEOUT,
+		job_id=get_job_id(meeting_name),
+		deduplicate=True,
+		enqueue_after_commit=True,
+		meeting_name=meeting_name
+	)
+
+
+def run_transcript_pipeline(meeting_name):
+	"""
+	Job: fetch a meeting's transcript from the cheapest source that has it.
+
+	Any failure schedules a retry with backoff before it is raised.
+
+	Args:
+		meeting_name: VidCon Meeting name
+
+	Returns:
+		str: Source the transcript was stored from, or None
+	"""
+	from frappe.utils.background_jobs import get_redis_conn
+
+	# In the RQ Redis, next to the job and the retry schedule it is checked with
+	lock = get_redis_conn().lock(frappe.cache.make_key(LOCK_KEY_PREFIX + meeting_name), timeout=LOCK_TIMEOUT)
+	if not lock.acquire(blocking=False):
+		log.info("Transcript fetch for %s already running", meeting_name)
+		incr("transcript_fetch_skipped")
+		return None
+
+	try:
+		return fetch_transcript(meeting_name)
+
+	except Exception as e:
+		from vidcon.vidcon.doctype.vidcon_meeting.transcript_retries import schedule_transcript_retry
+
+		# E.g. building the API clients failed. The sweep's watermark has usually
+		# moved past the meeting by now, so only a retry fetches it again
+		frappe.db.rollback()
+		log.warning("Transcript fetch for %s failed: %s", meeting_name, str(e))
+		schedule_transcript_retry(meeting_name, str(e))
+		raise
+
+	finally:
+		try:
+			lock.release()
+		except redis.exceptions.LockError:
+			log.warning("Transcript lock for %s expired during the fetch", meeting_name)
+
+
+def fetch_transcript(meeting_name):
+	"""
+	Try each transcript source in order until one stores the transcript.
+
+	If none has it yet, the next fetch is scheduled with backoff (see transcript_retries).
+
+	Args:
+		meeting_name: VidCon Meeting name
+
+	Returns:
+		str: Source the transcript was stored from, or None
+	"""
+	from vidcon.vidcon.doctype.vidcon_meeting.transcript_retries import (
+		clear_transcript_retry,
+		schedule_transcript_retry
+	)
+
+	if not frappe.db.exists("VidCon Meeting", meeting_name):
+		clear_hints(meeting_name)
+		clear_transcript_retry(meeting_name)
+		return None
+
+	meeting_doc = frappe.get_doc("VidCon Meeting", meeting_name)
+	if meeting_doc.transcript_retrieved_at:
+		clear_hints(meeting_name)
+		clear_transcript_retry(meeting_name)
+		return meeting_doc.transcript_source
+
+	google_calendar = frappe.db.get_single_value("VidCon Settings", "google_calendar")
+	if not google_calendar:
+		log.error("No Google Calendar configured")
+		schedule_transcript_retry(meeting_name, "No Google Calendar configured")
+		return None
+
+	errors = []
+	for source, store in get_sources(meeting_doc, get_hints(meeting_name), google_calendar):
+		start = time.perf_counter()
+
+		# Saved by the source along with the transcript
+		meeting_doc.transcript_source = source
+		if meeting_doc.status == "Completed":
+			meeting_doc.status = "Transcript Retrieved"
+
+		try:
+			stored = store()
+		except Exception as e:
+			log.warning("%s transcript fetch failed for %s: %s", source, meeting_name, str(e))
+			incr("transcript_source_errors")
+			errors.append(f"{source}: {str(e)}")
+			frappe.db.rollback()
+			meeting_doc.reload()
+			continue
+
+		finally:
+			observe("transcript_fetch_ms", (time.perf_counter() - start) * 1000)
+
+		if stored:
+			frappe.db.commit()
+			clear_hints(meeting_name)
+			clear_transcript_retry(meeting_name)
+			incr(f"transcript_source:{source}")
+			log.info("Transcript for %s stored from %s", meeting_name, source)
+			return source
+
+		meeting_doc.reload()
+
+	log.info("No transcript available yet for %s", meeting_name)
+	incr("transcript_not_found")
+	schedule_transcript_retry(meeting_name, "\n".join(errors) or None)
+	return None
+
+
+def get_sources(meeting_doc, hints, google_calendar):
+	"""
+	Get the transcript sources that apply to a meeting, cheapest first.
+
+	Args:
+		meeting_doc: VidCon Meeting document
+		hints: Hints recorded by request_transcript
+		google_calendar: Google Calendar to authenticate as
+
+	Returns:
+		list: (source name, callable returning True once stored) tuples
+	"""
+	from vidcon.vidcon.doctype.vidcon_meeting.google_calendar_webhook import store_transcript_from_drive_search
+	from vidcon.vidcon.doctype.vidcon_meeting.google_clients import get_service
+	from vidcon.vidcon.doctype.vidcon_meeting.google_meet_events import (
+		store_conference_transcript,
+		store_transcript_document
+	)
+
+	meet_service = get_service('meet', 'v2', google_calendar)
+	drive_service = get_service('drive', 'v3', google_calendar)
+	conference_id = meeting_doc.google_conference_id or hints.get("conference_id")
+
+	sources = []
+	if hints.get("transcript_name"):
+		sources.append(("Meet Event", lambda: store_transcript_document(
+			meeting_doc, meet_service, drive_service, hints["transcript_name"]
+		)))
+	if conference_id:
+		sources.append(("Meet Conference", lambda: store_conference_transcript(meeting_doc, meet_service, conference_id)))
+	if meeting_doc.google_meet_link:
+		sources.append(("Drive Search", lambda: store_transcript_from_drive_search(meeting_doc, drive_service)))
+
+	return sources
+
+
+def get_in_flight_meetings(meeting_names):
+	"""
+	Get the meetings whose transcript fetch is queued, running or scheduled.
+
+	The retry schedule, the per-meeting locks and the pipeline jobs all live in
+	the RQ Redis, so all meetings are checked in one round trip.
+
+	Args:
+		meeting_names: VidCon Meeting names
+
+	Returns:
+		set: The meeting names among them that already have a fetch on the way
+	"""
+	from frappe.utils.background_jobs import create_job_id, get_redis_conn
+	from rq.job import Job, JobStatus
+	from vidcon.vidcon.doctype.vidcon_meeting.transcript_retries import SCHEDULE_KEY
+
+	meeting_names = list(meeting_names)
+	if not meeting_names:
+		return set()
+
+	schedule_key = frappe.cache.make_key(SCHEDULE_KEY)
+	pipe = get_redis_conn().pipeline()
+	for meeting_name in meeting_names:
+		pipe.zscore(schedule_key, meeting_name)
+		pipe.exists(frappe.cache.make_key(LOCK_KEY_PREFIX + meeting_name))
+		pipe.hget(Job.key_for(create_job_id(get_job_id(meeting_name))), "status")
+	results = pipe.execute()
+
+	in_flight = set()
+	for meeting_name, due_at, locked, job_status in zip(
+		meeting_names, results[0::3], results[1::3], results[2::3], strict=True
+	):
+		if (
+			due_at is not None
+			or locked
+			or frappe.safe_decode(job_status) in (JobStatus.QUEUED, JobStatus.STARTED)
+		):
+			in_flight.add(meeting_name)
+
+	return in_flight
+
+
+def get_job_id(meeting_name):
+	"""The one pipeline job a meeting can have queued at a time."""
+	return f"vidcon_transcript:{meeting_name}"
+
+
+def add_hints(meeting_name, hints):
+	"""Record what a trigger knows about a meeting's transcript."""
+	if not hints:
+		return
+
+	key = HINTS_KEY_PREFIX + meeting_name
+	for field, value in hints.items():
+		frappe.cache.hset(key, field, value)
+	frappe.cache.expire(frappe.cache.make_key(key), HINTS_TTL)
+
+
+def get_hints(meeting_name):
+	# hgetall unpickles the values but leaves the field names as bytes
+	hints = frappe.cache.hgetall(HINTS_KEY_PREFIX + meeting_name) or {}
+	return {frappe.safe_decode(field): value for field, value in hints.items()}
+
+
+def clear_hints(meeting_name):
+	frappe.cache.delete_value(HINTS_KEY_PREFIX + meeting_name)
@@ -0,0 +1,181 @@
+"""
+Scheduled transcript fetches with exponential backoff
+
+Transcripts show up minutes to hours after a meeting ends. Rather than
+re-enqueueing a fetch right away when none is found (a hot loop burning API
+quota and worker slots), fetches due later are kept in a Redis sorted set
+scored by when they are due. A scheduler job enqueues the transcript pipeline
+for the meetings that are due, every minute.
+
+A meeting's first fetch waits for VidCon Settings' Transcript Fetch Delay. Each
+fetch that finds no transcript, or fails, schedules the next one after an
+exponentially growing delay with jitter, so meetings that ended together don't
+retry together, until Transcript Max Attempts is reached. The queue and the
+attempt counts live in the RQ Redis, which is persisted, and can be viewed with
+get_pending_transcript_retries.
+"""
+
+import json
+import random
+import time
+from datetime import datetime, timezone
+
+import frappe
+from frappe.utils import cint, convert_utc_to_system_timezone
+from frappe.utils.background_jobs import get_redis_conn
+
+from vidcon.vidcon.doctype.vidcon_meeting.conference_lanes import make_key
+from vidcon.vidcon.doctype.vidcon_meeting.metrics import incr
+from vidcon.vidcon.doctype.vidcon_meeting.vidcon_logger import get_logger
+
+
+# Sorted set: meeting name scored by when its fetch is due (epoch seconds)
+SCHEDULE_KEY = "vidcon:transcript_schedule"
+
+# Hash: meeting name -> {"attempts": ..., "last_error": ...}
+RETRY_STATE_KEY = "vidcon:transcript_retry_state"
+
+# Delay after the first failed attempt; doubles with every further attempt
+RETRY_BASE_DELAY = 300
+RETRY_MAX_DELAY = 6 * 3600
+
+DEFAULT_MAX_ATTEMPTS = 8
+
+# Meetings enqueued per scheduler run; the rest are picked up a minute later
+DUE_BATCH_SIZE = 500
+
+# ZADD LT, which needs Redis 6.2, done atomically on any version
+ZADD_LT_SCRIPT = """
+local score = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if not score or tonumber(ARGV[2]) < tonumber(score) then
+	return redis.call('ZADD', KEYS[1], ARGV[2], ARGV[1])
+end
+return 0
+"""
+
+log = get_logger("transcripts")
+
+
+def schedule_transcript_fetch(meeting_name, delay):
+	"""
+	Schedule a meeting's transcript fetch, unless one is already due sooner.
+
+	Args:
+		meeting_name: VidCon Meeting name
+		delay: Seconds from now
+	"""
+	get_redis_conn().eval(ZADD_LT_SCRIPT, 1, make_key(SCHEDULE_KEY), meeting_name, time.time() + delay)
+
+
+def schedule_transcript_retry(meeting_name, error=None):
+	"""
+	Schedule the next fetch after an attempt found no transcript or failed.
+
+	Args:
+		meeting_name: VidCon Meeting name
+		error: Why the attempt failed, if it did
+
+	Returns:
+		float: When the retry is due (epoch seconds), or None if attempts are exhausted
+	"""
+	conn = get_redis_conn()
+	state = get_retry_state(conn, meeting_name)
+	state["attempts"] += 1
+	state["last_error"] = error
+
+	if state["attempts"] >= get_max_attempts():
+		clear_transcript_retry(meeting_name)
+		incr("transcript_retries_exhausted")
+		log.failure(
+			"Transcript Not Found",
+			f"Meeting: {meeting_name}\nGave up after {state['attempts']} attempts\nLast error: {error or 'No transcript available'}"
+		)
+		return None
+
+	due_at = time.time() + get_backoff_delay(state["attempts"])
+
+	pipe = conn.pipeline()
+	pipe.hset(make_key(RETRY_STATE_KEY), meeting_name, json.dumps(state))
+	pipe.zadd(make_key(SCHEDULE_KEY), {meeting_name: due_at})
+	pipe.execute()
+
+	incr("transcript_retries_scheduled")
+	log.info("Transcript fetch for %s retried in %.0f seconds (attempt %s)", meeting_name, due_at - time.time(), state["attempts"])
+	return due_at
+
+
+def clear_transcript_retry(meeting_name):
+	"""Forget a meeting's scheduled fetch and attempts, e.g. once its transcript is stored."""
+	pipe = get_redis_conn().pipeline()
+	pipe.zrem(make_key(SCHEDULE_KEY), meeting_name)
+	pipe.hdel(make_key(RETRY_STATE_KEY), meeting_name)
+	pipe.execute()
+
+
+def get_backoff_delay(attempts):
+	"""
+	Get the delay before the next attempt.
+
+	Args:
+		attempts: Attempts made so far (1 or more)
+
+	Returns:
+		float: Seconds, between half and all of RETRY_BASE_DELAY * 2^(attempts - 1), capped
+	"""
+	delay = min(RETRY_BASE_DELAY * 2 ** (attempts - 1), RETRY_MAX_DELAY)
+	return delay / 2 + random.uniform(0, delay / 2)
+
+
+def get_max_attempts():
+	return cint(frappe.db.get_single_value("VidCon Settings", "transcript_max_attempts")) or DEFAULT_MAX_ATTEMPTS
+
+
+def get_retry_state(conn, meeting_name):
+	state = conn.hget(make_key(RETRY_STATE_KEY), meeting_name)
+	return json.loads(state) if state else {"attempts": 0, "last_error": None}
+
+
+def enqueue_due_transcript_fetches():
+	"""
+	Scheduler job: enqueue the transcript pipeline for meetings whose fetch is due.
+	"""
+	from vidcon.vidcon.doctype.vidcon_meeting.transcript_pipeline import enqueue_transcript_job
+
+	conn = get_redis_conn()
+	key = make_key(SCHEDULE_KEY)
+
+	for member in conn.zrangebyscore(key, "-inf", time.time(), start=0, num=DUE_BATCH_SIZE):
+		# Only the scheduler run that removes the entry enqueues it
+		if conn.zrem(key, member):
+			enqueue_transcript_job(frappe.safe_decode(member))
+			incr("transcript_retries_due")
+
+	frappe.db.commit()
+
+
+@frappe.whitelist()
+def get_pending_transcript_retries():
+	"""
+	Whitelisted method to view scheduled transcript fetches from the UI.
+
+	Returns:
+		list: {"meeting", "due_at", "attempts", "last_error"} dicts, soonest first
+	"""
+	frappe.only_for("System Manager")
+
+	conn = get_redis_conn()
+	states = conn.hgetall(make_key(RETRY_STATE_KEY))
+
+	pending = []
+	for member, due_at in conn.zrange(make_key(SCHEDULE_KEY), 0, -1, withscores=True):
+		state = json.loads(states[member]) if member in states else {"attempts": 0, "last_error": None}
+		pending.append({
+			"meeting": frappe.safe_decode(member),
+			"due_at": convert_utc_to_system_timezone(
+				datetime.fromtimestamp(due_at, timezone.utc).replace(tzinfo=None)
+			).replace(tzinfo=None),
+			"attempts": state["attempts"],
+			"last_error": state["last_error"]
+		})
+
+	return pending
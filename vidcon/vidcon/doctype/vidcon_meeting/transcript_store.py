@@ -0,0 +1,171 @@
+"""
+Streaming transcript storage
+
+Transcripts of multi-hour meetings run to many megabytes. Rather than building
+the whole text in memory and handing it to a File doc as `content`, fetchers
+write it piece by piece into a TranscriptFile: a private file on disk whose
+hash and size are computed as it is written. Drive files are downloaded into it
+in ranged chunks (download_media). When done, the file is attached to the
+meeting as is.
+
+Only the first TRANSCRIPT_INLINE_LIMIT bytes are also kept in memory, for
+VidCon Meeting.transcript and for reading Gemini notes off the top, so memory
+per transcript job stays constant however long the meeting was.
+"""
+
+import hashlib
+import os
+
+import frappe
+from frappe.utils import get_files_path, now_datetime
+
+
+# Bytes of a transcript kept in VidCon Meeting.transcript; the file has all of it
+TRANSCRIPT_INLINE_LIMIT = 1024 * 1024
+
+# Bytes requested per ranged Drive download call
+DOWNLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+
+TRUNCATED_NOTE = "\n\n[Transcript truncated; the full transcript is in the Transcript File]"
+
+
+class TranscriptFile:
+	"""
+	A meeting's transcript, written incrementally to a private file.
+
+	Usage:
+		with TranscriptFile(meeting_name) as transcript_file:
+			for line in lines:
+				transcript_file.write(line)
+			file_doc = transcript_file.attach()
+
+	The file is discarded if the block raises or attach() isn't called.
+	"""
+
+	def __init__(self, meeting_name, extension="txt"):
+		self.meeting_name = meeting_name
+		self.file_name = (
+			f"transcript_{meeting_name}_{now_datetime().strftime('%Y%m%d_%H%M%S')}_"
+			f"{frappe.generate_hash(length=6)}.{extension}"
+		)
+		self.path = get_files_path(self.file_name, is_private=1)
+		self.size = 0
+		self.truncated = False
+		self.attached = False
+
+		self._head = bytearray()
+		self._hash = hashlib.md5()
+		self._temp_path = f"{self.path}.part"
+		self._file = None
+
+	def __enter__(self):
+		os.makedirs(os.path.dirname(self.path), exist_ok=True)
+		self._file = open(self._temp_path, "wb")
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		if self._file:
+			self._file.close()
+		if not self.attached:
+			self.discard()
+
+	def write(self, data):
+		"""
+		Append text or bytes. Also accepts the writes of MediaIoBaseDownload.
+
+		Args:
+			data: str (written as UTF-8) or bytes
+		"""
+		if isinstance(data, str):
+			data = data.encode("utf-8")
+
+		self._file.write(data)
+		self._hash.update(data)
+		self.size += len(data)
+
+		room = TRANSCRIPT_INLINE_LIMIT - len(self._head)
+		if room > 0:
+			self._head += data[:room]
+		if len(data) > room:
+			self.truncated = True
+
+	def get_inline_text(self):
+		"""
+		Get the text kept for VidCon Meeting.transcript.
+
+		Returns:
+			str: The transcript, or its first TRANSCRIPT_INLINE_LIMIT bytes and a note
+		"""
+		# A character split by the limit is dropped rather than garbled
+		text = self._head.decode("utf-8", errors="ignore")
+		return text + TRUNCATED_NOTE if self.truncated else text
+
+	def attach(self, attached_to_field="transcript_file"):
+		"""
+		Move the written file into place and attach it to the meeting.
+
+		Returns:
+			File document
+		"""
+		self._file.close()
+		os.replace(self._temp_path, self.path)
+
+		file_doc = frappe.get_doc({
+			"doctype": "File",
+			"file_name": self.file_name,
+			"file_url": f"/private/files/{self.file_name}",
+			"is_private": 1,
+			"file_size": self.size,
+			"content_hash": self._hash.hexdigest(),
+			"folder": "Home/Attachments",
+			"attached_to_doctype": "VidCon Meeting",
+			"attached_to_name": self.meeting_name,
+			"attached_to_field": attached_to_field
+		})
+
+		# File.insert() reads the whole file back to hash and save it; the file
+		# is already on disk and hashed, so only the row is written
+		file_doc.set_new_name()
+		file_doc.set_user_and_timestamp()
+		file_doc.db_insert()
+
+		# Don't leave an orphaned file behind if the meeting update rolls back
+		frappe.db.after_rollback.add(lambda: remove_file(self.path))
+
+		self.attached = True
+		return file_doc
+
+	def discard(self):
+		"""Delete the written file."""
+		remove_file(self._temp_path)
+		remove_file(self.path)
+
+
+def download_media(media_request, transcript_file, chunk_size=DOWNLOAD_CHUNK_SIZE):
+	"""
+	Download a Drive media or export request into a transcript file, chunk by chunk.
+
+	Args:
+		media_request: HttpRequest from files().get_media() or files().export_media()
+		transcript_file: Open TranscriptFile to write to
+		chunk_size: Bytes per ranged request
+
+	Returns:
+		int: Bytes downloaded
+	"""
+	from googleapiclient.http import MediaIoBaseDownload
+
+	downloader = MediaIoBaseDownload(transcript_file, media_request, chunksize=chunk_size)
+
+	done = False
+	while not done:
+		_, done = downloader.next_chunk()
+
+	return transcript_file.size
+
+
+def remove_file(path):
+	try:
+		os.remove(path)
+	except OSError:
+		pass
@@ -0,0 +1,183 @@
+"""
+VidCon logging
+
+Leveled, per-category sampled logging with an asynchronous file sink. The level,
+sample rates and whether failures are also written to Error Log are read from
+VidCon Settings, so they can be changed without a deploy.
+
+Usage:
+	log = get_logger("webhook")
+	log.debug("Received %s", event_type)
+	log.failure("Pub/Sub Handler Error", str(e))
+"""
+
+import atexit
+import logging
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener
+
+import frappe
+from frappe.utils import cint, flt
+
+
+DEFAULT_LEVEL = "WARNING"
+
+LEVELS = {
+	"DEBUG": logging.DEBUG,
+	"INFO": logging.INFO,
+	"WARNING": logging.WARNING,
+	"ERROR": logging.ERROR
+}
+
+_sink = None
+_parsed_sample_rates: dict[str, dict[str, float]] = {}
+
+
+def get_logger(category):
+	"""
+	Get a logger for a category (e.g. 'webhook', 'auth', 'handlers').
+
+	Args:
+		category: Name used for sampling rates and shown in each log line
+
+	Returns:
+		VidConLogger
+	"""
+	return VidConLogger(category)
+
+
+class VidConLogger:
+	def __init__(self, category):
+		self.category = category
+
+	def debug(self, message, *args):
+		self._log(logging.DEBUG, message, args)
+
+	def info(self, message, *args):
+		self._log(logging.INFO, message, args)
+
+	def warning(self, message, *args):
+		self._log(logging.WARNING, message, args)
+
+	def error(self, message, *args):
+		self._log(logging.ERROR, message, args)
+
+	def failure(self, title, message):
+		"""
+		Log a real failure. Unless disabled in VidCon Settings, it is also
+		recorded in Error Log.
+		"""
+		self._log(logging.ERROR, "%s: %s", (title, message))
+
+		if not get_config()["skip_error_log"]:
+			frappe.log_error(title=title, message=message)
+
+	def is_enabled_for(self, level):
+		"""
+		Check whether a message at this level should be emitted.
+
+		DEBUG and INFO messages are sampled per category; WARNING and above are
+		never sampled out.
+		"""
+		config = get_config()
+		if level < config["level"]:
+			return False
+
+		if level >= logging.WARNING:
+			return True
+
+		rates = config["sample_rates"]
+		rate = rates.get(self.category, rates.get("*", 1.0))
+		return rate >= 1 or random.random() < rate
+
+	def _log(self, level, message, args):
+		if not self.is_enabled_for(level):
+			return
+
+		# Without args the message is not a format string; it may contain a literal %
+		if not args:
+			message, args = "%s", (message,)
+
+		get_sink().log(
+			level,
+			"[%s] [%s] " + message,
+			getattr(frappe.local, "site", None),
+			self.category,
+			*args
+		)
+
+
+def get_config():
+	"""
+	Get the logging configuration from VidCon Settings, memoized per request.
+
+	Returns:
+		dict: level, sample_rates and skip_error_log
+	"""
+	config = getattr(frappe.local, "vidcon_log_config", None)
+	if config is not None:
+		return config
+
+	try:
+		settings = frappe.get_cached_doc("VidCon Settings")
+		config = {
+			"level": LEVELS.get(settings.get("log_level") or DEFAULT_LEVEL, logging.WARNING),
+			"sample_rates": parse_sample_rates(settings.get("log_sample_rates")),
+			"skip_error_log": cint(settings.get("skip_error_log"))
+		}
+	except Exception:
+		# Settings not available (e.g. during install); fall back to defaults
+		config = {"level": LEVELS[DEFAULT_LEVEL], "sample_rates": {}, "skip_error_log": 0}
+
+	frappe.local.vidcon_log_config = config
+	return config
+
+
+def parse_sample_rates(value):
+	"""
+	Parse sample rates given as one 'category=rate' per line.
+
+	Args:
+		value: e.g. "webhook=0.1\\nhandlers=1\\n*=0.5"
+
+	Returns:
+		dict: Category to rate between 0 and 1
+	"""
+	if not value:
+		return {}
+
+	if value not in _parsed_sample_rates:
+		rates = {}
+		for line in value.splitlines():
+			category, _, rate = line.partition("=")
+			if category.strip() and rate.strip():
+				rates[category.strip()] = min(max(flt(rate.strip()), 0), 1)
+		_parsed_sample_rates[value] = rates
+
+	return _parsed_sample_rates[value]
+
+
+def get_sink():
+	"""
+	Get the process-wide logger whose records are written by a background thread.
+
+	Records are handed to a queue and written to the bench's logs/vidcon.log by a
+	QueueListener, so request threads never block on file I/O.
+	"""
+	global _sink
+
+	if _sink is None:
+		records = queue.SimpleQueue()
+
+		listener = QueueListener(records, *frappe.logger("vidcon", allow_site=False).handlers)
+		listener.start()
+		atexit.register(listener.stop)
+
+		sink = logging.getLogger("vidcon.async")
+		sink.setLevel(logging.DEBUG)
+		sink.propagate = False
+		sink.addHandler(QueueHandler(records))
+		_sink = sink
+
+	return _sink
@@ -6,10 +6,16 @@ from frappe import _
 from frappe.model.document import Document
 from frappe.utils import get_datetime, now_datetime, time_diff_in_seconds, get_time
 
+from vidcon.vidcon.doctype.vidcon_meeting.vidcon_logger import get_logger
+
+
+log = get_logger("meeting")
+
 
 class VidConMeeting(Document):
 	def validate(self):
 		self.calculate_duration()
+		self.set_meeting_code()
 		
 	def before_save(self):
 		if self.is_new():
@@ -17,8 +23,20 @@ class VidConMeeting(Document):
 		else:
 			self.update_google_meet_event()
 	
+	def on_update(self):
+		if self.google_conference_id and self.has_value_changed("google_conference_id"):
+			from vidcon.vidcon.doctype.vidcon_meeting.meeting_resolver import cache_binding
+			
+			# Only publish the binding once it is committed
+			conference_id = self.google_conference_id
+			frappe.db.after_commit.add(lambda: cache_binding(conference_id, self.name))
+	
 	def on_trash(self):
 		"""Clean up Google Calendar Event, Event Logs, and Meet subscription when meeting is deleted"""
+		if self.google_conference_id:
+			from vidcon.vidcon.doctype.vidcon_meeting.meeting_resolver import clear_binding
+			clear_binding(self.google_conference_id)
+		
 		# Clear links from VidCon Event Logs first
 		try:
 			event_logs = frappe.get_all(
@@ -26,11 +44,11 @@ class VidConMeeting(Document):
 				filters={"meeting": self.name},
 				fields=["name"]
 			)
-			for log in event_logs:
-				frappe.db.set_value("VidCon Event Log", log.name, "meeting", None)
+			for event_log in event_logs:
+				frappe.db.set_value("VidCon Event Log", event_log.name, "meeting", None)
 			if event_logs:
 				frappe.db.commit()
-				frappe.log_error(title="Event Logs Unlinked", message=f"Cleared {len(event_logs)} event log links for meeting {self.name}")
+				log.info("Cleared %s event log links for meeting %s", len(event_logs), self.name)
 		except Exception as e:
 			frappe.log_error(title="Error Unlinking Event Logs", message=str(e))
 		
@@ -47,18 +65,21 @@ class VidConMeeting(Document):
 				# Now delete the Event
 				event_doc.delete(ignore_permissions=True)
 				frappe.db.commit()
-				frappe.log_error(title="Event Deleted", message=f"Deleted Event {self.event} for meeting {self.name}")
+				log.info("Deleted Event %s for meeting %s", self.event, self.name)
 			except Exception as e:
 				frappe.log_error(title="Error Deleting Event", message=f"Event {self.event}: {str(e)}")
 		
-		# Delete Meet Events subscription
+		# Delete Meet Events subscription, batched with other meetings deleted in this transaction
 		if self.meet_subscription_id:
-			try:
-				from vidcon.vidcon.doctype.vidcon_meeting.meet_utils import delete_space_subscription
-				delete_space_subscription(self.meet_subscription_id)
-				frappe.log_error(title="Subscription Deleted", message=f"Deleted subscription {self.meet_subscription_id} for meeting {self.name}")
-			except Exception as e:
-				frappe.log_error(title="Error Deleting Subscription", message=f"Subscription {self.meet_subscription_id}: {str(e)}")
+			from vidcon.vidcon.doctype.vidcon_meeting.meet_utils import queue_subscription_deletion
+			queue_subscription_deletion(self.meet_subscription_id)
+			log.info("Queued deletion of subscription %s for meeting %s", self.meet_subscription_id, self.name)
+	
+	def set_meeting_code(self):
+		"""Keep google_space_id as the normalized meeting code of the Meet link"""
+		from vidcon.vidcon.doctype.vidcon_meeting.meet_utils import normalize_meeting_code
+		
+		self.google_space_id = normalize_meeting_code(self.google_meet_link) or normalize_meeting_code(self.google_space_id)
 	
 	def calculate_duration(self):
 		"""Calculate meeting duration in minutes"""
@@ -150,7 +171,8 @@ class VidConMeeting(Document):
 					print(f"Meet Link: {event_doc.google_meet_link}")
 					
 					# Extract space_id from Meet link
-					space_id = event_doc.google_meet_link.split('/')[-1]
+					from vidcon.vidcon.doctype.vidcon_meeting.meet_utils import extract_space_id_from_meet_link
+					space_id = extract_space_id_from_meet_link(event_doc.google_meet_link)
 					
 					# Update meeting with Meet link details
 					frappe.db.set_value("VidCon Meeting", self.name, {
@@ -251,7 +273,8 @@ def sync_event_and_fetch_meet_link(meeting):
 			
 			# Extract space_id from Meet link
 			# Format: https://meet.google.com/abc-defg-hij
-			space_id = event_doc.google_meet_link.split('/')[-1] if event_doc.google_meet_link else None
+			from vidcon.vidcon.doctype.vidcon_meeting.meet_utils import extract_space_id_from_meet_link
+			space_id = extract_space_id_from_meet_link(event_doc.google_meet_link)
 			
 			frappe.db.set_value("VidCon Meeting", meeting, {
 				"google_meet_link": event_doc.google_meet_link,
@@ -343,7 +366,88 @@ def check_subscription_status(meeting_name):
 		subscription_id=meeting.meet_subscription_id
 	)
 	
+	state = status.get("state") if status else "UNKNOWN"
+	meeting.db_set("meet_subscription_state", state, update_modified=False)
+	
 	return {
 		"subscription_id": meeting.meet_subscription_id,
-		"state": status.get("state") if status else "UNKNOWN"
+		"state": state
 	}
+
+
+@frappe.whitelist()
+def create_meet_subscriptions(meeting_names):
+	"""Create Meet Events subscriptions for many meetings in batched API calls"""
+	from vidcon.vidcon.doctype.vidcon_meeting.meet_utils import create_space_subscriptions
+	
+	frappe.has_permission("VidCon Meeting", "write", throw=True)
+	
+	# Only meetings the user can see, that have no subscription yet
+	meeting_names = frappe.get_list(
+		"VidCon Meeting",
+		filters={"name": ["in", frappe.parse_json(meeting_names)], "meet_subscription_id": ["is", "not set"]},
+		pluck="name"
+	)
+	if not meeting_names:
+		return {"succeeded": {}, "failed": {}}
+	
+	return create_space_subscriptions(meeting_names)
+
+
+@frappe.whitelist()
+def refresh_subscription_states(meeting_names):
+	"""Fetch the subscription state of many meetings in batched API calls and store it"""
+	from vidcon.vidcon.doctype.vidcon_meeting.subscription_manager import get_subscription_statuses
+	
+	frappe.has_permission("VidCon Meeting", "write", throw=True)
+	
+	meetings = frappe.get_list(
+		"VidCon Meeting",
+		filters={"name": ["in", frappe.parse_json(meeting_names)], "meet_subscription_id": ["is", "set"]},
+		fields=["name", "meet_subscription_id"]
+	)
+	if not meetings:
+		return {"states": {}, "failed": {}}
+	
+	settings = frappe.get_single("VidCon Settings")
+	result = get_subscription_statuses(settings.google_calendar, [m.meet_subscription_id for m in meetings])
+	
+	states = {}
+	failed = {}
+	for meeting in meetings:
+		subscription = result["succeeded"].get(meeting.meet_subscription_id)
+		if subscription:
+			states[meeting.name] = subscription.get("state") or "UNKNOWN"
+		else:
+			failed[meeting.name] = result["failed"].get(meeting.meet_subscription_id)
+	
+	if states:
+		frappe.db.bulk_update(
+			"VidCon Meeting",
+			{name: {"meet_subscription_state": state} for name, state in states.items()},
+			update_modified=False
+		)
+		for name in states:
+			frappe.clear_document_cache("VidCon Meeting", name)
+	
+	return {"states": states, "failed": failed}
+
+
+@frappe.whitelist(methods=["POST"])
+def enqueue_space_resource_backfill():
+	"""Record the space resource of open meetings from older versions in a background job"""
+	frappe.only_for("System Manager")
+	
+	frappe.enqueue(
+		"vidcon.vidcon.doctype.vidcon_meeting.meet_utils.backfill_space_resources",
+		queue="long",
+		job_id="vidcon_backfill_space_resources",
+		deduplicate=True
+	)
+
+
+def on_doctype_update():
+	# Event handlers look meetings up by conference and status; the transcript
+	# sweep filters by status and modified
+	frappe.db.add_index("VidCon Meeting", ["google_conference_id", "status"], "google_conference_id_status_index")
+	frappe.db.add_index("VidCon Meeting", ["status", "modified"], "status_modified_index")
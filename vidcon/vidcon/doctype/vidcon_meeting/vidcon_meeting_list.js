@@ -0,0 +1,58 @@
+// Copyright (c) 2026, Pema and contributors
+// For license information, please see license.txt
+
+frappe.listview_settings['VidCon Meeting'] = {
+	onload: function(listview) {
+		// Batch subscription actions for the selected meetings
+		listview.page.add_actions_menu_item(__('Create Meet Subscriptions'), function() {
+			call_subscription_batch(listview, 'create_meet_subscriptions', __('Subscriptions Created'));
+		});
+
+		listview.page.add_actions_menu_item(__('Refresh Subscription State'), function() {
+			call_subscription_batch(listview, 'refresh_subscription_states', __('Subscription States Refreshed'));
+		});
+
+		if (frappe.user.has_role('System Manager')) {
+			// Meetings from older versions have no space resource to resolve events by
+			listview.page.add_menu_item(__('Backfill Space Resources'), function() {
+				frappe.call({
+					method: 'vidcon.vidcon.doctype.vidcon_meeting.vidcon_meeting.enqueue_space_resource_backfill',
+					callback: function() {
+						frappe.show_alert({
+							message: __('Space resource backfill queued'),
+							indicator: 'blue'
+						});
+					}
+				});
+			});
+		}
+	}
+};
+
+function call_subscription_batch(listview, method, title) {
+	frappe.call({
+		method: 'vidcon.vidcon.doctype.vidcon_meeting.vidcon_meeting.' + method,
+		args: {
+			meeting_names: listview.get_checked_items(true)
+		},
+		freeze: true,
+		callback: function(r) {
+			if (r.message) {
+				const succeeded = Object.keys(r.message.succeeded || r.message.states || {}).length;
+				const failed = Object.entries(r.message.failed || {});
+
+				let message = __('{0} succeeded, {1} failed', [succeeded, failed.length]);
+				if (failed.length) {
+					message += '<br><br>' + failed.map(([name, error]) => `${frappe.utils.escape_html(name)}: ${frappe.utils.escape_html(error || '')}`).join('<br>');
+				}
+
+				frappe.msgprint({
+					title: title,
+					message: message,
+					indicator: failed.length ? 'orange' : 'green'
+				});
+				listview.refresh();
+			}
+		}
+	});
+}
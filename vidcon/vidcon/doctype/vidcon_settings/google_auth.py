@@ -61,7 +61,7 @@ def vidcon_callback(code=None):
 	OAuth callback handler for VidCon Google authorization.
 	Receives authorization code and exchanges it for tokens.
 	"""
-	import requests
+	from vidcon.vidcon.doctype.vidcon_meeting.google_transport import request
 	
 	if not code:
 		frappe.respond_as_web_page(
@@ -98,7 +98,7 @@ def vidcon_callback(code=None):
 			"grant_type": "authorization_code"
 		}
 		
-		response = requests.post("https://oauth2.googleapis.com/token", data=token_data)
+		response = request("POST", "https://oauth2.googleapis.com/token", data=token_data)
 		response.raise_for_status()
 		tokens = response.json()
 		
@@ -111,6 +111,10 @@ def vidcon_callback(code=None):
 		
 		frappe.db.commit()
 		
+		# Access tokens cached for the previous authorization must not be reused
+		from vidcon.vidcon.doctype.vidcon_meeting.subscription_manager import clear_vidcon_access_token
+		clear_vidcon_access_token(google_calendar_name)
+		
 		# Clear cache
 		frappe.cache.hdel("google_calendar", "google_calendar")
 		
@@ -90,6 +90,10 @@ def test_webhook_endpoint():
 		)
 		
 		if response.status_code == 200:
+			# Event log rows are written in batches; write any pending ones now
+			from vidcon.vidcon.doctype.vidcon_event_log.event_log_writer import flush_event_log_buffer
+			flush_event_log_buffer()
+			
 			# Check if event was logged
 			recent_events = frappe.get_all(
 				"VidCon Event Log",